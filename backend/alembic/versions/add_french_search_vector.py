@@ -0,0 +1,105 @@
+"""Add French full-text search vector for hadiths
+
+Revision ID: add_french_search_vector
+Revises: add_search_index_state
+Create Date: 2025-07-15 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_french_search_vector'
+down_revision = 'add_search_index_state'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add search_vector_fr and maintain it from the search vector trigger."""
+    
+    # 1. Add French full-text search column
+    op.add_column('hadiths', sa.Column('search_vector_fr', postgresql.TSVECTOR))
+    
+    # 2. Populate French search vectors
+    op.execute("""
+        UPDATE hadiths 
+        SET search_vector_fr = to_tsvector('french',
+            COALESCE(french_text, '') || ' ' ||
+            COALESCE(narrator_chain, '') || ' ' ||
+            COALESCE(reference, '')
+        )
+    """)
+    
+    # 3. Create index for French full-text search
+    op.create_index(
+        'idx_hadith_fts_fr',
+        'hadiths',
+        ['search_vector_fr'],
+        postgresql_using='gin'
+    )
+    
+    # 4. Maintain the French vector from the existing trigger
+    op.execute("""
+        CREATE OR REPLACE FUNCTION update_hadith_search_vectors()
+        RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector_en := to_tsvector('english',
+                COALESCE(NEW.english_text, '') || ' ' ||
+                COALESCE(NEW.narrator_chain, '') || ' ' ||
+                COALESCE(NEW.reference, '')
+            );
+            NEW.search_vector_ar := to_tsvector('arabic', COALESCE(NEW.arabic_text, ''));
+            NEW.search_vector_fr := to_tsvector('french',
+                COALESCE(NEW.french_text, '') || ' ' ||
+                COALESCE(NEW.narrator_chain, '') || ' ' ||
+                COALESCE(NEW.reference, '')
+            );
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    
+    op.execute("DROP TRIGGER IF EXISTS hadith_search_vector_update ON hadiths;")
+    op.execute("""
+        CREATE TRIGGER hadith_search_vector_update
+        BEFORE INSERT OR UPDATE OF english_text, arabic_text, french_text, narrator_chain, reference
+        ON hadiths
+        FOR EACH ROW
+        EXECUTE FUNCTION update_hadith_search_vectors();
+    """)
+    
+    op.execute("ANALYZE hadiths;")
+
+
+def downgrade() -> None:
+    """Remove the French search vector."""
+    
+    op.execute("""
+        CREATE OR REPLACE FUNCTION update_hadith_search_vectors()
+        RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector_en := to_tsvector('english',
+                COALESCE(NEW.english_text, '') || ' ' ||
+                COALESCE(NEW.narrator_chain, '') || ' ' ||
+                COALESCE(NEW.reference, '')
+            );
+            NEW.search_vector_ar := to_tsvector('arabic', COALESCE(NEW.arabic_text, ''));
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    
+    op.execute("DROP TRIGGER IF EXISTS hadith_search_vector_update ON hadiths;")
+    op.execute("""
+        CREATE TRIGGER hadith_search_vector_update
+        BEFORE INSERT OR UPDATE OF english_text, arabic_text, narrator_chain, reference
+        ON hadiths
+        FOR EACH ROW
+        EXECUTE FUNCTION update_hadith_search_vectors();
+    """)
+    
+    op.drop_index('idx_hadith_fts_fr', 'hadiths')
+    op.drop_column('hadiths', 'search_vector_fr')
@@ -0,0 +1,33 @@
+"""Add parallel narration cluster id to hadiths
+
+Revision ID: add_hadith_parallel_clusters
+Revises: add_hadith_similar
+Create Date: 2025-07-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_hadith_parallel_clusters'
+down_revision = 'add_hadith_similar'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add hadiths.parallel_cluster_id (filled by scripts/detect_parallel_narrations.py)."""
+    op.add_column('hadiths', sa.Column('parallel_cluster_id', sa.Integer(), nullable=True))
+    # Partial: most hadiths have no parallel, only clustered rows are looked up
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_hadiths_parallel_cluster_id
+        ON hadiths (parallel_cluster_id)
+        WHERE parallel_cluster_id IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    """Remove hadiths.parallel_cluster_id."""
+    op.execute("DROP INDEX IF EXISTS ix_hadiths_parallel_cluster_id")
+    op.drop_column('hadiths', 'parallel_cluster_id')
@@ -0,0 +1,37 @@
+"""Add precomputed similar hadiths table
+
+Revision ID: add_hadith_similar
+Revises: add_narrator_index
+Create Date: 2025-07-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_hadith_similar'
+down_revision = 'add_narrator_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create hadith_similar (filled offline by scripts/compute_similar_hadiths.py)."""
+    op.create_table('hadith_similar',
+        sa.Column('hadith_id', sa.Integer(), nullable=False),
+        sa.Column('rank', sa.Integer(), nullable=False),
+        sa.Column('similar_hadith_id', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['hadith_id'], ['hadiths.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['similar_hadith_id'], ['hadiths.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('hadith_id', 'rank')
+    )
+    # Needed for the ON DELETE CASCADE of the referenced side
+    op.create_index('ix_hadith_similar_similar', 'hadith_similar', ['similar_hadith_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Drop hadith_similar."""
+    op.drop_index('ix_hadith_similar_similar', table_name='hadith_similar')
+    op.drop_table('hadith_similar')
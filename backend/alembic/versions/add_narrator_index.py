@@ -0,0 +1,71 @@
+"""Add narrator (isnad) index tables
+
+Revision ID: add_narrator_index
+Revises: add_french_search_vector
+Create Date: 2025-07-16 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_narrator_index'
+down_revision = 'add_french_search_vector'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create narrators, hadith_narrators and narrator_links."""
+    op.create_table('narrators',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=200), nullable=False),
+        sa.Column('normalized_name', sa.String(length=200), nullable=False),
+        sa.Column('language', sa.String(length=2), nullable=False),
+        sa.Column('hadith_count', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_narrators_id'), 'narrators', ['id'], unique=False)
+    op.create_index('ix_narrator_language_name', 'narrators', ['language', 'normalized_name'], unique=True)
+    op.create_index('ix_narrator_hadith_count', 'narrators', ['hadith_count'], unique=False)
+    
+    # Prefix lookups (LIKE 'abu hur%') regardless of the database collation
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_narrator_name_pattern
+        ON narrators (language, normalized_name varchar_pattern_ops)
+    """)
+    
+    op.create_table('hadith_narrators',
+        sa.Column('hadith_id', sa.Integer(), nullable=False),
+        sa.Column('language', sa.String(length=2), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('narrator_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['hadith_id'], ['hadiths.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['narrator_id'], ['narrators.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('hadith_id', 'language', 'position')
+    )
+    op.create_index('ix_hadith_narrator_narrator', 'hadith_narrators', ['narrator_id', 'hadith_id'], unique=False)
+    
+    op.create_table('narrator_links',
+        sa.Column('narrator_id', sa.Integer(), nullable=False),
+        sa.Column('teacher_id', sa.Integer(), nullable=False),
+        sa.Column('hadith_count', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['narrator_id'], ['narrators.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['teacher_id'], ['narrators.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('narrator_id', 'teacher_id')
+    )
+    op.create_index('ix_narrator_link_teacher', 'narrator_links', ['teacher_id', 'narrator_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_narrator_link_teacher', table_name='narrator_links')
+    op.drop_table('narrator_links')
+    op.drop_index('ix_hadith_narrator_narrator', table_name='hadith_narrators')
+    op.drop_table('hadith_narrators')
+    op.execute("DROP INDEX IF EXISTS idx_narrator_name_pattern")
+    op.drop_index('ix_narrator_hadith_count', table_name='narrators')
+    op.drop_index('ix_narrator_language_name', table_name='narrators')
+    op.drop_index(op.f('ix_narrators_id'), table_name='narrators')
+    op.drop_table('narrators')
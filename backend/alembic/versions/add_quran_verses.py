@@ -0,0 +1,49 @@
+"""Add quran_verses table with full-text search vector
+
+Revision ID: add_quran_verses
+Revises: add_hadith_parallel_clusters
+Create Date: 2025-07-21 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_quran_verses'
+down_revision = 'add_hadith_parallel_clusters'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create quran_verses (filled by scripts/import_quran.py)."""
+    # The application's create_all may have created the table already,
+    # without search_vector before the model declared it
+    if not sa.inspect(op.get_bind()).has_table('quran_verses'):
+        op.create_table('quran_verses',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('edition', sa.String(length=30), nullable=False),
+            sa.Column('surah', sa.Integer(), nullable=False),
+            sa.Column('ayah', sa.Integer(), nullable=False),
+            sa.Column('text', sa.Text(), nullable=False),
+            sa.Column('search_text', sa.Text(), nullable=False),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_quran_verses_id'), 'quran_verses', ['id'], unique=False)
+        op.create_index('ix_quran_verse_edition_surah_ayah', 'quran_verses', ['edition', 'surah', 'ayah'], unique=True)
+    
+    # Written by the importer with the edition's text search configuration
+    op.execute("ALTER TABLE quran_verses ADD COLUMN IF NOT EXISTS search_vector tsvector")
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_quran_verses_fts
+        ON quran_verses USING gin (search_vector)
+    """)
+
+
+def downgrade() -> None:
+    """Drop quran_verses."""
+    op.execute("DROP INDEX IF EXISTS idx_quran_verses_fts")
+    op.drop_index('ix_quran_verse_edition_surah_ayah', table_name='quran_verses')
+    op.drop_index(op.f('ix_quran_verses_id'), table_name='quran_verses')
+    op.drop_table('quran_verses')
@@ -0,0 +1,56 @@
+"""Add search index watermark table for incremental rebuilds
+
+Revision ID: add_search_index_state
+Revises: add_performance_indexes
+Create Date: 2025-07-14 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_search_index_state'
+down_revision = 'add_performance_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Track the last indexed modification time of the hadiths table."""
+    op.create_table('search_index_state',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('watermark', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('mode', sa.String(length=20), nullable=True),
+        sa.Column('total_rows', sa.Integer(), nullable=True),
+        sa.Column('processed_rows', sa.Integer(), nullable=True),
+        sa.Column('last_id', sa.Integer(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_search_index_state_id'), 'search_index_state', ['id'], unique=False)
+    op.create_index(op.f('ix_search_index_state_name'), 'search_index_state', ['name'], unique=True)
+
+    # Incremental rebuilds select rows by their last modification time
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_hadith_modified_at
+        ON hadiths ((COALESCE(updated_at, created_at)), id)
+    """)
+
+    # Vectors were fully populated by add_performance_indexes
+    op.execute("""
+        INSERT INTO search_index_state (name, watermark, status, total_rows, processed_rows, last_id)
+        VALUES ('hadiths', now(), 'idle', 0, 0, 0)
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_hadith_modified_at")
+    op.drop_index(op.f('ix_search_index_state_name'), table_name='search_index_state')
+    op.drop_index(op.f('ix_search_index_state_id'), table_name='search_index_state')
+    op.drop_table('search_index_state')
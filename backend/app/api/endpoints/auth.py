@@ -71,7 +71,7 @@ def login(
         )
     
     # Create tokens
-    access_token = create_access_token(data={"sub": user.email})
+    access_token = create_access_token(data={"sub": user.email, "uid": user.id})
     refresh_token = create_refresh_token(data={"sub": user.email})
     
     return {
@@ -101,7 +101,7 @@ def refresh_token(
         raise credentials_exception
     
     # Create new tokens
-    access_token = create_access_token(data={"sub": user.email})
+    access_token = create_access_token(data={"sub": user.email, "uid": user.id})
     refresh_token = create_refresh_token(data={"sub": user.email})
     
     return {
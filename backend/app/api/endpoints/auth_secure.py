@@ -1,9 +1,11 @@
+import logging
 from datetime import timedelta, datetime
 from typing import Any, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Response, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from app.core.config import settings
+from app.core.redis_manager import redis_manager
 from app.core.security import create_access_token, create_refresh_token, verify_password, get_password_hash
 from app.db import get_db
 from app.models import User
@@ -11,6 +13,7 @@ from app.schemas import UserCreate, UserResponse, Token
 from app.middleware.security import CSRFProtect, sanitize_input, validate_email, validate_password_strength
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 # Cookie settings
 COOKIE_DOMAIN = None  # Will use current domain
@@ -125,7 +128,7 @@ def login(
         )
     
     # Create tokens
-    access_token = create_access_token(data={"sub": user.email})
+    access_token = create_access_token(data={"sub": user.email, "uid": user.id})
     refresh_token = create_refresh_token(data={"sub": user.email})
     
     # Generate CSRF token
@@ -167,13 +170,14 @@ def login(
     )
     
     # Store CSRF token in Redis for validation
-    if hasattr(request.app.state, 'redis'):
-        redis_client = request.app.state.redis
-        redis_client.setex(
+    try:
+        redis_manager.blocking.setex(
             f"csrf:{user.id}:{csrf_token}",
             86400,  # 24 hours
             "valid"
         )
+    except Exception as e:
+        logger.warning(f"CSRF token storage error: {e}")
     
     return {
         "message": "Login successful",
@@ -2,6 +2,9 @@ from typing import Any, List
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.api.deps import get_current_active_user
+from app.core.cache import cache
+from app.core.cache_tags import user_tag
+from app.core.redis_manager import run_async
 from app.db import get_db
 from app.models import User, Bookmark
 from app.schemas.bookmark import BookmarkCreate, BookmarkResponse
@@ -37,6 +40,7 @@ def create_bookmark(
     db.add(bookmark)
     db.commit()
     db.refresh(bookmark)
+    run_async(cache.invalidate_tags, [user_tag(current_user.id)])
     
     return bookmark
 
@@ -79,5 +83,6 @@ def delete_bookmark(
     
     db.delete(bookmark)
     db.commit()
+    run_async(cache.invalidate_tags, [user_tag(current_user.id)])
     
     return {"message": "Bookmark deleted successfully"}
\ No newline at end of file
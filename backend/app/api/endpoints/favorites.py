@@ -2,6 +2,9 @@ from typing import Any, List
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.api.deps import get_current_active_user
+from app.core.cache import cache
+from app.core.cache_tags import user_tag
+from app.core.redis_manager import run_async
 from app.db import get_db
 from app.models import User, FavoriteVerse
 from app.schemas import FavoriteVerseCreate, FavoriteVerseResponse
@@ -36,6 +39,7 @@ def save_favorite_verse(
     db.add(favorite)
     db.commit()
     db.refresh(favorite)
+    run_async(cache.invalidate_tags, [user_tag(current_user.id)])
     
     return favorite
 
@@ -74,5 +78,6 @@ def delete_favorite_verse(
     
     db.delete(favorite)
     db.commit()
+    run_async(cache.invalidate_tags, [user_tag(current_user.id)])
     
     return {"message": "Favorite removed successfully"}
\ No newline at end of file
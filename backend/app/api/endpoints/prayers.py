@@ -4,7 +4,11 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_
 from app.api.deps import get_current_active_user
+from app.core.cache import cache
+from app.core.cache_tags import user_tag
+from app.core.redis_manager import run_async
 from app.db import get_db
+from app.db.query_tracker import query_budget
 from app.models import User, PrayerLog
 from app.schemas import PrayerLogCreate, PrayerLogResponse, PrayerStats
 
@@ -25,6 +29,7 @@ def log_prayer(
     db.add(prayer_log)
     db.commit()
     db.refresh(prayer_log)
+    run_async(cache.invalidate_tags, [user_tag(current_user.id)])
     
     return prayer_log
 
@@ -43,6 +48,7 @@ def get_prayer_logs(
     return prayers
 
 @router.get("/stats", response_model=PrayerStats)
+@query_budget(3)  # Current user, counts, most consistent prayer
 def get_prayer_stats(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -53,28 +59,15 @@ def get_prayer_stats(
     week_ago = now - timedelta(days=7)
     month_ago = now - timedelta(days=30)
     
-    # Total prayers
-    total_prayers = db.query(PrayerLog).filter(
+    # Total, today, this week and this month in one pass over the user's logs
+    total_prayers, prayers_today, prayers_this_week, prayers_this_month = db.query(
+        func.count(PrayerLog.id),
+        func.count(PrayerLog.id).filter(func.date(PrayerLog.prayed_at) == today),
+        func.count(PrayerLog.id).filter(PrayerLog.prayed_at >= week_ago),
+        func.count(PrayerLog.id).filter(PrayerLog.prayed_at >= month_ago)
+    ).filter(
         PrayerLog.user_id == current_user.id
-    ).count()
-    
-    # Prayers today
-    prayers_today = db.query(PrayerLog).filter(
-        PrayerLog.user_id == current_user.id,
-        func.date(PrayerLog.prayed_at) == today
-    ).count()
-    
-    # Prayers this week
-    prayers_this_week = db.query(PrayerLog).filter(
-        PrayerLog.user_id == current_user.id,
-        PrayerLog.prayed_at >= week_ago
-    ).count()
-    
-    # Prayers this month
-    prayers_this_month = db.query(PrayerLog).filter(
-        PrayerLog.user_id == current_user.id,
-        PrayerLog.prayed_at >= month_ago
-    ).count()
+    ).one()
     
     # Most consistent prayer
     most_consistent = db.query(
@@ -3,6 +3,9 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from app.api.deps import get_current_active_user
+from app.core.cache import cache
+from app.core.cache_tags import user_tag
+from app.core.redis_manager import run_async
 from app.db import get_db
 from app.models import User, ZakatCalculation
 from app.schemas import ZakatCalculationCreate, ZakatCalculationResponse
@@ -89,6 +92,7 @@ def save_zakat_calculation(
     db.add(calculation)
     db.commit()
     db.refresh(calculation)
+    run_async(cache.invalidate_tags, [user_tag(current_user.id)])
     
     return calculation
 
@@ -0,0 +1,28 @@
+"""
+Cache administration endpoints
+"""
+from fastapi import APIRouter, Depends, Query
+
+from app.api import deps
+from app.core.cache import cache
+from app.middleware.cache import get_cache_stats
+
+router = APIRouter()
+
+
+@router.get("/stats")
+async def get_cache_usage(
+    top: int = Query(20, ge=1, le=200, description="Number of most hit keys"),
+    current_user = Depends(deps.get_current_superuser)
+):
+    """
+    Get cache usage (admin only).
+    
+    Returns the most hit keys, entries and bytes per key prefix (route
+    template for HTTP responses) and hit ratios per tier. Figures are kept
+    up to date on every write and flushed every few seconds, so this never
+    scans the keyspace.
+    """
+    stats = await get_cache_stats(top)
+    stats["values"] = cache.stats()
+    return stats
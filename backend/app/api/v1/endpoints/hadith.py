@@ -1,16 +1,21 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, contains_eager, selectinload
 from sqlalchemy import or_, and_, func
 
 from app import models
 from app.schemas import hadith as schemas
 from app.api import deps
 from app.core.config import settings
+from app.core.cache import cache
+from app.core.cache_tags import hadith_tag
+from app.core.redis_manager import run_async
+from app.db.query_tracker import query_budget
 from app.services.hadith_import import HadithImporter
 from app.services.hadith_audio import HadithAudioService
 from app.services.hadith_export import export_hadiths_to_pdf
 from app.services.search_service import SearchService
+from app.services.narrator_index import normalize_narrator_name
 from fastapi.responses import StreamingResponse
 
 router = APIRouter()
@@ -242,13 +247,18 @@ def get_collection_hadiths_paginated(
 
 
 @router.get("/categories", response_model=List[schemas.HadithCategory])
+@query_budget(5)  # Roots, then one query per level of subcategories
 def get_hadith_categories(
     db: Session = Depends(deps.get_db)
 ) -> List[models.HadithCategory]:
     """
     Retrieve all hadith categories.
     """
-    categories = db.query(models.HadithCategory).filter(
+    # The response serializes the whole tree: load it level by level
+    # instead of one lazy load per category
+    categories = db.query(models.HadithCategory).options(
+        selectinload(models.HadithCategory.subcategories, recursion_depth=-1)
+    ).filter(
         models.HadithCategory.parent_id == None
     ).all()
     return categories
@@ -300,25 +310,34 @@ def get_category_hadiths(
 
 
 @router.get("/stats")
+@query_budget(2)
 def get_hadith_stats(db: Session = Depends(deps.get_db)):
     """
     Get hadith statistics.
     """
     total_count = db.query(models.Hadith).count()
-    collections = db.query(models.HadithCollection).all()
+    # One grouped count rather than one count per collection
+    collections = db.query(
+        models.HadithCollection.collection_id,
+        models.HadithCollection.name,
+        func.count(models.Hadith.id)
+    ).outerjoin(
+        models.Hadith, models.Hadith.collection_id == models.HadithCollection.id
+    ).group_by(
+        models.HadithCollection.id
+    ).order_by(
+        models.HadithCollection.id
+    ).all()
     
     stats = {
         "total_hadiths": total_count,
         "collections": []
     }
     
-    for collection in collections:
-        count = db.query(models.Hadith).filter(
-            models.Hadith.collection_id == collection.id
-        ).count()
+    for collection_id, name, count in collections:
         stats["collections"].append({
-            "collection_id": collection.collection_id,
-            "name": collection.name,
+            "collection_id": collection_id,
+            "name": name,
             "hadith_count": count
         })
     
@@ -440,6 +459,129 @@ def search_hadiths_paginated(
     )
 
 
+@router.get("/narrators", response_model=List[schemas.Narrator])
+def get_narrators(
+    db: Session = Depends(deps.get_db),
+    query: Optional[str] = Query(None, description="Narrator name prefix"),
+    language: str = Query("en", description="Chain language: en, ar"),
+    skip: int = 0,
+    limit: int = Query(50, le=200)
+) -> List[models.Narrator]:
+    """
+    List narrators by number of hadiths narrated.
+    """
+    narrator_query = db.query(models.Narrator).filter(
+        models.Narrator.language == language
+    )
+    
+    if query:
+        prefix = normalize_narrator_name(query, language)
+        narrator_query = narrator_query.filter(
+            models.Narrator.normalized_name.like(f"{prefix}%")
+        )
+    
+    return narrator_query.order_by(
+        models.Narrator.hadith_count.desc()
+    ).offset(skip).limit(limit).all()
+
+
+@router.get("/narrators/{narrator_id}", response_model=schemas.Narrator)
+def get_narrator(
+    narrator_id: int,
+    db: Session = Depends(deps.get_db)
+) -> models.Narrator:
+    """
+    Get a specific narrator by ID.
+    """
+    narrator = db.query(models.Narrator).filter(models.Narrator.id == narrator_id).first()
+    
+    if not narrator:
+        raise HTTPException(status_code=404, detail="Narrator not found")
+    
+    return narrator
+
+
+@router.get("/narrators/{narrator_id}/hadiths", response_model=schemas.PaginatedHadiths)
+def get_narrator_hadiths(
+    narrator_id: int,
+    db: Session = Depends(deps.get_db),
+    page: int = Query(1, ge=1),
+    per_page: int = Query(20, ge=1, le=100)
+) -> schemas.PaginatedHadiths:
+    """
+    Get all hadiths narrated by a narrator.
+    """
+    narrator = db.query(models.Narrator).filter(models.Narrator.id == narrator_id).first()
+    
+    if not narrator:
+        raise HTTPException(status_code=404, detail="Narrator not found")
+    
+    hadith_ids = db.query(models.HadithNarrator.hadith_id).filter(
+        models.HadithNarrator.narrator_id == narrator_id
+    ).distinct()
+    
+    query = db.query(models.Hadith).filter(models.Hadith.id.in_(hadith_ids))
+    
+    # hadith_count is maintained by the narrator index
+    total = narrator.hadith_count or 0
+    
+    skip = (page - 1) * per_page
+    hadiths = query.order_by(
+        models.Hadith.collection_id, models.Hadith.hadith_number
+    ).offset(skip).limit(per_page).all()
+    pages = (total + per_page - 1) // per_page
+    
+    return schemas.PaginatedHadiths(
+        hadiths=hadiths,
+        total=total,
+        page=page,
+        per_page=per_page,
+        pages=pages
+    )
+
+
+@router.get("/narrators/{narrator_id}/teachers", response_model=List[schemas.NarratorLink])
+def get_narrator_teachers(
+    narrator_id: int,
+    db: Session = Depends(deps.get_db),
+    limit: int = Query(50, le=200)
+) -> List[schemas.NarratorLink]:
+    """
+    Get the narrators this narrator narrated from.
+    """
+    rows = db.query(models.Narrator, models.NarratorLink.hadith_count).join(
+        models.NarratorLink, models.NarratorLink.teacher_id == models.Narrator.id
+    ).filter(
+        models.NarratorLink.narrator_id == narrator_id
+    ).order_by(models.NarratorLink.hadith_count.desc()).limit(limit).all()
+    
+    return [
+        schemas.NarratorLink(narrator=narrator, hadith_count=count)
+        for narrator, count in rows
+    ]
+
+
+@router.get("/narrators/{narrator_id}/students", response_model=List[schemas.NarratorLink])
+def get_narrator_students(
+    narrator_id: int,
+    db: Session = Depends(deps.get_db),
+    limit: int = Query(50, le=200)
+) -> List[schemas.NarratorLink]:
+    """
+    Get the narrators who narrated from this narrator.
+    """
+    rows = db.query(models.Narrator, models.NarratorLink.hadith_count).join(
+        models.NarratorLink, models.NarratorLink.narrator_id == models.Narrator.id
+    ).filter(
+        models.NarratorLink.teacher_id == narrator_id
+    ).order_by(models.NarratorLink.hadith_count.desc()).limit(limit).all()
+    
+    return [
+        schemas.NarratorLink(narrator=narrator, hadith_count=count)
+        for narrator, count in rows
+    ]
+
+
 @router.get("/daily", response_model=schemas.Hadith)
 def get_daily_hadith(
     db: Session = Depends(deps.get_db)
@@ -483,20 +625,59 @@ def get_daily_hadith(
     return hadith
 
 
-@router.get("/{hadith_id}", response_model=schemas.Hadith)
+@router.get("/{hadith_id}", response_model=schemas.HadithDetail)
 def get_hadith(
     hadith_id: int,
     db: Session = Depends(deps.get_db)
-) -> models.Hadith:
+) -> schemas.HadithDetail:
     """
-    Get a specific hadith by ID.
+    Get a specific hadith by ID, with its parallel narrations in other collections.
     """
     hadith = db.query(models.Hadith).filter(models.Hadith.id == hadith_id).first()
     
     if not hadith:
         raise HTTPException(status_code=404, detail="Hadith not found")
     
-    return hadith
+    parallels = []
+    if hadith.parallel_cluster_id is not None:
+        parallels = db.query(models.Hadith).join(
+            models.Hadith.collection
+        ).options(
+            contains_eager(models.Hadith.collection)
+        ).filter(
+            models.Hadith.parallel_cluster_id == hadith.parallel_cluster_id,
+            models.Hadith.id != hadith.id
+        ).order_by(models.Hadith.collection_id, models.Hadith.hadith_number).all()
+    
+    detail = schemas.HadithDetail.model_validate(hadith)
+    detail.parallel_narrations = [
+        schemas.ParallelNarration.model_validate(parallel) for parallel in parallels
+    ]
+    return detail
+
+
+@router.get("/{hadith_id}/similar", response_model=List[schemas.SimilarHadith])
+def get_similar_hadiths(
+    hadith_id: int,
+    db: Session = Depends(deps.get_db),
+    limit: int = Query(10, ge=1, le=50)
+) -> List[schemas.SimilarHadith]:
+    """
+    Get hadiths with similar wording, from the precomputed TF-IDF neighbours.
+    """
+    rows = db.query(models.Hadith, models.HadithSimilar.score).join(
+        models.HadithSimilar, models.HadithSimilar.similar_hadith_id == models.Hadith.id
+    ).filter(
+        models.HadithSimilar.hadith_id == hadith_id
+    ).order_by(models.HadithSimilar.rank).limit(limit).all()
+    
+    if not rows and not db.query(models.Hadith.id).filter(models.Hadith.id == hadith_id).first():
+        raise HTTPException(status_code=404, detail="Hadith not found")
+    
+    return [
+        schemas.SimilarHadith(hadith=hadith, score=score)
+        for hadith, score in rows
+    ]
 
 
 @router.post("/{hadith_id}/notes", response_model=schemas.HadithNote)
@@ -528,6 +709,7 @@ def create_hadith_note(
         existing_note.is_private = note.is_private
         db.commit()
         db.refresh(existing_note)
+        run_async(cache.invalidate_tags, [hadith_tag(hadith_id)])
         return existing_note
     
     # Create new note
@@ -539,6 +721,7 @@ def create_hadith_note(
     db.add(db_note)
     db.commit()
     db.refresh(db_note)
+    run_async(cache.invalidate_tags, [hadith_tag(hadith_id)])
     return db_note
 
 
@@ -592,6 +775,7 @@ def delete_hadith_note(
     
     db.delete(note)
     db.commit()
+    run_async(cache.invalidate_tags, [hadith_tag(hadith_id)])
     
     return {"detail": "Note deleted successfully"}
 
@@ -2,12 +2,13 @@
 Optimized hadith search endpoints using full-text search
 """
 from typing import List, Optional
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from app.api import deps
 from app.schemas import hadith as schemas
 from app.services.search_service import SearchService
+from app.services.search_indexer import SearchIndexRebuilder, run_search_index_rebuild
 
 router = APIRouter()
 
@@ -33,6 +34,11 @@ def search_hadiths_optimized(
     - JSONB category filtering using GIN index
     - Efficient pagination
     
+    Query syntax:
+    - "exact phrase", -excluded, fasting OR prayer
+    - narrator:"abu huraira", ref:bukhari:52, book:2, collection:muslim, grade:sahih
+      (prefix with - to exclude)
+    
     Parameters:
     - query: Search terms (optional - returns all if empty)
     - language: Search language (english, arabic, french)
@@ -98,21 +104,41 @@ def get_popular_searches(
     ]
 
 
-@router.post("/search/rebuild-index")
+@router.post("/search/rebuild-index", status_code=202)
 def rebuild_search_index(
+    background_tasks: BackgroundTasks,
     db: Session = Depends(deps.get_db),
-    current_user = Depends(deps.get_current_superuser)
+    current_user = Depends(deps.get_current_superuser),
+    full: bool = Query(False, description="Rebuild every row into shadow columns and swap them in")
 ):
     """
     Rebuild search indexes (admin only).
     
-    Run this after bulk imports to update search vectors.
+    Run this after bulk imports to update search vectors. The rebuild runs
+    in the background in bounded batches; by default only hadiths modified
+    since the last rebuild are refreshed. Poll `/search/rebuild-index/status`
+    for progress.
     """
-    search_service = SearchService(db)
+    rebuilder = SearchIndexRebuilder()
     
-    search_service.rebuild_search_indexes()
+    if rebuilder.is_running(db):
+        raise HTTPException(status_code=409, detail="A search index rebuild is already running")
+    
+    background_tasks.add_task(run_search_index_rebuild, full)
     
     return {
-        "status": "success",
-        "message": "Search indexes rebuilt successfully"
-    }
\ No newline at end of file
+        "status": "processing",
+        "mode": "full" if full else "incremental",
+        "message": "Search index rebuild started in background"
+    }
+
+
+@router.get("/search/rebuild-index/status")
+def get_rebuild_search_index_status(
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_superuser)
+):
+    """
+    Get progress of the current or last search index rebuild (admin only).
+    """
+    return SearchIndexRebuilder().get_status(db)
@@ -1,9 +1,14 @@
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 from datetime import datetime
+from sqlalchemy.orm import Session
 import httpx
 
+from app.api import deps
+from app.schemas.validators import ALLOWED_QURAN_EDITIONS
+from app.services.quran_search import LANGUAGE_EDITIONS, QuranSearchService
+
 router = APIRouter()
 
 # Pydantic models
@@ -125,15 +130,25 @@ async def get_verse(surah_number: int, verse_number: int, edition: Optional[str]
     }
 
 @router.get("/search")
-async def search_quran(
-    q: str = Query(..., description="Search query"),
-    language: Optional[str] = Query("en", description="Language for search")
+def search_quran(
+    q: str = Query(..., min_length=1, max_length=200, description="Search query"),
+    language: Optional[str] = Query("en", description="Language for search (used when no edition is given)"),
+    edition: Optional[str] = Query(None, description="Edition to search, e.g. quran-simple, en.sahih"),
+    surah: Optional[int] = Query(None, ge=1, le=114, description="Restrict to one surah"),
+    page: int = Query(1, ge=1),
+    per_page: int = Query(20, ge=1, le=100),
+    db: Session = Depends(deps.get_db)
 ):
-    """Search the Quran"""
-    # Mock search results
-    return {
-        "query": q,
-        "language": language,
-        "count": 0,
-        "results": []
-    }
\ No newline at end of file
+    """
+    Search the Quran.
+    
+    Arabic editions are matched on normalized text (tashkeel and letter
+    variants ignored); translations with their language's stemming.
+    Supports "exact phrase", -excluded and OR.
+    """
+    edition = edition or LANGUAGE_EDITIONS.get(language, "en.sahih")
+    if edition not in ALLOWED_QURAN_EDITIONS:
+        raise HTTPException(status_code=400, detail="Invalid edition specified")
+    
+    result = QuranSearchService(db).search(q, edition, page=page, per_page=per_page, surah=surah)
+    return {"language": language, **result}
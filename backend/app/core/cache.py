@@ -1,77 +1,160 @@
 """
 Redis caching utilities for performance optimization
 """
-import json
-import redis
-from typing import Optional, Any, Callable, Union
+from typing import Optional, Any, Callable, Iterable, Union
 from datetime import timedelta
 from functools import wraps
 import hashlib
-from app.core.config import settings
-
-# Initialize Redis client
-redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+import time
+from app.core.circuit_breaker import CircuitOpenError
+from app.core.cache_stats import key_hits, key_prefix, track_entry
+from app.core.cache_tags import invalidate_tags, register_tags, scan_delete, surah_tag, user_tag
+from app.core.local_cache import LocalLRUCache, TierStats, invalidate_local, publish_invalidation
+from app.core.redis_manager import RedisManager, redis_manager, run_async
+from app.core.serialization import ValueCodec, value_codec
+from app.core.singleflight import AsyncSingleFlight, DistributedSingleFlight
+from app.monitoring.metrics import cache_lookup_duration_seconds
 
 class CacheManager:
-    """Centralized cache management"""
+    """
+    Centralized cache management (optional in-process L1 in front of Redis).
+    
+    Async, on the shared Redis pool; sync code goes through `run_async`.
+    Values are encoded by `codec` (msgpack / zstd by default).
+    """
     
-    def __init__(self, client: redis.Redis):
-        self.client = client
+    def __init__(
+        self,
+        redis: RedisManager,
+        local: Optional[LocalLRUCache] = None,
+        codec: Optional[ValueCodec] = None
+    ):
+        self.redis = redis
+        self.codec = codec or value_codec
         self.default_ttl = 3600  # 1 hour default
+        self.local = local
+        self.l1_stats = TierStats("value_l1")
+        self.l2_stats = TierStats("value_l2")
+    
+    @property
+    def client(self):
+        return self.redis.client
     
-    def get(self, key: str) -> Optional[Any]:
-        """Get value from cache"""
+    async def get(self, key: str) -> Optional[Any]:
+        """Get value from cache (L1 values are shared: treat them as read-only)"""
+        prefix = key_prefix(key)
+        start = time.perf_counter()
         try:
-            value = self.client.get(key)
-            if value:
-                return json.loads(value)
+            value = await self._lookup(key, prefix)
+        finally:
+            cache_lookup_duration_seconds.labels(cache_type="value", route=prefix).observe(
+                time.perf_counter() - start
+            )
+        if value is not None:
+            key_hits.record(key)
+        return value
+    
+    async def _lookup(self, key: str, prefix: str) -> Optional[Any]:
+        if self.local is not None:
+            value = self.local.get(key)
+            if value is not None:
+                self.l1_stats.hit(prefix)
+                return value
+            self.l1_stats.miss(prefix)
+        
+        try:
+            async with self.redis.pipeline() as pipe:
+                pipe.get(key)
+                pipe.pttl(key)
+                raw, pttl = await pipe.execute()
+            if not raw:
+                self.l2_stats.miss(prefix)
+                return None
+            
+            self.l2_stats.hit(prefix)
+            value = self.codec.loads(raw)
+            if self.local is not None:
+                self.local.set(key, value, len(raw), pttl / 1000 if pttl and pttl > 0 else None)
+            return value
+        except CircuitOpenError:
             return None
         except Exception as e:
             print(f"Cache get error: {e}")
             return None
     
-    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
-        """Set value in cache with TTL"""
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[int] = None,
+        tags: Optional[Iterable[str]] = None
+    ) -> bool:
+        """Set value in cache with TTL, registered under `tags` for invalidation"""
         try:
             ttl = ttl or self.default_ttl
-            return self.client.setex(
-                key,
-                ttl,
-                json.dumps(value, default=str)
-            )
+            raw = self.codec.dumps(value)
+            async with self.redis.pipeline() as pipe:
+                pipe.setex(key, ttl, raw)
+                if tags:
+                    register_tags(pipe, key, tags, ttl)
+                track_entry(pipe, key_prefix(key), key, len(raw), ttl)
+                stored = (await pipe.execute())[0]
+            if self.local is not None:
+                self.local.set(key, self.codec.loads(raw), len(raw), ttl)
+                # Other workers may hold the previous value
+                await publish_invalidation(self.client, keys=[key])
+            return stored
+        except CircuitOpenError:
+            return False
         except Exception as e:
             print(f"Cache set error: {e}")
             return False
     
-    def delete(self, key: str) -> bool:
+    async def delete(self, key: str) -> bool:
         """Delete key from cache"""
+        await self._invalidate_local(keys=[key])
         try:
-            return bool(self.client.delete(key))
+            return bool(await self.client.delete(key))
         except Exception as e:
             print(f"Cache delete error: {e}")
             return False
     
-    def delete_pattern(self, pattern: str) -> int:
-        """Delete all keys matching pattern"""
+    async def delete_pattern(self, pattern: str) -> int:
+        """Delete all keys matching pattern (SCAN, never KEYS; prefer tags)"""
+        await self._invalidate_local(patterns=[pattern])
         try:
-            keys = self.client.keys(pattern)
-            if keys:
-                return self.client.delete(*keys)
-            return 0
+            return await scan_delete(self.client, pattern)
         except Exception as e:
             print(f"Cache delete pattern error: {e}")
             return 0
     
-    def exists(self, key: str) -> bool:
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """Delete every entry registered under one of `tags`"""
+        return await invalidate_tags(self.client, tags)
+    
+    def stats(self) -> dict:
+        """Hit ratios per tier"""
+        tiers = {"l2": self.l2_stats.stats()}
+        if self.local is not None:
+            tiers["l1"] = {**self.l1_stats.stats(), **self.local.stats()}
+        return tiers
+    
+    async def _invalidate_local(self, keys=(), patterns=()) -> None:
+        if self.local is None:
+            return
+        invalidate_local(keys, patterns)
+        await publish_invalidation(self.client, keys, patterns)
+    
+    async def exists(self, key: str) -> bool:
         """Check if key exists"""
         try:
-            return bool(self.client.exists(key))
+            return bool(await self.client.exists(key))
         except Exception as e:
             print(f"Cache exists error: {e}")
             return False
 
 # Global cache instance
-cache = CacheManager(redis_client)
+cache = CacheManager(redis_manager, local=LocalLRUCache("values"))
 
 # Cache key generators
 def generate_cache_key(*args, prefix: str = "") -> str:
@@ -93,7 +176,14 @@ def cached(
     key_func: Optional[Callable] = None
 ):
     """Decorator to cache function results"""
+    # Convert timedelta to seconds
+    cache_ttl = int(ttl.total_seconds() if isinstance(ttl, timedelta) else ttl)
+    
     def decorator(func):
+        flight_name = prefix or func.__name__
+        sync_flight = DistributedSingleFlight(flight_name)
+        async_flight = AsyncSingleFlight(flight_name)
+        
         @wraps(func)
         async def async_wrapper(*args, **kwargs):
             # Generate cache key
@@ -106,18 +196,17 @@ def cached(
                 cache_key = f"{prefix}:{func_name}:{args_key}"
             
             # Try to get from cache
-            cached_value = cache.get(cache_key)
+            cached_value = await cache.get(cache_key)
             if cached_value is not None:
                 return cached_value
             
-            # Execute function and cache result
-            result = await func(*args, **kwargs)
+            # Execute function and cache result, once for concurrent callers
+            async def compute():
+                result = await func(*args, **kwargs)
+                await cache.set(cache_key, result, cache_ttl)
+                return result
             
-            # Convert timedelta to seconds
-            cache_ttl = ttl.total_seconds() if isinstance(ttl, timedelta) else ttl
-            cache.set(cache_key, result, int(cache_ttl))
-            
-            return result
+            return await async_flight.do(cache_key, compute)
         
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
@@ -131,18 +220,17 @@ def cached(
                 cache_key = f"{prefix}:{func_name}:{args_key}"
             
             # Try to get from cache
-            cached_value = cache.get(cache_key)
+            cached_value = run_async(cache.get, cache_key)
             if cached_value is not None:
                 return cached_value
             
-            # Execute function and cache result
-            result = func(*args, **kwargs)
-            
-            # Convert timedelta to seconds
-            cache_ttl = ttl.total_seconds() if isinstance(ttl, timedelta) else ttl
-            cache.set(cache_key, result, int(cache_ttl))
+            # Execute function and cache result, once across threads and workers
+            def compute():
+                result = func(*args, **kwargs)
+                run_async(cache.set, cache_key, result, cache_ttl)
+                return result
             
-            return result
+            return sync_flight.do(cache_key, compute, lambda: run_async(cache.get, cache_key))
         
         # Return appropriate wrapper based on function type
         import asyncio
@@ -158,101 +246,79 @@ class QuranCache:
     """Quran-specific caching"""
     
     @staticmethod
-    def cache_surah(surah_number: int, edition: str, data: dict, ttl: int = 86400):
+    async def cache_surah(surah_number: int, edition: str, data: dict, ttl: int = 86400):
         """Cache surah data (24 hours)"""
         key = f"quran:surah:{surah_number}:{edition}"
-        return cache.set(key, data, ttl)
+        return await cache.set(key, data, ttl, tags=[surah_tag(surah_number)])
     
     @staticmethod
-    def get_surah(surah_number: int, edition: str) -> Optional[dict]:
+    async def get_surah(surah_number: int, edition: str) -> Optional[dict]:
         """Get cached surah data"""
         key = f"quran:surah:{surah_number}:{edition}"
-        return cache.get(key)
+        return await cache.get(key)
     
     @staticmethod
-    def cache_verse(surah: int, ayah: int, edition: str, data: dict, ttl: int = 86400):
+    async def cache_verse(surah: int, ayah: int, edition: str, data: dict, ttl: int = 86400):
         """Cache verse data"""
         key = f"quran:verse:{surah}:{ayah}:{edition}"
-        return cache.set(key, data, ttl)
+        return await cache.set(key, data, ttl, tags=[surah_tag(surah)])
     
     @staticmethod
-    def invalidate_surah(surah_number: int):
+    async def invalidate_surah(surah_number: int):
         """Invalidate all cached data for a surah"""
-        pattern = f"quran:*:{surah_number}:*"
-        return cache.delete_pattern(pattern)
+        return await cache.invalidate_tags([surah_tag(surah_number)])
 
 class PrayerCache:
     """Prayer times caching"""
     
     @staticmethod
-    def cache_times(lat: float, lng: float, date: str, data: dict, ttl: int = 3600):
+    async def cache_times(lat: float, lng: float, date: str, data: dict, ttl: int = 3600):
         """Cache prayer times (1 hour)"""
         # Round coordinates to 2 decimal places for better cache hits
         lat_rounded = round(lat, 2)
         lng_rounded = round(lng, 2)
         key = f"prayer:times:{lat_rounded}:{lng_rounded}:{date}"
-        return cache.set(key, data, ttl)
+        return await cache.set(key, data, ttl)
     
     @staticmethod
-    def get_times(lat: float, lng: float, date: str) -> Optional[dict]:
+    async def get_times(lat: float, lng: float, date: str) -> Optional[dict]:
         """Get cached prayer times"""
         lat_rounded = round(lat, 2)
         lng_rounded = round(lng, 2)
         key = f"prayer:times:{lat_rounded}:{lng_rounded}:{date}"
-        return cache.get(key)
+        return await cache.get(key)
 
 class UserCache:
     """User-specific caching"""
     
     @staticmethod
-    def cache_user(user_id: int, data: dict, ttl: int = 300):
+    async def cache_user(user_id: int, data: dict, ttl: int = 300):
         """Cache user data (5 minutes)"""
         key = f"user:data:{user_id}"
-        return cache.set(key, data, ttl)
+        return await cache.set(key, data, ttl, tags=[user_tag(user_id)])
     
     @staticmethod
-    def get_user(user_id: int) -> Optional[dict]:
+    async def get_user(user_id: int) -> Optional[dict]:
         """Get cached user data"""
         key = f"user:data:{user_id}"
-        return cache.get(key)
+        return await cache.get(key)
     
     @staticmethod
-    def invalidate_user(user_id: int):
-        """Invalidate user cache"""
-        patterns = [
-            f"user:data:{user_id}",
-            f"user:favorites:{user_id}",
-            f"user:bookmarks:{user_id}",
-            f"user:history:{user_id}:*"
-        ]
-        total_deleted = 0
-        for pattern in patterns:
-            total_deleted += cache.delete_pattern(pattern)
-        return total_deleted
+    async def invalidate_user(user_id: int):
+        """Invalidate every entry tagged with the user (data, favorites, bookmarks, history)"""
+        return await cache.invalidate_tags([user_tag(user_id)])
 
 # Cache warming utilities
-async def warm_cache():
-    """Pre-populate cache with frequently accessed data"""
-    from app.services.quran_service import get_popular_surahs
-    from app.services.hadith_service import get_popular_collections
-    
-    # Warm popular Quran surahs
-    popular_surahs = [1, 2, 36, 67, 112, 114]  # Al-Fatiha, Al-Baqarah, Ya-Sin, etc.
-    editions = ['quran-simple', 'en.sahih', 'ar.muyassar']
-    
-    for surah in popular_surahs:
-        for edition in editions:
-            # This would call your actual API
-            # await get_surah_data(surah, edition)
-            pass
-    
-    print("Cache warming completed")
+async def warm_cache(reason: str = "manual") -> None:
+    """Ask the running API to pre-populate its response cache (see app.services.cache_warmer)"""
+    from app.services.cache_warmer import request_warmup
+    await request_warmup(redis_manager.client, reason)
 
 # Cache statistics
-def get_cache_stats() -> dict:
+async def get_cache_stats() -> dict:
     """Get cache statistics"""
     try:
-        info = redis_client.info()
+        info = await redis_manager.client.info()
         return {
             "used_memory": info.get("used_memory_human", "N/A"),
             "connected_clients": info.get("connected_clients", 0),
@@ -263,7 +329,8 @@ def get_cache_stats() -> dict:
                 info.get("keyspace_hits", 0) / 
                 (info.get("keyspace_hits", 0) + info.get("keyspace_misses", 1)) * 100, 
                 2
-            ) if info.get("keyspace_hits", 0) > 0 else 0
+            ) if info.get("keyspace_hits", 0) > 0 else 0,
+            "tiers": cache.stats()
         }
     except Exception as e:
         print(f"Error getting cache stats: {e}")
@@ -0,0 +1,184 @@
+"""
+Cache usage accounting: hits per key and memory per key prefix.
+
+Maintained incrementally, so reading it never walks the keyspace:
+
+- hits are counted in process and flushed periodically to a sorted set,
+  trimmed to the CACHE_STATS_TOP_KEYS most hit keys;
+- each store records the entry size and expiry under its prefix (in the
+  pipeline of the SETEX, no extra round trip); expired entries are
+  subtracted in bounded batches by the flusher.
+
+Entries deleted before they expire (tag invalidation) are still counted
+until their TTL would have elapsed.
+"""
+import asyncio
+import logging
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+STATS_PREFIX = "cache:stats:"
+HITS_KEY = f"{STATS_PREFIX}hits"
+BYTES_KEY = f"{STATS_PREFIX}bytes"
+ENTRIES_KEY = f"{STATS_PREFIX}entries"
+
+# Expired entries subtracted per prefix and per pass
+RECLAIM_BATCH_SIZE = 1000
+
+# KEYS: sizes, expiries, bytes, entries; ARGV: key, size, expire_at, prefix
+TRACK_SCRIPT = """
+local old = redis.call("hget", KEYS[1], ARGV[1])
+redis.call("hset", KEYS[1], ARGV[1], ARGV[2])
+redis.call("zadd", KEYS[2], ARGV[3], ARGV[1])
+redis.call("hincrby", KEYS[3], ARGV[4], tonumber(ARGV[2]) - tonumber(old or 0))
+if not old then
+    redis.call("hincrby", KEYS[4], ARGV[4], 1)
+end
+return 1
+"""
+
+# KEYS: sizes, expiries, bytes, entries; ARGV: now, limit, prefix
+RECLAIM_SCRIPT = """
+local expired = redis.call("zrangebyscore", KEYS[2], "-inf", ARGV[1], "LIMIT", 0, tonumber(ARGV[2]))
+if #expired == 0 then
+    return 0
+end
+local freed = 0
+for _, key in ipairs(expired) do
+    freed = freed + tonumber(redis.call("hget", KEYS[1], key) or 0)
+    redis.call("hdel", KEYS[1], key)
+end
+redis.call("zrem", KEYS[2], unpack(expired))
+redis.call("hincrby", KEYS[3], ARGV[3], -freed)
+redis.call("hincrby", KEYS[4], ARGV[3], -#expired)
+return #expired
+"""
+
+
+def key_prefix(key: str) -> str:
+    """Prefix of a value cache key (e.g. `quran:surah` for `quran:surah:1:en`)."""
+    return ":".join(key.split(":", 2)[:2])
+
+
+def _as_str(value) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+def _prefix_keys(prefix: str) -> List[str]:
+    return [
+        f"{STATS_PREFIX}sizes:{prefix}",
+        f"{STATS_PREFIX}expiries:{prefix}",
+        BYTES_KEY,
+        ENTRIES_KEY,
+    ]
+
+
+def track_entry(pipe, prefix: str, key: str, size: int, ttl: int) -> None:
+    """
+    Queue the accounting of a stored entry on a pipeline.
+
+    Args:
+        pipe: Redis pipeline (the one of the SETEX)
+        prefix: Key prefix, or route template for responses
+        key: Cache key
+        size: Stored size in bytes
+        ttl: Entry TTL in seconds
+    """
+    pipe.eval(TRACK_SCRIPT, 4, *_prefix_keys(prefix), key, int(size), int(time.time() + ttl), prefix)
+
+
+class KeyHits:
+    """Hits per key, counted in process and flushed in one pipeline."""
+
+    def __init__(self):
+        self._counts: Counter = Counter()
+
+    def record(self, key: str) -> None:
+        self._counts[key] += 1
+
+    async def flush(self, client, keep: Optional[int] = None) -> int:
+        """
+        Add the pending counts to the shared ranking.
+
+        Returns:
+            Number of keys flushed
+        """
+        counts, self._counts = self._counts, Counter()
+        if not counts:
+            return 0
+        keep = keep or settings.CACHE_STATS_TOP_KEYS
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                for key, hits in counts.items():
+                    pipe.zincrby(HITS_KEY, hits, key)
+                pipe.zremrangebyrank(HITS_KEY, 0, -keep - 1)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Cache hit counts not flushed: {e}")
+        return len(counts)
+
+
+key_hits = KeyHits()
+
+
+async def reclaim_expired(client) -> int:
+    """Subtract expired entries from the memory per prefix (bounded per prefix)."""
+    prefixes = [_as_str(prefix) for prefix in await client.hkeys(ENTRIES_KEY)]
+    if not prefixes:
+        return 0
+    now = time.time()
+    async with client.pipeline(transaction=False) as pipe:
+        for prefix in prefixes:
+            pipe.eval(RECLAIM_SCRIPT, 4, *_prefix_keys(prefix), now, RECLAIM_BATCH_SIZE, prefix)
+        return sum(await pipe.execute())
+
+
+async def cache_usage(client, top: int = 20) -> Dict[str, Any]:
+    """
+    Top keys by hits and memory per prefix.
+
+    Args:
+        client: Async Redis client
+        top: Number of keys to return
+
+    Returns:
+        {"prefixes": [{prefix, entries, bytes}], "top_keys": [{key, hits}]}
+    """
+    await reclaim_expired(client)
+    async with client.pipeline(transaction=False) as pipe:
+        pipe.hgetall(BYTES_KEY)
+        pipe.hgetall(ENTRIES_KEY)
+        pipe.zrevrange(HITS_KEY, 0, top - 1, withscores=True)
+        sizes, entries, ranking = await pipe.execute()
+
+    entries = {_as_str(prefix): int(count) for prefix, count in entries.items()}
+    prefixes = [
+        {"prefix": prefix, "entries": entries.get(prefix, 0), "bytes": int(size)}
+        for prefix, size in ((_as_str(prefix), size) for prefix, size in sizes.items())
+        if entries.get(prefix, 0) > 0
+    ]
+    prefixes.sort(key=lambda item: item["bytes"], reverse=True)
+    return {
+        "prefixes": prefixes,
+        "top_keys": [{"key": _as_str(key), "hits": int(hits)} for key, hits in ranking],
+    }
+
+
+async def run_stats_flusher(get_client, interval: Optional[float] = None) -> None:
+    """Flush hit counts and reclaim expired entries periodically, until cancelled."""
+    interval = interval or settings.CACHE_STATS_FLUSH_INTERVAL
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            client = get_client()
+            await key_hits.flush(client)
+            await reclaim_expired(client)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Cache stats flush failed: {e}")
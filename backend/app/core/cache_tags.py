@@ -0,0 +1,143 @@
+"""
+Tag-based cache invalidation.
+
+Cached entries are registered under tags such as `collection:bukhari`,
+`hadith:123` or `user:42`. A tag is a Redis set of the keys carrying it and
+expires no earlier than its longest-lived member, so the sets clean
+themselves up. Invalidating tags pops their sets atomically and deletes the
+members in one pipelined call: no `KEYS`, no keyspace scan.
+"""
+import logging
+from typing import Iterable, List, Set
+
+from app.core.local_cache import invalidate_local, publish_invalidation
+
+logger = logging.getLogger(__name__)
+
+TAG_PREFIX = "cache:tag:"
+
+# Every response derived from the hadith corpus as a whole (collection list,
+# categories, search, daily hadith, narrators, stats)
+HADITH_CORPUS_TAG = "hadiths"
+
+# Keys per UNLINK / SCAN round trip
+DELETE_BATCH_SIZE = 500
+
+# SADD the key to each tag set and extend the set TTL to the entry TTL
+REGISTER_SCRIPT = """
+for _, tag_key in ipairs(KEYS) do
+    redis.call("sadd", tag_key, ARGV[1])
+    if redis.call("ttl", tag_key) < tonumber(ARGV[2]) then
+        redis.call("expire", tag_key, ARGV[2])
+    end
+end
+return #KEYS
+"""
+
+
+def collection_tag(collection_id: str) -> str:
+    return f"collection:{collection_id}"
+
+
+def hadith_tag(hadith_id: int) -> str:
+    return f"hadith:{hadith_id}"
+
+
+def surah_tag(surah_number: int) -> str:
+    return f"surah:{surah_number}"
+
+
+def user_tag(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def tag_key(tag: str) -> str:
+    return f"{TAG_PREFIX}{tag}"
+
+
+def register_tags(pipe, key: str, tags: Iterable[str], ttl: int) -> None:
+    """
+    Queue the registration of `key` under `tags` on a pipeline.
+
+    Queue it next to the SETEX of the entry so both go in the same round
+    trip.
+
+    Args:
+        pipe: Redis pipeline
+        key: Cache key
+        tags: Tags of the entry
+        ttl: Entry TTL in seconds
+    """
+    tag_keys = [tag_key(tag) for tag in dict.fromkeys(tags)]
+    if tag_keys:
+        pipe.eval(REGISTER_SCRIPT, len(tag_keys), *tag_keys, key, int(ttl))
+
+
+def _as_str(key) -> str:
+    return key.decode("utf-8") if isinstance(key, bytes) else key
+
+
+def _batches(keys: List[str]) -> Iterable[List[str]]:
+    for start in range(0, len(keys), DELETE_BATCH_SIZE):
+        yield keys[start:start + DELETE_BATCH_SIZE]
+
+
+def _tagged_keys(results: list) -> List[str]:
+    members: Set[str] = set()
+    for result in results[:-1]:
+        members.update(_as_str(member) for member in result)
+    return sorted(members)
+
+
+async def invalidate_tags(client, tags: Iterable[str]) -> int:
+    """
+    Delete every entry registered under one of `tags`.
+
+    Also drops the keys from the L1 caches of every worker.
+
+    Returns:
+        Number of entries deleted from Redis
+    """
+    tag_keys = [tag_key(tag) for tag in dict.fromkeys(tags)]
+    if not tag_keys:
+        return 0
+
+    try:
+        async with client.pipeline(transaction=True) as pipe:
+            for key in tag_keys:
+                pipe.smembers(key)
+            pipe.delete(*tag_keys)
+            keys = _tagged_keys(await pipe.execute())
+
+        deleted = 0
+        if keys:
+            async with client.pipeline(transaction=False) as pipe:
+                for batch in _batches(keys):
+                    pipe.unlink(*batch)
+                deleted = sum(await pipe.execute())
+    except Exception as e:
+        logger.error(f"Cache tag invalidation failed for {tag_keys}: {e}")
+        return 0
+
+    if keys:
+        invalidate_local(keys)
+        await publish_invalidation(client, keys=keys)
+    return deleted
+
+
+async def scan_delete(client, pattern: str) -> int:
+    """
+    Delete keys matching a glob pattern with SCAN + UNLINK.
+
+    Prefer tags: this still walks the keyspace, only without blocking Redis.
+    """
+    deleted = 0
+    batch: List[str] = []
+    async for key in client.scan_iter(match=pattern, count=DELETE_BATCH_SIZE):
+        batch.append(key)
+        if len(batch) >= DELETE_BATCH_SIZE:
+            deleted += await client.unlink(*batch)
+            batch = []
+    if batch:
+        deleted += await client.unlink(*batch)
+    return deleted
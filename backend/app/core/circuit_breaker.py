@@ -0,0 +1,155 @@
+"""
+Circuit breaker for shared dependencies (Redis).
+
+While the dependency answers, the circuit is closed and calls go through.
+After `failure_threshold` consecutive connection failures or timeouts it
+opens: calls are rejected immediately with CircuitOpenError, so callers
+take their degraded path without waiting out a timeout. After
+`recovery_timeout` one call is let through (half-open): its success closes
+the circuit, its failure opens it again for another recovery period.
+
+Only connection-level errors count: a command error means the dependency
+answered.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, Type
+
+from app.monitoring.metrics import (
+    circuit_breaker_rejected,
+    circuit_breaker_state,
+    circuit_breaker_transitions,
+)
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+# Gauge values
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """Call rejected without being attempted: the circuit is open."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        recovery_timeout: float,
+        failure_exceptions: Tuple[Type[BaseException], ...] = (ConnectionError, TimeoutError, OSError),
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.failure_exceptions = failure_exceptions
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.last_error: Optional[str] = None
+
+        circuit_breaker_state.labels(name=name).set(STATE_VALUES[CLOSED])
+
+    @property
+    def state(self) -> str:
+        """Current state; an open circuit past its recovery timeout reads half-open."""
+        if self._state == OPEN and self._clock() - self._opened_at >= self.recovery_timeout:
+            return HALF_OPEN
+        return self._state
+
+    @property
+    def is_open(self) -> bool:
+        """Whether calls are currently rejected (callers can skip the dependency)."""
+        state = self.state
+        return state == OPEN or (state == HALF_OPEN and self._probing)
+
+    def before_call(self) -> None:
+        """
+        Admit a call, or reject it.
+
+        Raises:
+            CircuitOpenError: circuit open, or half-open with a probe in flight
+        """
+        with self._lock:
+            state = self.state
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and not self._probing:
+                self._probing = True
+                self._transition(HALF_OPEN)
+                return
+        circuit_breaker_rejected.labels(name=self.name).inc()
+        raise CircuitOpenError(f"{self.name} circuit is open ({self.last_error})")
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+            if self._state != CLOSED:
+                logger.info(f"{self.name} circuit closed: calls succeed again")
+                self._transition(CLOSED)
+
+    def record_failure(self, error: BaseException) -> None:
+        with self._lock:
+            self._failures += 1
+            self.last_error = str(error) or type(error).__name__
+            if self._probing or (self._state == CLOSED and self._failures >= self.failure_threshold):
+                self._probing = False
+                self._opened_at = self._clock()
+                if self._state != OPEN:
+                    logger.warning(
+                        f"{self.name} circuit opened after {self._failures} failures: {self.last_error}"
+                    )
+                self._transition(OPEN)
+
+    def release(self) -> None:
+        """End a call that neither succeeded nor failed (cancelled)."""
+        with self._lock:
+            self._probing = False
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        """
+        Run the enclosed call through the breaker.
+
+        Raises:
+            CircuitOpenError: the call was not attempted
+        """
+        self.before_call()
+        try:
+            yield
+        except self.failure_exceptions as e:
+            self.record_failure(e)
+            raise
+        except BaseException:
+            # Cancelled, or an error from a dependency that did answer
+            self.release()
+            raise
+        else:
+            self.record_success()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "last_error": self.last_error,
+        }
+
+    def _transition(self, state: str) -> None:
+        if state != self._state:
+            circuit_breaker_transitions.labels(name=self.name, state=state).inc()
+        self._state = state
+        circuit_breaker_state.labels(name=self.name).set(STATE_VALUES[state])
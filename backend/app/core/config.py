@@ -13,10 +13,39 @@ class Settings(BaseSettings):
     DATABASE_URL: str = os.getenv("DATABASE_URL", "")
     if not DATABASE_URL:
         raise ValueError("DATABASE_URL environment variable is required")
+    # Worker threads for sync endpoints; the pool holds one connection per thread
+    # unless DB_POOL_SIZE is set
+    THREADPOOL_SIZE: int = int(os.getenv("THREADPOOL_SIZE", "40"))
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "0"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+    # Per-session planner settings (name=value, comma-separated; validated at startup)
+    DB_SESSION_PARAMS: str = os.getenv(
+        "DB_SESSION_PARAMS",
+        "jit=on,random_page_cost=1.1,effective_cache_size=4GB,work_mem=16MB,maintenance_work_mem=128MB"
+    )
+    # Per-request query tracking: Server-Timing header, metrics, N+1 warnings once a
+    # statement repeats this often; exceeding a declared @query_budget raises in
+    # development and test, and is logged elsewhere
+    QUERY_SERVER_TIMING: bool = os.getenv("QUERY_SERVER_TIMING", "true").lower() == "true"
+    QUERY_REPEAT_THRESHOLD: int = int(os.getenv("QUERY_REPEAT_THRESHOLD", "5"))
+    QUERY_BUDGET_ENFORCE: bool = os.getenv(
+        "QUERY_BUDGET_ENFORCE", str(ENVIRONMENT in ("development", "test"))
+    ).lower() == "true"
     
     # Redis
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://redis:6379")
-    
+    # Shared async pool: callers wait up to REDIS_POOL_TIMEOUT for a free connection
+    REDIS_MAX_CONNECTIONS: int = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+    REDIS_POOL_TIMEOUT: float = float(os.getenv("REDIS_POOL_TIMEOUT", "2"))
+    REDIS_SOCKET_TIMEOUT: float = float(os.getenv("REDIS_SOCKET_TIMEOUT", "2"))
+    REDIS_HEALTH_CHECK_INTERVAL: float = float(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "15"))
+    # Circuit breaker: open after N consecutive failures, probe again after the timeout
+    REDIS_CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("REDIS_CIRCUIT_FAILURE_THRESHOLD", "5"))
+    REDIS_CIRCUIT_RECOVERY_TIMEOUT: float = float(os.getenv("REDIS_CIRCUIT_RECOVERY_TIMEOUT", "10"))
+
     # Security
     SECRET_KEY: str = os.getenv("JWT_SECRET", "")
     if not SECRET_KEY:
@@ -48,6 +77,54 @@ class Settings(BaseSettings):
     RATE_LIMIT_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_PER_MINUTE", "60"))
     RATE_LIMIT_PER_HOUR: int = int(os.getenv("RATE_LIMIT_PER_HOUR", "600"))
     
+    # Search index rebuilds
+    SEARCH_INDEX_BATCH_SIZE: int = int(os.getenv("SEARCH_INDEX_BATCH_SIZE", "1000"))
+    SEARCH_INDEX_BATCH_PAUSE: float = float(os.getenv("SEARCH_INDEX_BATCH_PAUSE", "0.05"))
+
+    # In-process L1 cache in front of Redis
+    CACHE_L1_MAX_ENTRIES: int = int(os.getenv("CACHE_L1_MAX_ENTRIES", "2000"))
+    CACHE_L1_MAX_BYTES: int = int(os.getenv("CACHE_L1_MAX_BYTES", str(64 * 1024 * 1024)))
+    CACHE_L1_MAX_TTL: float = float(os.getenv("CACHE_L1_MAX_TTL", "60"))
+
+    # Request coalescing
+    SINGLEFLIGHT_LOCK_TTL: float = float(os.getenv("SINGLEFLIGHT_LOCK_TTL", "5"))
+    SINGLEFLIGHT_POLL_INTERVAL: float = float(os.getenv("SINGLEFLIGHT_POLL_INTERVAL", "0.05"))
+
+    # Precompressed variants stored with cached responses (computed once per fill)
+    RESPONSE_CACHE_MIN_COMPRESS_SIZE: int = int(os.getenv("RESPONSE_CACHE_MIN_COMPRESS_SIZE", "1000"))
+    RESPONSE_CACHE_BROTLI_QUALITY: int = int(os.getenv("RESPONSE_CACHE_BROTLI_QUALITY", "9"))
+    RESPONSE_CACHE_GZIP_LEVEL: int = int(os.getenv("RESPONSE_CACHE_GZIP_LEVEL", "9"))
+
+    # Stale responses: kept past their hard TTL to serve when the origin fails,
+    # refreshed in the background under a lock held at most this long
+    RESPONSE_CACHE_STALE_IF_ERROR: int = int(os.getenv("RESPONSE_CACHE_STALE_IF_ERROR", "3600"))
+    RESPONSE_CACHE_REFRESH_TIMEOUT: float = float(os.getenv("RESPONSE_CACHE_REFRESH_TIMEOUT", "30"))
+
+    # HTTP caching of cached responses: browsers (not reached by tag invalidation)
+    # keep them at most this long; the nginx micro-cache keeps them this long
+    RESPONSE_CACHE_BROWSER_MAX_AGE: int = int(os.getenv("RESPONSE_CACHE_BROWSER_MAX_AGE", "300"))
+    RESPONSE_CACHE_EDGE_TTL: int = int(os.getenv("RESPONSE_CACHE_EDGE_TTL", "5"))
+
+    # Cached values: msgpack | orjson | json, compressed (zstd | lz4 | none) above the threshold
+    CACHE_SERIALIZER: str = os.getenv("CACHE_SERIALIZER", "msgpack")
+    CACHE_COMPRESSION: str = os.getenv("CACHE_COMPRESSION", "zstd")
+    CACHE_COMPRESSION_THRESHOLD: int = int(os.getenv("CACHE_COMPRESSION_THRESHOLD", "1024"))
+    CACHE_COMPRESSION_LEVEL: int = int(os.getenv("CACHE_COMPRESSION_LEVEL", "3"))
+
+    # Cache usage accounting (hits per key, memory per prefix)
+    CACHE_STATS_FLUSH_INTERVAL: float = float(os.getenv("CACHE_STATS_FLUSH_INTERVAL", "10"))
+    CACHE_STATS_TOP_KEYS: int = int(os.getenv("CACHE_STATS_TOP_KEYS", "1000"))
+
+    # Cache warmer (after startup and after each import)
+    CACHE_WARM_ENABLED: bool = os.getenv("CACHE_WARM_ENABLED", "true").lower() == "true"
+    CACHE_WARM_STARTUP_DELAY: float = float(os.getenv("CACHE_WARM_STARTUP_DELAY", "5"))
+    CACHE_WARM_CONCURRENCY: int = int(os.getenv("CACHE_WARM_CONCURRENCY", "4"))
+    CACHE_WARM_PAGES_PER_BOOK: int = int(os.getenv("CACHE_WARM_PAGES_PER_BOOK", "1"))
+    CACHE_WARM_TOP_QUERIES: int = int(os.getenv("CACHE_WARM_TOP_QUERIES", "50"))
+    CACHE_WARM_QUERY_DAYS: int = int(os.getenv("CACHE_WARM_QUERY_DAYS", "2"))
+    CACHE_WARM_LANGUAGES: str = os.getenv("CACHE_WARM_LANGUAGES", "en")  # Comma-separated Accept-Language values
+    CACHE_WARM_TIMEOUT: float = float(os.getenv("CACHE_WARM_TIMEOUT", "600"))
+
     # API Keys (for external services)
     ALADHAN_API_URL: str = "https://api.aladhan.com/v1"
     ALQURAN_API_URL: str = "https://api.alquran.cloud/v1"
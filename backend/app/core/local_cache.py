@@ -0,0 +1,228 @@
+"""
+In-process L1 cache in front of Redis (L2).
+
+Entries are bounded by count and by bytes, expire on their own TTL (never
+longer than CACHE_L1_MAX_TTL) and are evicted least-recently-used first.
+Writes and invalidations are broadcast on a Redis pub/sub channel so every
+worker on every node drops its copy of the affected keys.
+"""
+import asyncio
+import fnmatch
+import json
+import logging
+import threading
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from app.core.circuit_breaker import CircuitOpenError
+from app.core.config import settings
+from app.monitoring.metrics import cache_hits, cache_misses
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+# Identifies this process in broadcasts, so it can skip its own messages
+NODE_ID = uuid.uuid4().hex
+
+# Every live L1 cache, for broadcast invalidations
+_instances: "weakref.WeakSet[LocalLRUCache]" = weakref.WeakSet()
+
+
+class LocalLRUCache:
+    """Thread-safe LRU bounded by entry count and total bytes, with per-entry TTL."""
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        max_ttl: Optional[float] = None
+    ):
+        self.name = name
+        self.max_entries = max_entries or settings.CACHE_L1_MAX_ENTRIES
+        self.max_bytes = max_bytes or settings.CACHE_L1_MAX_BYTES
+        self.max_ttl = max_ttl or settings.CACHE_L1_MAX_TTL
+
+        self._lock = threading.Lock()
+        # key -> (value, size, expires_at)
+        self._entries: "OrderedDict[str, Tuple[Any, int, float]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        _instances.add(self)
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Any, size: int, ttl: Optional[float] = None) -> bool:
+        """
+        Store a value.
+
+        Args:
+            key: Cache key (same as in Redis)
+            value: Decoded value
+            size: Approximate size in bytes (encoded length)
+            ttl: Remaining lifetime in seconds; capped at max_ttl
+
+        Returns:
+            False if the entry is too large or already expired
+        """
+        ttl = self.max_ttl if ttl is None else min(ttl, self.max_ttl)
+        if ttl <= 0 or size > self.max_bytes // 4:
+            return False
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, time.monotonic() + ttl)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+        return True
+
+    def delete(self, keys: Iterable[str]) -> int:
+        deleted = 0
+        with self._lock:
+            for key in keys:
+                if key in self._entries:
+                    self._remove(key)
+                    deleted += 1
+        return deleted
+
+    def delete_matching(self, pattern: str) -> int:
+        """Delete keys matching a Redis-style glob pattern."""
+        with self._lock:
+            matching = [key for key in self._entries if fnmatch.fnmatchcase(key, pattern)]
+            for key in matching:
+                self._remove(key)
+        return len(matching)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups * 100, 2) if lookups else 0,
+            }
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+
+class TierStats:
+    """Hit/miss counters of one cache tier, mirrored to Prometheus per route."""
+
+    def __init__(self, cache_type: str):
+        self.cache_type = cache_type
+        self.hits = 0
+        self.misses = 0
+
+    def hit(self, route: str = "other") -> None:
+        self.hits += 1
+        cache_hits.labels(cache_type=self.cache_type, route=route).inc()
+
+    def miss(self, route: str = "other") -> None:
+        self.misses += 1
+        cache_misses.labels(cache_type=self.cache_type, route=route).inc()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups * 100, 2) if lookups else 0,
+        }
+
+
+# ---------------------------------------------------------------------- #
+# Broadcast invalidation
+# ---------------------------------------------------------------------- #
+
+def invalidation_message(keys: Iterable[str] = (), patterns: Iterable[str] = ()) -> str:
+    return json.dumps({"origin": NODE_ID, "keys": list(keys), "patterns": list(patterns)})
+
+
+def invalidate_local(keys: Iterable[str] = (), patterns: Iterable[str] = ()) -> None:
+    """Drop keys / patterns from every L1 cache of this process."""
+    keys = list(keys)
+    for local_cache in list(_instances):
+        if keys:
+            local_cache.delete(keys)
+        for pattern in patterns:
+            local_cache.delete_matching(pattern)
+
+
+async def publish_invalidation(client, keys: Iterable[str] = (), patterns: Iterable[str] = ()) -> None:
+    """Broadcast to the other processes (this one is invalidated by the caller)."""
+    try:
+        await client.publish(INVALIDATION_CHANNEL, invalidation_message(keys, patterns))
+    except CircuitOpenError:
+        pass  # Redis down: the other workers' L1 entries expire on their own
+    except Exception as e:
+        logger.warning(f"Cache invalidation broadcast failed: {e}")
+
+
+def _handle_message(data: Any) -> None:
+    try:
+        message = json.loads(data)
+    except (TypeError, ValueError):
+        return
+    if message.get("origin") == NODE_ID:
+        return
+    invalidate_local(message.get("keys", []), message.get("patterns", []))
+
+
+async def run_invalidation_listener(client) -> None:
+    """
+    Apply invalidations broadcast by other processes until cancelled.
+
+    Reconnects after Redis errors; L1 is flushed on reconnect since messages
+    may have been missed meanwhile.
+    """
+    while True:
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            invalidate_local(patterns=["*"])
+            async for message in pubsub.listen():
+                if message and message.get("type") == "message":
+                    _handle_message(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Cache invalidation listener error: {e}")
+            await asyncio.sleep(1)
+        finally:
+            try:
+                await pubsub.close()
+            except Exception:
+                pass
@@ -0,0 +1,251 @@
+"""
+Application-wide async Redis access.
+
+Every component (response cache, value cache, rate limiter, singleflight
+locks, cache warmer) shares one `redis.asyncio` client per event loop,
+backed by a bounded blocking connection pool: when all connections are busy,
+callers wait up to REDIS_POOL_TIMEOUT instead of opening more. Responses are
+not decoded (the response cache stores raw bytes).
+
+Sync code running in FastAPI worker threads reaches the same pool through
+`run_async` / `redis_manager.blocking`, which run on the app event loop.
+
+Every command and pipeline of these clients goes through one circuit
+breaker: while Redis is down, calls fail at once with CircuitOpenError
+instead of waiting out REDIS_SOCKET_TIMEOUT, and callers skip the cache.
+"""
+import asyncio
+import functools
+import logging
+import time
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import anyio.from_thread
+import redis.asyncio as redis
+from redis.asyncio.client import Pipeline
+
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Errors that mean Redis did not answer (pool exhaustion included)
+REDIS_FAILURES = (redis.ConnectionError, redis.TimeoutError, asyncio.TimeoutError, OSError)
+
+
+def run_async(fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+    """
+    Run a coroutine function from sync code and return its result.
+
+    From a FastAPI worker thread (sync endpoints and dependencies) the
+    coroutine runs on the application event loop, with the shared pool;
+    elsewhere (scripts) on a fresh event loop. The context is decided
+    before the call, so exceptions of the coroutine propagate unchanged and
+    it never runs twice.
+    """
+    if _in_worker_thread():
+        return anyio.from_thread.run(functools.partial(fn, *args, **kwargs))
+    return asyncio.run(fn(*args, **kwargs))
+
+
+def _in_worker_thread() -> bool:
+    """True in an AnyIO worker thread (anyio 4: event loop token, anyio 3: backend module)."""
+    threadlocals = anyio.from_thread.threadlocals
+    return hasattr(threadlocals, "current_token") or hasattr(threadlocals, "current_async_module")
+
+
+class BlockingRedis:
+    """Sync view of the shared client, for code running in worker threads."""
+
+    def __init__(self, manager: "RedisManager"):
+        self._manager = manager
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        async def call(*args, **kwargs):
+            return await getattr(self._manager.client, name)(*args, **kwargs)
+
+        return lambda *args, **kwargs: run_async(call, *args, **kwargs)
+
+
+class GuardedPipeline(Pipeline):
+    """Pipeline executed through the circuit breaker (one call per round trip)."""
+
+    breaker: CircuitBreaker
+
+    async def execute(self, raise_on_error: bool = True) -> List[Any]:
+        with self.breaker.guard():
+            return await super().execute(raise_on_error)
+
+
+class GuardedRedis(redis.Redis):
+    """Client whose commands and pipelines go through the circuit breaker."""
+
+    breaker: CircuitBreaker
+
+    async def execute_command(self, *args, **options) -> Any:
+        with self.breaker.guard():
+            return await super().execute_command(*args, **options)
+
+    def pipeline(self, transaction: bool = True, shard_hint: Optional[str] = None) -> GuardedPipeline:
+        pipe = GuardedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+        pipe.breaker = self.breaker
+        return pipe
+
+
+class RedisManager:
+    """Bounded connection pool, pipelining helpers and health state."""
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        max_connections: Optional[int] = None,
+        pool_timeout: Optional[float] = None,
+        socket_timeout: Optional[float] = None
+    ):
+        self.url = url or settings.REDIS_URL
+        self.max_connections = max_connections or settings.REDIS_MAX_CONNECTIONS
+        self.pool_timeout = pool_timeout or settings.REDIS_POOL_TIMEOUT
+        self.socket_timeout = socket_timeout or settings.REDIS_SOCKET_TIMEOUT
+
+        # One client (and pool) per event loop: connections cannot cross loops
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, redis.Redis]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+        self.healthy: Optional[bool] = None
+        self.last_error: Optional[str] = None
+        self.last_check: Optional[float] = None
+        self.latency_ms: Optional[float] = None
+
+        # Shared by the clients of every loop: an outage is an outage
+        self.breaker = CircuitBreaker(
+            "redis",
+            failure_threshold=settings.REDIS_CIRCUIT_FAILURE_THRESHOLD,
+            recovery_timeout=settings.REDIS_CIRCUIT_RECOVERY_TIMEOUT,
+            failure_exceptions=REDIS_FAILURES,
+        )
+
+        self.blocking = BlockingRedis(self)
+
+    @property
+    def client(self) -> redis.Redis:
+        """Client of the running event loop (created on first use)."""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            pool = redis.BlockingConnectionPool.from_url(
+                self.url,
+                max_connections=self.max_connections,
+                timeout=self.pool_timeout,
+                socket_timeout=self.socket_timeout,
+                socket_connect_timeout=self.socket_timeout,
+                health_check_interval=30,
+            )
+            client = GuardedRedis(connection_pool=pool)
+            client.breaker = self.breaker
+            self._clients[loop] = client
+        return client
+
+    async def connect(self) -> bool:
+        """Open the pool and record whether Redis answers."""
+        return await self.ping()
+
+    async def close(self) -> None:
+        loop = asyncio.get_running_loop()
+        client = self._clients.pop(loop, None)
+        if client is not None:
+            await client.aclose()
+            await client.connection_pool.disconnect()
+
+    async def ping(self) -> bool:
+        start = time.perf_counter()
+        try:
+            await self.client.ping()
+        except Exception as e:
+            self.mark_failure(e)
+        else:
+            self.latency_ms = round((time.perf_counter() - start) * 1000, 2)
+            self.mark_success()
+        self.last_check = time.time()
+        return bool(self.healthy)
+
+    def mark_success(self) -> None:
+        if self.healthy is False:
+            logger.info("Redis is reachable again")
+        self.healthy = True
+        self.last_error = None
+
+    @property
+    def available(self) -> bool:
+        """False while the circuit rejects calls: skip Redis altogether."""
+        return not self.breaker.is_open
+
+    def mark_failure(self, error: Exception) -> None:
+        if self.healthy is not False and not isinstance(error, CircuitOpenError):
+            logger.warning(f"Redis unavailable: {error}")
+        self.healthy = False
+        self.last_error = str(error)
+
+    def health(self) -> Dict[str, Any]:
+        pool = self._clients.get(asyncio.get_running_loop())
+        in_use = len(pool.connection_pool._in_use_connections) if pool else 0
+        return {
+            "status": {True: "healthy", False: "unhealthy", None: "unknown"}[self.healthy],
+            "latency_ms": self.latency_ms,
+            "last_check": self.last_check,
+            "error": self.last_error,
+            "pool": {"max_connections": self.max_connections, "in_use": in_use},
+            "circuit": self.breaker.snapshot(),
+        }
+
+    async def run_health_checks(self, interval: Optional[float] = None) -> None:
+        """Ping periodically until cancelled, keeping `healthy` current."""
+        interval = interval or settings.REDIS_HEALTH_CHECK_INTERVAL
+        while True:
+            await self.ping()
+            await asyncio.sleep(interval)
+
+    # ------------------------------------------------------------------ #
+    # Pipelining helpers
+    # ------------------------------------------------------------------ #
+
+    def pipeline(self, transaction: bool = False):
+        """Non-transactional pipeline by default: batching, not MULTI."""
+        return self.client.pipeline(transaction=transaction)
+
+    async def execute(self, commands: Iterable[Tuple[str, Sequence[Any]]]) -> List[Any]:
+        """
+        Run commands in one round trip.
+
+        Args:
+            commands: (command name, args) pairs, e.g. ("get", ["key"])
+
+        Returns:
+            Results in order (exceptions are returned, not raised)
+        """
+        async with self.pipeline() as pipe:
+            for name, args in commands:
+                getattr(pipe, name)(*args)
+            return await pipe.execute(raise_on_error=False)
+
+    async def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        if not keys:
+            return []
+        return await self.client.mget(keys)
+
+    async def set_many(self, items: Dict[str, Any], ttl: int) -> None:
+        if not items:
+            return
+        async with self.pipeline() as pipe:
+            for key, value in items.items():
+                pipe.setex(key, ttl, value)
+            await pipe.execute()
+
+
+redis_manager = RedisManager()
+
+
+def get_redis() -> redis.Redis:
+    """FastAPI dependency: the shared client."""
+    return redis_manager.client
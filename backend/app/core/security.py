@@ -33,6 +33,17 @@ def verify_token(token: str, credentials_exception):
     except JWTError:
         raise credentials_exception
 
+def access_token_user_id(token: str) -> Optional[int]:
+    """User id carried by a valid access token, or None (invalid, expired, or issued without it)"""
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    user_id = payload.get("uid")
+    if payload.get("type") != "access" or not isinstance(user_id, int):
+        return None
+    return user_id
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
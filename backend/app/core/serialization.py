@@ -0,0 +1,222 @@
+"""
+Binary serialization of cached values.
+
+A stored value is a 3-byte header (format version, serializer, compression)
+followed by the payload, so every reader decodes whatever any writer chose:
+the serializer or compression can be changed with a rolling deploy. Values
+written before the header existed (plain JSON) are still read.
+
+- msgpack (default) keeps datetime, date, Decimal and UUID values, which
+  JSON turned into strings;
+- orjson and stdlib JSON are available as alternatives / fallbacks;
+- payloads above CACHE_COMPRESSION_THRESHOLD are compressed with zstd or lz4.
+
+Optional libraries that are not installed fall back to JSON / no compression.
+"""
+import datetime
+import json
+import logging
+import struct
+import uuid
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+try:
+    import lz4.frame
+    HAS_LZ4 = True
+except ImportError:
+    HAS_LZ4 = False
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+HEADER = struct.Struct("!BBB")
+
+# Versions stay below 0x20: plain JSON never starts with a control character
+MAX_FORMAT_VERSION = 0x1F
+
+SERIALIZER_CODES = {"json": 0, "msgpack": 1, "orjson": 2}
+COMPRESSION_CODES = {"none": 0, "zstd": 1, "lz4": 2}
+
+# msgpack extension types
+EXT_DATETIME = 1
+EXT_DATE = 2
+EXT_DECIMAL = 3
+EXT_UUID = 4
+
+
+class SerializationError(ValueError):
+    """Stored value in an unknown format, or codec not installed."""
+
+
+# ---------------------------------------------------------------------- #
+# Serializers
+# ---------------------------------------------------------------------- #
+
+def _msgpack_default(value: Any) -> Any:
+    if isinstance(value, datetime.datetime):
+        return msgpack.ExtType(EXT_DATETIME, value.isoformat().encode())
+    if isinstance(value, datetime.date):
+        return msgpack.ExtType(EXT_DATE, value.isoformat().encode())
+    if isinstance(value, Decimal):
+        return msgpack.ExtType(EXT_DECIMAL, str(value).encode())
+    if isinstance(value, uuid.UUID):
+        return msgpack.ExtType(EXT_UUID, value.bytes)
+    # Same fallback as JSON: anything else is stored as its string
+    return str(value)
+
+
+def _msgpack_ext_hook(code: int, data: bytes) -> Any:
+    if code == EXT_DATETIME:
+        return datetime.datetime.fromisoformat(data.decode())
+    if code == EXT_DATE:
+        return datetime.date.fromisoformat(data.decode())
+    if code == EXT_DECIMAL:
+        return Decimal(data.decode())
+    if code == EXT_UUID:
+        return uuid.UUID(bytes=data)
+    return msgpack.ExtType(code, data)
+
+
+def _dumps(serializer: str, value: Any) -> bytes:
+    if serializer == "msgpack":
+        return msgpack.packb(value, default=_msgpack_default, use_bin_type=True)
+    if serializer == "orjson":
+        return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, default=str, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(serializer: str, payload: bytes) -> Any:
+    if serializer == "msgpack":
+        if not HAS_MSGPACK:
+            raise SerializationError("msgpack is not installed")
+        return msgpack.unpackb(payload, ext_hook=_msgpack_ext_hook, raw=False, strict_map_key=False)
+    if serializer == "orjson" and HAS_ORJSON:
+        return orjson.loads(payload)
+    # orjson output is plain JSON
+    return json.loads(payload)
+
+
+# ---------------------------------------------------------------------- #
+# Compression
+# ---------------------------------------------------------------------- #
+
+def _compress(compression: str, payload: bytes, level: int) -> bytes:
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(payload)
+    if compression == "lz4":
+        return lz4.frame.compress(payload, compression_level=level)
+    return payload
+
+
+def _decompress(compression: str, payload: bytes) -> bytes:
+    if compression == "zstd":
+        if not HAS_ZSTD:
+            raise SerializationError("zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    if compression == "lz4":
+        if not HAS_LZ4:
+            raise SerializationError("lz4 is not installed")
+        return lz4.frame.decompress(payload)
+    return payload
+
+
+_AVAILABLE_SERIALIZERS = {"json": True, "msgpack": HAS_MSGPACK, "orjson": HAS_ORJSON}
+_AVAILABLE_COMPRESSIONS = {"none": True, "zstd": HAS_ZSTD, "lz4": HAS_LZ4}
+_SERIALIZER_NAMES: Dict[int, str] = {code: name for name, code in SERIALIZER_CODES.items()}
+_COMPRESSION_NAMES: Dict[int, str] = {code: name for name, code in COMPRESSION_CODES.items()}
+
+
+class ValueCodec:
+    """Encode values for the cache with the configured serializer and compression."""
+
+    def __init__(
+        self,
+        serializer: Optional[str] = None,
+        compression: Optional[str] = None,
+        threshold: Optional[int] = None,
+        level: Optional[int] = None
+    ):
+        serializer = serializer or settings.CACHE_SERIALIZER
+        compression = compression or settings.CACHE_COMPRESSION
+        if serializer not in SERIALIZER_CODES:
+            raise ValueError(f"Unknown cache serializer: {serializer}")
+        if compression not in COMPRESSION_CODES:
+            raise ValueError(f"Unknown cache compression: {compression}")
+
+        if not _AVAILABLE_SERIALIZERS[serializer]:
+            logger.warning(f"Cache serializer {serializer} is not installed, using json")
+            serializer = "json"
+        if not _AVAILABLE_COMPRESSIONS[compression]:
+            logger.warning(f"Cache compression {compression} is not installed, disabled")
+            compression = "none"
+
+        self.serializer = serializer
+        self.compression = compression
+        self.threshold = settings.CACHE_COMPRESSION_THRESHOLD if threshold is None else threshold
+        self.level = settings.CACHE_COMPRESSION_LEVEL if level is None else level
+
+    def dumps(self, value: Any) -> bytes:
+        payload = _dumps(self.serializer, value)
+        compression = "none"
+        if self.compression != "none" and len(payload) >= self.threshold:
+            compressed = _compress(self.compression, payload, self.level)
+            if len(compressed) < len(payload):
+                payload, compression = compressed, self.compression
+        return HEADER.pack(
+            FORMAT_VERSION, SERIALIZER_CODES[self.serializer], COMPRESSION_CODES[compression]
+        ) + payload
+
+    def loads(self, raw: bytes) -> Any:
+        """
+        Decode a stored value, whatever codec wrote it.
+
+        Raises:
+            SerializationError: unknown format or codec not installed here
+        """
+        if not raw:
+            raise SerializationError("Empty value")
+        if raw[0] > MAX_FORMAT_VERSION:
+            # Written before the header existed
+            return json.loads(raw)
+        if len(raw) < HEADER.size:
+            raise SerializationError("Truncated value")
+
+        version, serializer_code, compression_code = HEADER.unpack_from(raw)
+        if version != FORMAT_VERSION:
+            raise SerializationError(f"Unsupported format version {version}")
+        serializer = _SERIALIZER_NAMES.get(serializer_code)
+        compression = _COMPRESSION_NAMES.get(compression_code)
+        if serializer is None or compression is None:
+            raise SerializationError(f"Unknown codec ({serializer_code}, {compression_code})")
+
+        payload = _decompress(compression, raw[HEADER.size:])
+        try:
+            return _loads(serializer, payload)
+        except SerializationError:
+            raise
+        except Exception as e:
+            raise SerializationError(f"Corrupted {serializer} value: {e}") from e
+
+
+value_codec = ValueCodec()
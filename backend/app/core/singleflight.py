@@ -0,0 +1,273 @@
+"""
+Request coalescing ("singleflight") for expensive reads.
+
+When many clients ask for the same missing cache entry at once, only one of
+them should compute it:
+
+- inside a worker, concurrent callers for the same key share one in-flight
+  future (`SingleFlight` for threads, `AsyncSingleFlight` for coroutines);
+- across workers, the caller that wins a short Redis lock computes and stores
+  the value while the others poll the cache until it appears
+  (`DistributedSingleFlight` / `AsyncDistributedSingleFlight`).
+
+Every call is counted in `singleflight_requests_total{name, outcome}`.
+"""
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.circuit_breaker import CircuitOpenError
+from app.monitoring.metrics import singleflight_requests
+
+logger = logging.getLogger(__name__)
+
+LOCK_PREFIX = "singleflight:"
+
+# Delete the lock only if we still own it
+RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+def _record(name: str, outcome: str) -> None:
+    singleflight_requests.labels(name=name, outcome=outcome).inc()
+
+
+class SingleFlight:
+    """Share one in-flight computation between threads asking for the same key."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Run `fn` once for all concurrent callers of `key`.
+
+        Waiters receive the leader's result, or its exception.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            _record(self.name, "collapsed_local")
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+
+class AsyncSingleFlight:
+    """Share one in-flight coroutine between tasks asking for the same key."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await `fn` once for all concurrent callers of `key`.
+
+        If the leader is cancelled (client gone), one waiter takes over.
+        """
+        while True:
+            future = self._calls.get(key)
+            if future is None:
+                break
+            try:
+                result = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if future.cancelled():
+                    continue
+                raise
+            _record(self.name, "collapsed_local")
+            return result
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark as retrieved: nobody may be waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._calls.pop(key, None)
+
+
+class DistributedSingleFlight:
+    """
+    Coalesce a cache fill within the worker and across workers (sync code).
+
+    `compute` must store its result where `load` finds it. Without a client,
+    the shared Redis pool is used from the calling worker thread.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        client=None,
+        lock_ttl: Optional[float] = None,
+        poll_interval: Optional[float] = None
+    ):
+        self.name = name
+        self._client = client
+        self.lock_ttl = lock_ttl or settings.SINGLEFLIGHT_LOCK_TTL
+        self.poll_interval = poll_interval or settings.SINGLEFLIGHT_POLL_INTERVAL
+        self.local = SingleFlight(name)
+
+    @property
+    def client(self):
+        if self._client is not None:
+            return self._client
+        from app.core.redis_manager import redis_manager
+        return redis_manager.blocking
+
+    def do(self, key: str, compute: Callable[[], Any], load: Callable[[], Optional[Any]]) -> Any:
+        return self.local.do(key, lambda: self._fill(key, compute, load))
+
+    def _fill(self, key: str, compute: Callable[[], Any], load: Callable[[], Optional[Any]]) -> Any:
+        lock_key = f"{LOCK_PREFIX}{key}"
+        token = uuid.uuid4().hex
+
+        try:
+            acquired = self.client.set(lock_key, token, nx=True, px=int(self.lock_ttl * 1000))
+        except Exception as e:
+            # Redis down: coalescing degrades to per-worker only
+            if not isinstance(e, CircuitOpenError):
+                logger.warning(f"Singleflight lock unavailable for {self.name}: {e}")
+            _record(self.name, "leader")
+            return compute()
+
+        if acquired:
+            _record(self.name, "leader")
+            try:
+                return compute()
+            finally:
+                try:
+                    self.client.eval(RELEASE_SCRIPT, 1, lock_key, token)
+                except Exception:
+                    pass  # Expires on its own
+
+        deadline = time.monotonic() + self.lock_ttl
+        try:
+            while time.monotonic() < deadline:
+                time.sleep(self.poll_interval)
+                value = load()
+                if value is not None:
+                    _record(self.name, "collapsed_remote")
+                    return value
+                if not self.client.exists(lock_key):
+                    # Leader finished without storing (error or uncacheable)
+                    break
+        except Exception as e:
+            logger.warning(f"Singleflight wait failed for {self.name}: {e}")
+
+        _record(self.name, "fallback")
+        return compute()
+
+
+class AsyncDistributedSingleFlight:
+    """Same as DistributedSingleFlight, for coroutines."""
+
+    def __init__(
+        self,
+        name: str,
+        client=None,
+        lock_ttl: Optional[float] = None,
+        poll_interval: Optional[float] = None
+    ):
+        self.name = name
+        self._client = client
+        self.lock_ttl = lock_ttl or settings.SINGLEFLIGHT_LOCK_TTL
+        self.poll_interval = poll_interval or settings.SINGLEFLIGHT_POLL_INTERVAL
+        self.local = AsyncSingleFlight(name)
+
+    @property
+    def client(self):
+        if self._client is not None:
+            return self._client
+        from app.core.redis_manager import redis_manager
+        return redis_manager.client
+
+    async def do(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        load: Callable[[], Awaitable[Optional[Any]]]
+    ) -> Any:
+        return await self.local.do(key, lambda: self._fill(key, compute, load))
+
+    async def _fill(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        load: Callable[[], Awaitable[Optional[Any]]]
+    ) -> Any:
+        lock_key = f"{LOCK_PREFIX}{key}"
+        token = uuid.uuid4().hex
+
+        try:
+            acquired = await self.client.set(
+                lock_key, token, nx=True, px=int(self.lock_ttl * 1000)
+            )
+        except Exception as e:
+            if not isinstance(e, CircuitOpenError):
+                logger.warning(f"Singleflight lock unavailable for {self.name}: {e}")
+            _record(self.name, "leader")
+            return await compute()
+
+        if acquired:
+            _record(self.name, "leader")
+            try:
+                return await compute()
+            finally:
+                try:
+                    await self.client.eval(RELEASE_SCRIPT, 1, lock_key, token)
+                except Exception:
+                    pass
+
+        deadline = time.monotonic() + self.lock_ttl
+        try:
+            while time.monotonic() < deadline:
+                await asyncio.sleep(self.poll_interval)
+                value = await load()
+                if value is not None:
+                    _record(self.name, "collapsed_remote")
+                    return value
+                if not await self.client.exists(lock_key):
+                    break
+        except Exception as e:
+            logger.warning(f"Singleflight wait failed for {self.name}: {e}")
+
+        _record(self.name, "fallback")
+        return await compute()
@@ -1,3 +1,3 @@
-from app.db.base import Base, get_db, engine, SessionLocal
+from app.db.base import Base, get_db, engine, SessionLocal, get_batch_engine, batch_session
 
-__all__ = ["Base", "get_db", "engine", "SessionLocal"]
\ No newline at end of file
+__all__ = ["Base", "get_db", "engine", "SessionLocal", "get_batch_engine", "batch_session"]
@@ -0,0 +1,151 @@
+"""
+Database engine factory, driven by Settings.
+
+The pool is sized from the worker threadpool: sync endpoints hold one
+connection per thread, so more connections than threads sit idle and fewer
+make threads queue on the pool. Session parameters are passed in the libpq
+startup packet (no round trip per connection) and validated up front, since
+server-wide parameters such as shared_buffers cannot be set per session.
+"""
+import re
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import NullPool, QueuePool
+
+from app.core.config import settings
+from app.monitoring.metrics import (
+    database_connections,
+    db_pool_checkout_wait_seconds,
+    db_pool_overflow,
+)
+
+# Parameters a session may set (user context); anything else is rejected
+SESSION_PARAMETERS = {
+    "default_statistics_target",
+    "effective_cache_size",
+    "effective_io_concurrency",
+    "idle_in_transaction_session_timeout",
+    "jit",
+    "lock_timeout",
+    "maintenance_work_mem",
+    "random_page_cost",
+    "search_path",
+    "seq_page_cost",
+    "statement_timeout",
+    "work_mem",
+}
+
+SESSION_VALUE = re.compile(r"^[A-Za-z0-9._-]+$")
+
+
+def parse_session_params(params: str) -> Dict[str, str]:
+    """
+    Parse and validate "name=value,name=value" session parameters.
+
+    Args:
+        params: Comma-separated assignments (DB_SESSION_PARAMS)
+
+    Returns:
+        Parameters by name
+
+    Raises:
+        ValueError: If a parameter cannot be set per session or a value is malformed
+    """
+    parsed: Dict[str, str] = {}
+    for item in params.split(","):
+        if not item.strip():
+            continue
+        name, sep, value = item.partition("=")
+        name, value = name.strip().lower(), value.strip()
+        if not sep or name not in SESSION_PARAMETERS:
+            raise ValueError(
+                f"Invalid DB_SESSION_PARAMS entry {item.strip()!r}: "
+                f"expected name=value with name in {sorted(SESSION_PARAMETERS)}"
+            )
+        if not SESSION_VALUE.match(value):
+            raise ValueError(f"Invalid value for session parameter {name}: {value!r}")
+        parsed[name] = value
+    return parsed
+
+
+def pool_size() -> int:
+    """Pool size: DB_POOL_SIZE, or one connection per worker thread."""
+    return settings.DB_POOL_SIZE or settings.THREADPOOL_SIZE
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool exporting connections in use, overflow and checkout wait time.
+
+    Updated once a connection is handed out or back in the pool (the
+    checkin event fires before the pool takes it back).
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_wait_seconds.observe(time.perf_counter() - start)
+            self._export()
+
+    def _do_return_conn(self, record) -> None:
+        super()._do_return_conn(record)
+        self._export()
+
+    def _export(self) -> None:
+        database_connections.set(self.checkedout())
+        # Negative until the pool is full
+        db_pool_overflow.set(max(0, self.overflow()))
+
+
+def create_db_engine(
+    database_url: Optional[str] = None,
+    statement_timeout: Optional[int] = None
+) -> Engine:
+    """
+    Create the application engine.
+
+    Args:
+        database_url: Database URL (default: DATABASE_URL)
+        statement_timeout: Statement timeout in milliseconds, 0 for none
+            (default: DB_SESSION_PARAMS, else DB_STATEMENT_TIMEOUT_MS)
+
+    Returns:
+        Engine with a pool sized from the threadpool (NullPool in tests)
+    """
+    url = database_url or settings.DATABASE_URL
+    if url.startswith("sqlite"):
+        return create_engine(url, connect_args={"check_same_thread": False})
+
+    if settings.ENVIRONMENT == "test":
+        return create_engine(url, poolclass=NullPool)
+
+    params = parse_session_params(settings.DB_SESSION_PARAMS)
+    if statement_timeout is not None:
+        params["statement_timeout"] = str(statement_timeout)
+    else:
+        params.setdefault("statement_timeout", str(settings.DB_STATEMENT_TIMEOUT_MS))
+    options = " ".join(f"-c {name}={value}" for name, value in params.items())
+
+    engine = create_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=pool_size(),
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+        connect_args={
+            "connect_timeout": 10,
+            "keepalives": 1,
+            "keepalives_idle": 30,
+            "keepalives_interval": 10,
+            "keepalives_count": 5,
+            "options": options,
+        },
+    )
+    return engine
@@ -7,6 +7,7 @@ from sqlalchemy import and_, or_, func, select
 from sqlalchemy.sql import text
 from app.models import User, PrayerLog, Bookmark, FavoriteVerse, ZakatCalculation
 from app.core.cache import cached, cache
+from app.core.redis_manager import run_async
 import logging
 
 logger = logging.getLogger(__name__)
@@ -208,13 +209,13 @@ def cache_query_result(ttl: int = 300, prefix: str = "query"):
             cache_key = f"{prefix}:{func.__name__}:{hash(str(args) + str(kwargs))}"
             
             # Try to get from cache
-            result = cache.get(cache_key)
+            result = run_async(cache.get, cache_key)
             if result is not None:
                 return result
             
             # Execute query and cache result
             result = func(*args, **kwargs)
-            cache.set(cache_key, result, ttl)
+            run_async(cache.set, cache_key, result, ttl)
             
             return result
         return wrapper
@@ -0,0 +1,123 @@
+"""
+Per-request database query tracking.
+
+Engine-wide SQLAlchemy cursor events count the queries of the current
+request, their total time and how often each statement shape repeats (the
+same SQL with other parameters: a query in a loop, or a lazy load per row).
+The request is found through a context variable set by
+QueryTrackingMiddleware; sync endpoints run in a copy of that context, so
+their queries are counted too. Outside a request nothing is recorded.
+
+Endpoints declare a budget with @query_budget(n), dependencies included.
+The query past it raises QueryBudgetExceeded when QUERY_BUDGET_ENFORCE is
+on (development and test) and is logged otherwise.
+"""
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Label of paths without a route (404): bounded cardinality
+UNMATCHED_ROUTE = "unmatched"
+
+
+class QueryBudgetExceeded(Exception):
+    """An endpoint ran more queries than its declared budget."""
+
+
+class QueryStats:
+    """Queries run while serving one request."""
+
+    def __init__(self, scope: Optional[dict] = None):
+        self.scope = scope if scope is not None else {}
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Counter = Counter()
+        self.exceeded = False
+
+    @property
+    def route(self) -> str:
+        return getattr(self.scope.get("route"), "path", UNMATCHED_ROUTE)
+
+    @property
+    def budget(self) -> Optional[int]:
+        # Resolved once routing has set the endpoint in the scope
+        return getattr(self.scope.get("endpoint"), "query_budget", None)
+
+    def check_budget(self) -> None:
+        """Called before each query: refuse (or report) the one past the budget."""
+        budget = self.budget
+        if budget is None or self.count < budget or self.exceeded:
+            return
+        self.exceeded = True
+        message = (
+            f"{self.route} exceeded its query budget of {budget}; "
+            f"most repeated statements: {self.repeated(2)}"
+        )
+        if settings.QUERY_BUDGET_ENFORCE:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.shapes[statement] += 1
+
+    def repeated(self, threshold: Optional[int] = None) -> Dict[str, int]:
+        """Statement shapes run at least `threshold` times (QUERY_REPEAT_THRESHOLD)."""
+        threshold = threshold or settings.QUERY_REPEAT_THRESHOLD
+        return {
+            " ".join(statement.split())[:200]: count
+            for statement, count in self.shapes.most_common()
+            if count >= threshold
+        }
+
+    def server_timing(self) -> str:
+        """Server-Timing entry for the database time of the request."""
+        return f'db;dur={self.duration * 1000:.1f};desc="{self.count} queries"'
+
+
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+def query_budget(queries: int) -> Callable:
+    """
+    Declare the most queries an endpoint may run per request.
+
+    Args:
+        queries: Budget, dependencies (authentication...) included
+
+    Returns:
+        Decorator leaving the endpoint unchanged
+    """
+    def decorator(func: Callable) -> Callable:
+        func.query_budget = queries
+        return func
+    return decorator
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_query_stats.get()
+    if stats is None or context is None:
+        return
+    stats.check_budget()
+    # Per execution, so a failed query leaves nothing behind
+    context._query_tracker_start = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_query_stats.get()
+    start = getattr(context, "_query_tracker_start", None)
+    if stats is None or start is None:
+        return
+    stats.record(statement, time.perf_counter() - start)
@@ -1,12 +1,14 @@
 """
 Database session configuration
 """
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from app.core.config import settings
+from functools import lru_cache
 
-# Create engine
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from app.db.factory import create_db_engine
+
+# The application engine (one per process)
+engine = create_db_engine()
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -17,4 +19,19 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+@lru_cache(maxsize=None)
+def get_batch_engine() -> Engine:
+    """
+    Engine for offline jobs and scripts (index builds, ANALYZE, full-table
+    passes): no statement timeout. Created on first use, so API workers that
+    never run a job open no second pool.
+    """
+    return create_db_engine(statement_timeout=0)
+
+
+def batch_session() -> Session:
+    """Session on the batch engine, configured like SessionLocal."""
+    return Session(bind=get_batch_engine(), autoflush=False)
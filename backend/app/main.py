@@ -1,15 +1,24 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from contextlib import asynccontextmanager
+import anyio.to_thread
+import asyncio
 import logging
 
 from app.api.router import api_router
 from app.core.config import settings
 from app.db.base import Base, engine
 from app.middleware.compression import get_compression_middleware
-from app.middleware.cache import CacheMiddleware, get_redis_client
+from app.middleware.cache import CacheMiddleware
+from app.middleware.query_tracking import get_query_tracking_middleware
+from app.core.cache_stats import run_stats_flusher
+from app.core.local_cache import run_invalidation_listener
+from app.core.redis_manager import redis_manager
+from app.monitoring.loop_lag import loop_lag
+from app.services.cache_warmer import run_cache_warmer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -19,18 +28,43 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting Al-Hidaya API...")
+    # Threads for sync endpoints; the database pool is sized to match
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_SIZE
     # Create database tables
     Base.metadata.create_all(bind=engine)
     
-    # Initialize Redis connection for caching
-    app.state.redis = await get_redis_client()
-    logger.info("Redis cache initialized")
+    # Shared Redis pool (cache, rate limiting, locks); the API starts even if
+    # Redis is down, health is tracked in the background
+    if await redis_manager.connect():
+        logger.info("Redis cache initialized")
+    app.state.redis = redis_manager.client
+    redis_health = asyncio.create_task(redis_manager.run_health_checks())
+    
+    # Drop L1 cache entries invalidated by other workers
+    invalidation_listener = asyncio.create_task(run_invalidation_listener(app.state.redis))
+    
+    # Hits per key and memory per prefix for /api/v1/cache/stats
+    cache_stats_flusher = asyncio.create_task(run_stats_flusher(lambda: redis_manager.client))
+    
+    # Event loop lag, read by the compression middleware to pick its levels
+    loop_lag_monitor = asyncio.create_task(loop_lag.run())
+    
+    # Pre-populate the response cache now and after each import
+    cache_warmer = None
+    if settings.CACHE_WARM_ENABLED:
+        cache_warmer = asyncio.create_task(run_cache_warmer(app, app.state.redis))
     
     yield
     
     # Shutdown
     logger.info("Shutting down Al-Hidaya API...")
-    await app.state.redis.close()
+    invalidation_listener.cancel()
+    cache_stats_flusher.cancel()
+    redis_health.cancel()
+    loop_lag_monitor.cancel()
+    if cache_warmer:
+        cache_warmer.cancel()
+    await redis_manager.close()
 
 # Create FastAPI app
 app = FastAPI(
@@ -40,37 +74,43 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.BACKEND_CORS_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    allow_headers=["Authorization", "Content-Type"],
-)
-
 # Add compression middleware
 app.add_middleware(
     get_compression_middleware(
         minimum_size=1000,  # Compress responses larger than 1KB
         gzip_level=6,       # Balanced compression level
-        brotli_quality=4,   # Fast brotli compression
-        exclude_paths=["/health", "/metrics", "/docs", "/redoc", "/openapi.json", "/api/hadith", "/api/quran"]
+        brotli_quality=4,   # Fast brotli compression, adapted to body size and loop lag
+        zstd_level=3,       # Hadith and Quran routes prefer zstd (ROUTE_COMPRESSION_POLICIES)
+        offload_threshold=64 * 1024,  # Larger bodies are compressed off the event loop
+        max_workers=2,
+        exclude_paths=["/health", "/metrics", "/docs", "/redoc", "/openapi.json"]
     )
 )
 
-# Add cache middleware after initialization
-@app.on_event("startup")
-async def add_cache_middleware():
-    """Add cache middleware after Redis is initialized."""
-    app.add_middleware(
-        CacheMiddleware,
-        redis_client=app.state.redis,
-        default_ttl=300,  # 5 minutes default
-        cache_prefix="api_cache:",
-        exclude_paths=["/health", "/metrics", "/docs", "/redoc", "/openapi.json", "/auth", "/api/auth"],
-        include_query_params=True
-    )
+# Add cache middleware (outside compression: serves its stored encodings itself);
+# it uses the shared Redis pool, so it can be registered before startup
+app.add_middleware(
+    CacheMiddleware,
+    default_ttl=300,  # 5 minutes default
+    cache_prefix="api_cache:",
+    exclude_paths=["/health", "/metrics", "/docs", "/redoc", "/openapi.json", "/auth", "/api/auth",
+                   "/api/hadith/export"],  # Streamed exports are not buffered for caching
+    include_query_params=True
+)
+
+# Configure CORS (outside the cache: CORS headers depend on the request's
+# Origin, which is not part of the cache key, so they are never stored)
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=settings.BACKEND_CORS_ORIGINS,
+    allow_credentials=True,
+    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+    allow_headers=["Authorization", "Content-Type"],
+)
+
+# Add query tracking middleware (outermost: counts the queries of the whole
+# request, cache misses included; Server-Timing and per-route metrics)
+app.add_middleware(get_query_tracking_middleware())
 
 @app.get("/")
 async def root():
@@ -91,6 +131,11 @@ async def health_check():
         "service": "al-hidaya-api"
     }
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics of this worker."""
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 # Validation error handler
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -1,35 +1,162 @@
 """
 Middleware de cache pour optimiser les performances API avec Redis
 """
+import asyncio
 import json
 import hashlib
-from typing import Optional, Callable, Any
+import time
+import uuid
+from typing import Optional, Callable, Any, NamedTuple
 from fastapi import Request, Response
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
 from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
 from starlette.responses import Response as StarletteResponse
+from starlette.routing import Match
 import redis.asyncio as redis
 from app.core.config import settings
+from app.core.circuit_breaker import CircuitOpenError
+from app.core.cache_stats import cache_usage, key_hits, track_entry
+from app.core.cache_tags import (
+    HADITH_CORPUS_TAG,
+    collection_tag,
+    hadith_tag,
+    invalidate_tags,
+    register_tags,
+    scan_delete,
+    user_tag,
+)
+from app.core.local_cache import LocalLRUCache, TierStats, invalidate_local, publish_invalidation
+from app.core.redis_manager import redis_manager
+from app.core.security import access_token_user_id
+from app.core.singleflight import RELEASE_SCRIPT, AsyncDistributedSingleFlight
+from app.middleware.cache_entry import (
+    CacheEntryError,
+    CachedEntry,
+    build_entry,
+    cache_control_headers,
+    merge_vary,
+)
+from app.middleware.cache_keys import (
+    Normalizer,
+    canonical_query,
+    normalize_coordinate,
+    normalize_lower,
+    normalize_spaces,
+    route_query_params,
+)
+from app.monitoring.metrics import (
+    cache_bytes_served,
+    cache_hits,
+    cache_lookup_duration_seconds,
+    cache_misses,
+    cache_stale,
+)
+from app.services.cache_warmer import is_tracked_query, record_query
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Cache L1 des réponses, partagé par le worker, et compteurs par niveau
+response_cache = LocalLRUCache("responses")
+response_l1_stats = TierStats("response_l1")
+response_l2_stats = TierStats("response_l2")
+
+# Verrou du rafraîchissement en arrière-plan d'une entrée périmée
+REFRESH_LOCK_PREFIX = "cache:refresh:"
+
+# Scope ASGI repris pour rafraîchir une entrée hors de la requête d'origine
+REFRESH_SCOPE_KEYS = {
+    "type", "asgi", "http_version", "method", "scheme", "server", "client",
+    "root_path", "path", "raw_path", "query_string", "app",
+}
+REFRESH_DROPPED_HEADERS = {b"accept-encoding", b"authorization", b"cookie"}
+
+# Compteur Prometheus de chaque valeur de X-Cache
+OUTCOME_COUNTERS = {
+    "HIT": cache_hits,
+    "STALE": cache_stale,
+    "STALE-IF-ERROR": cache_stale,
+    "COALESCED": cache_misses,
+    "MISS": cache_misses,
+    "BYPASS": cache_misses,
+}
+
+# Label des chemins sans route (404) : cardinalité bornée
+UNMATCHED_ROUTE = "unmatched"
+
+
+class CacheTTL(NamedTuple):
+    """
+    Durées de vie du cache d'une route, en secondes.
+    
+    soft: la réponse est fraîche
+    hard: entre soft et hard, la réponse périmée est servie immédiatement
+        pendant qu'une seule tâche la rafraîchit (stale-while-revalidate)
+    stale_if_error: conservation après hard, pour servir la réponse périmée
+        si l'origine échoue (None : RESPONSE_CACHE_STALE_IF_ERROR)
+    """
+    soft: int
+    hard: int
+    stale_if_error: Optional[int] = None
+
+
+# Configuration du cache par endpoint : (soft, hard). Elle pilote aussi
+# Cache-Control et le micro-cache nginx (scripts/generate_nginx_cache.py)
+ROUTE_CACHE_TTLS = {
+    # Endpoints avec cache long
+    "/hadith/collections": CacheTTL(3600, 7200),  # 1 heure, périmé jusqu'à 2 heures
+    "/hadith/categories": CacheTTL(3600, 7200),
+    "/quran/surahs": CacheTTL(3600, 86400),
+    "/quran/juzs": CacheTTL(3600, 86400),
+    
+    # Endpoints avec cache moyen
+    "/hadith/daily": CacheTTL(1800, 3600),  # 30 minutes
+    "/prayer-times": CacheTTL(900, 1800),   # 15 minutes
+    
+    # Endpoints avec cache court
+    "/hadith/search": CacheTTL(300, 600),  # 5 minutes
+    "/quran/search": CacheTTL(300, 600),
+}
+
+# Cache privé des requêtes authentifiées, sur opt-in par endpoint : TTL en
+# secondes, sans fenêtre stale (le rafraîchissement en arrière-plan est
+# anonyme). Les endpoints d'écriture invalident le tag user:<id>
+PRIVATE_ROUTE_CACHE_TTLS = {
+    "/bookmarks": 300,
+    "/favorites/verses": 300,
+    "/prayer-logs": 300,
+    "/prayer-logs/stats": 60,  # Fenêtres glissantes (aujourd'hui, 7 jours...)
+    "/zakat/history": 600,
+    "/zakat/calculations": 600,
+}
+
 
 class CacheMiddleware(BaseHTTPMiddleware):
     """
     Middleware pour cacher automatiquement les réponses GET dans Redis.
+    
+    X-Cache vaut HIT, MISS, COALESCED (réponse d'une requête identique
+    concurrente), STALE (rafraîchissement en arrière-plan), STALE-IF-ERROR
+    ou BYPASS (Redis coupé par le circuit breaker : L1 seul, pas de
+    remplissage).
+    
+    Les requêtes authentifiées ne sont cachées que sur les routes de
+    `private_cache_config`, par utilisateur (id du token d'accès).
     """
     
     def __init__(
         self,
         app,
-        redis_client: redis.Redis,
+        redis_client: Optional[redis.Redis] = None,
         default_ttl: int = 300,  # 5 minutes par défaut
         cache_prefix: str = "api_cache:",
         exclude_paths: list[str] = None,
         include_query_params: bool = True
     ):
         super().__init__(app)
-        self.redis_client = redis_client
+        # Par défaut : le client partagé (pool borné) de la boucle courante
+        self._redis_client = redis_client
         self.default_ttl = default_ttl
         self.cache_prefix = cache_prefix
         self.exclude_paths = exclude_paths or [
@@ -42,22 +169,58 @@ class CacheMiddleware(BaseHTTPMiddleware):
         ]
         self.include_query_params = include_query_params
         
-        # Configuration du cache par endpoint
-        self.cache_config = {
-            # Endpoints avec cache long
-            "/hadith/collections": 3600,  # 1 heure
-            "/hadith/categories": 3600,
-            "/quran/surahs": 3600,
-            "/quran/juzs": 3600,
-            
-            # Endpoints avec cache moyen
-            "/hadith/daily": 1800,  # 30 minutes
-            "/prayer-times": 900,   # 15 minutes
-            
-            # Endpoints avec cache court
-            "/hadith/search": 300,  # 5 minutes
-            "/quran/search": 300,
+        # Coalescence des requêtes identiques concurrentes
+        self.flight = AsyncDistributedSingleFlight("api_cache", redis_client)
+        
+        # Cache L1 en mémoire devant Redis (L2)
+        self.local_cache = response_cache
+        self.l1_stats = response_l1_stats
+        self.l2_stats = response_l2_stats
+        
+        # Configuration du cache par endpoint : (soft, hard)
+        self.cache_config = dict(ROUTE_CACHE_TTLS)
+        self.private_cache_config = dict(PRIVATE_ROUTE_CACHE_TTLS)
+        
+        # Normaliseurs des paramètres de query, par préfixe de route : la
+        # valeur normalisée est aussi celle que reçoit l'endpoint
+        self.query_normalizers: dict[str, dict[str, Normalizer]] = {
+            "/hadith": {
+                "grade": normalize_lower,  # Grades stockés en minuscules
+                "language": normalize_lower,
+                "query": normalize_spaces,
+            },
+            "/quran": {
+                "q": normalize_spaces,
+                "language": normalize_lower,
+            },
+            "/prayer-times": {
+                "latitude": normalize_coordinate,
+                "longitude": normalize_coordinate,
+            },
         }
+        
+        # Headers de requête qui font varier la réponse, par préfixe de route.
+        # Aucun endpoint ne localise ses réponses : Accept-Language n'en fait
+        # pas partie
+        self.cache_vary: dict[str, list[str]] = {}
+        
+        # Tags ajoutés aux tags déduits des paramètres de route
+        # (collection_id, hadith_id) pour l'invalidation ciblée
+        self.cache_tags = {
+            "/hadith": [HADITH_CORPUS_TAG],
+        }
+        
+        # Rafraîchissements en arrière-plan de ce worker, par clé
+        self._refresh_tasks: dict[str, asyncio.Task] = {}
+    
+    @property
+    def redis_client(self) -> redis.Redis:
+        return self._redis_client if self._redis_client is not None else redis_manager.client
+    
+    @property
+    def redis_available(self) -> bool:
+        """Faux tant que le circuit du client partagé est ouvert."""
+        return self._redis_client is not None or redis_manager.available
     
     async def dispatch(
         self,
@@ -73,126 +236,572 @@ class CacheMiddleware(BaseHTTPMiddleware):
         if any(path.startswith(excluded) for excluded in self.exclude_paths):
             return await call_next(request)
         
-        # Vérifier si l'utilisateur est authentifié (ne pas cacher les réponses personnalisées)
+        # Réponses personnalisées : cache privé de l'utilisateur, ou aucun
         if request.headers.get("authorization"):
-            return await call_next(request)
+            return await self._dispatch_private(request, call_next)
+        
+        # Métriques par route (template, pas le chemin : cardinalité bornée)
+        matched_route = self._match_route(request)
+        route = getattr(matched_route, "path", UNMATCHED_ROUTE)
+        
+        # Query canonique : clé de cache et requête transmise à l'endpoint
+        query = self._canonicalize_query(request, matched_route)
         
         # Générer la clé de cache
-        cache_key = self._generate_cache_key(request)
+        cache_key = self._generate_cache_key(request, query)
+        
+        # Redis coupé : pas d'attente de timeout, le L1 seul
+        if not self.redis_available:
+            return await self._dispatch_without_redis(request, call_next, cache_key, route)
+        
+        # Compter les recherches fréquentes, rejouées par le cache warmer
+        if query and is_tracked_query(path, request.headers.get("user-agent")):
+            await record_query(self.redis_client, path, query)
         
         # Essayer de récupérer depuis le cache
+        stale_entry = None
+        cached_entry = await self._load_cached(cache_key, route)
+        if cached_entry is not None:
+            now = time.time()
+            if cached_entry.is_fresh(now):
+                return self._build_response(request, cached_entry, "HIT", cache_key, route)
+            if cached_entry.is_stale_servable(now):
+                # Servir tout de suite, une seule tâche rafraîchit l'entrée
+                self._schedule_refresh(request, cache_key)
+                return self._build_response(request, cached_entry, "STALE", cache_key, route)
+            # Au-delà du hard TTL : gardée uniquement pour stale-if-error
+            stale_entry = cached_entry
+        
+        # Si pas de cache, un seul appel à l'endpoint pour toutes les requêtes
+        # identiques concurrentes (dans ce worker et entre workers)
+        is_leader = False
+        leader_response = None
+        
+        async def compute() -> Optional[CachedEntry]:
+            nonlocal is_leader, leader_response
+            is_leader = True
+            leader_response = await call_next(request)
+            return await self._cache_response(cache_key, request, leader_response)
+        
         try:
-            cached_response = await self.redis_client.get(cache_key)
-            if cached_response:
-                logger.info(f"Cache hit for {path}")
-                
-                # Parser la réponse cachée
-                cached_data = json.loads(cached_response)
-                
-                # Créer la réponse
-                return Response(
-                    content=cached_data["content"],
-                    status_code=cached_data["status_code"],
-                    headers={
-                        **cached_data["headers"],
-                        "X-Cache": "HIT",
-                        "X-Cache-Key": cache_key,
-                    },
-                    media_type=cached_data.get("media_type", "application/json")
-                )
+            cached_entry = await self.flight.do(
+                cache_key, compute, lambda: self._load_servable(cache_key, route)
+            )
         except Exception as e:
-            logger.error(f"Cache error: {e}")
+            if stale_entry is not None:
+                logger.error(f"Origin failed for {path}, serving stale response: {e}")
+                return self._build_response(request, stale_entry, "STALE-IF-ERROR", cache_key, route)
+            if is_leader:
+                raise
+            # Erreur partagée par le leader : refaire la requête nous-mêmes
+            logger.error(f"Coalesced request failed for {path}: {e}")
+            cached_entry = None
         
-        # Si pas de cache, appeler l'endpoint
-        response = await call_next(request)
+        if stale_entry is not None and cached_entry is not None and cached_entry.status_code >= 500:
+            logger.error(f"Origin returned {cached_entry.status_code} for {path}, serving stale response")
+            return self._build_response(request, stale_entry, "STALE-IF-ERROR", cache_key, route)
         
-        # Ne cacher que les réponses réussies (2xx)
-        if 200 <= response.status_code < 300:
-            await self._cache_response(cache_key, path, response)
+        if leader_response is not None:
+            cache_misses.labels(cache_type="response", route=route).inc()
+            # Ajouter les headers de cache
+            if (
+                cached_entry is not None
+                and 200 <= cached_entry.status_code < 300
+                and "set-cookie" not in leader_response.headers
+            ):
+                leader_response.headers.update(
+                    self._http_cache_headers(request, cached_entry, leader_response.headers.get("vary"))
+                )
+            leader_response.headers["X-Cache"] = "MISS"
+            leader_response.headers["X-Cache-Key"] = cache_key
+            return leader_response
         
-        # Ajouter les headers de cache
+        if cached_entry is None:
+            # Réponse du leader non partageable (encodage inconnu)
+            cache_misses.labels(cache_type="response", route=route).inc()
+            return await call_next(request)
+        
+        return self._build_response(request, cached_entry, "COALESCED", cache_key, route)
+    
+    async def _dispatch_private(
+        self,
+        request: Request,
+        call_next: RequestResponseEndpoint
+    ) -> Response:
+        """
+        Cache privé d'une requête authentifiée.
+        
+        La clé porte l'id du token d'accès (signature et expiration
+        vérifiées) ; l'entrée est taguée user:<id>. Sans opt-in de la route,
+        sans id dans le token ou sans Redis, la requête n'est pas cachée.
+        """
+        ttl = self._private_route_ttl(request.url.path)
+        if ttl is None or not self.redis_available:
+            return await call_next(request)
+        scheme, _, token = request.headers["authorization"].partition(" ")
+        user_id = access_token_user_id(token) if scheme.lower() == "bearer" else None
+        if user_id is None:
+            return await call_next(request)
+        
+        matched_route = self._match_route(request)
+        route = getattr(matched_route, "path", UNMATCHED_ROUTE)
+        query = self._canonicalize_query(request, matched_route)
+        cache_key = self._generate_cache_key(request, query, f"private:{user_id}:")
+        
+        cached_entry = await self._load_cached(cache_key, route)
+        if cached_entry is not None and cached_entry.is_fresh(time.time()):
+            return self._build_response(request, cached_entry, "HIT", cache_key, route)
+        
+        cache_misses.labels(cache_type="response", route=route).inc()
+        response = await call_next(request)
+        cached_entry = await self._cache_response(
+            cache_key, request, response, CacheTTL(ttl, ttl, 0), [user_tag(user_id)]
+        )
+        if cached_entry is not None and 200 <= cached_entry.status_code < 300:
+            response.headers.update(
+                self._http_cache_headers(request, cached_entry, response.headers.get("vary"))
+            )
         response.headers["X-Cache"] = "MISS"
         response.headers["X-Cache-Key"] = cache_key
+        return response
+    
+    async def _dispatch_without_redis(
+        self,
+        request: Request,
+        call_next: RequestResponseEndpoint,
+        cache_key: str,
+        route: str
+    ) -> Response:
+        """Servir depuis le L1 si l'entrée est fraîche, sinon l'endpoint directement."""
+        cached_entry = self.local_cache.get(cache_key)
+        if cached_entry is not None and cached_entry.is_fresh(time.time()):
+            self.l1_stats.hit(route)
+            return self._build_response(request, cached_entry, "HIT", cache_key, route)
         
+        cache_misses.labels(cache_type="response", route=route).inc()
+        response = await call_next(request)
+        response.headers["X-Cache"] = "BYPASS"
         return response
     
-    def _generate_cache_key(self, request: Request) -> str:
-        """Générer une clé de cache unique pour la requête."""
-        parts = [
-            self.cache_prefix,
-            request.url.path,
+    async def _load_cached(self, cache_key: str, route: str) -> Optional[CachedEntry]:
+        """Lire une réponse cachée depuis le cache L1, puis Redis (latence mesurée)."""
+        start = time.perf_counter()
+        try:
+            return await self._lookup(cache_key, route)
+        finally:
+            cache_lookup_duration_seconds.labels(cache_type="response", route=route).observe(
+                time.perf_counter() - start
+            )
+    
+    async def _lookup(self, cache_key: str, route: str) -> Optional[CachedEntry]:
+        cached_entry = self.local_cache.get(cache_key)
+        if cached_entry is not None and cached_entry.is_fresh(time.time()):
+            self.l1_stats.hit(route)
+            return cached_entry
+        # Une copie périmée a pu être rafraîchie par un autre worker : relire Redis
+        self.l1_stats.miss(route)
+        
+        try:
+            # GET + PTTL en un seul aller-retour : le L1 n'expire pas après Redis
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.get(cache_key)
+                pipe.pttl(cache_key)
+                cached_response, pttl = await pipe.execute()
+            
+            if cached_response:
+                # Seules les métadonnées sont décodées, les bodies restent tels quels
+                cached_entry = CachedEntry.decode(cached_response)
+                self.l2_stats.hit(route)
+                self.local_cache.set(
+                    cache_key,
+                    cached_entry,
+                    len(cached_response),
+                    pttl / 1000 if pttl and pttl > 0 else None
+                )
+                return cached_entry
+            self.l2_stats.miss(route)
+        except CacheEntryError as e:
+            # Ancien format ou entrée corrompue : traitée comme un miss
+            logger.warning(f"Unreadable cache entry {cache_key}: {e}")
+            self.l2_stats.miss(route)
+        except CircuitOpenError:
+            pass  # Circuit ouvert pendant la requête : miss sans log
+        except Exception as e:
+            logger.error(f"Cache error: {e}")
+        return None
+    
+    async def _load_servable(self, cache_key: str, route: str) -> Optional[CachedEntry]:
+        """Entrée remplie par le leader (fraîche ou encore dans sa fenêtre stale)."""
+        cached_entry = await self._load_cached(cache_key, route)
+        if cached_entry is not None and time.time() < cached_entry.stale_until:
+            return cached_entry
+        return None
+    
+    def _build_response(
+        self,
+        request: Request,
+        cached_entry: CachedEntry,
+        status: str,
+        cache_key: str,
+        route: str
+    ) -> Response:
+        """Recréer une réponse avec la variante acceptée par le client."""
+        encoding, body = cached_entry.select(request.headers.get("accept-encoding", ""))
+        headers = cached_entry.response_headers(encoding)
+        headers.update(self._http_cache_headers(request, cached_entry, headers.get("vary")))
+        
+        OUTCOME_COUNTERS[status].labels(cache_type="response", route=route).inc()
+        cache_bytes_served.labels(route=route, encoding=encoding).inc(len(body))
+        # Clés privées hors du classement : une par utilisateur
+        if status != "COALESCED" and "authorization" not in request.headers:
+            key_hits.record(cache_key)
+        
+        return Response(
+            content=body,
+            status_code=cached_entry.status_code,
+            headers={
+                **headers,
+                "X-Cache": status,
+                "X-Cache-Key": cache_key,
+            },
+            media_type=cached_entry.media_type or "application/json"
+        )
+    
+    def _http_cache_headers(
+        self,
+        request: Request,
+        cached_entry: CachedEntry,
+        vary: Optional[str]
+    ) -> dict[str, str]:
+        """
+        Cache-Control, Surrogate-Control et Vary d'une réponse cachée.
+        
+        Les durées viennent des TTL de la route ; Vary reprend les headers
+        de la clé de cache (cache_vary) et Accept-Encoding dès que l'entrée a
+        des variantes compressées, MISS compris. Une réponse privée n'est
+        gardée par aucun cache partagé et toujours revalidée par le navigateur.
+        """
+        if len(cached_entry.variants) > 1:
+            vary = merge_vary(vary, "Accept-Encoding")
+        if "authorization" in request.headers:
+            return {"cache-control": "private, no-cache", "vary": merge_vary(vary, "Authorization")}
+        
+        headers = cache_control_headers(
+            cached_entry,
+            time.time(),
+            self._stale_if_error(self._route_ttl(request.url.path)),
+            settings.RESPONSE_CACHE_BROWSER_MAX_AGE,
+        )
+        for route_vary in self._route_settings(self.cache_vary, request.url.path):
+            for header in route_vary:
+                vary = merge_vary(vary, header)
+        if vary:
+            headers["vary"] = vary
+        return headers
+    
+    def _match_route(self, request: Request):
+        """
+        Route qui servira la requête, ou None.
+        
+        Le routage n'a pas encore eu lieu : les routes sont testées comme le
+        fera le routeur.
+        """
+        app = request.scope.get("app")
+        for route in getattr(app, "routes", ()):
+            match, _ = route.matches(request.scope)
+            if match == Match.FULL:
+                return route
+        return None
+    
+    def _route_template(self, request: Request) -> str:
+        """Template de la route (ex: /api/hadith/{hadith_id})."""
+        return getattr(self._match_route(request), "path", UNMATCHED_ROUTE)
+    
+    def _route_settings(self, config: dict, path: str) -> list:
+        """Valeurs de `config` dont le préfixe correspond à la route, du plus court au plus long."""
+        route_path = self._route_path(path)
+        return [
+            value for pattern, value in sorted(config.items())
+            if route_path == pattern or route_path.startswith(pattern + "/")
         ]
+    
+    def _canonicalize_query(self, request: Request, route) -> str:
+        """
+        Réécrire la query de la requête sous sa forme canonique.
         
-        # Inclure les query params si configuré
-        if self.include_query_params and request.url.query:
-            # Trier les params pour consistance
-            sorted_params = sorted(request.url.query.split("&"))
-            parts.append("?" + "&".join(sorted_params))
+        Seuls les paramètres déclarés par l'endpoint sont gardés, sans ceux
+        égaux à leur valeur par défaut, normalisés et triés ; la requête
+        transmise à l'endpoint porte la même query que la clé.
+        """
+        if not self.include_query_params or not request.url.query:
+            return ""
+        if not hasattr(route, "dependant"):
+            # Route inconnue (404) : seul l'ordre est normalisé
+            return "&".join(sorted(request.url.query.split("&")))
         
-        # Inclure certains headers importants
-        accept_language = request.headers.get("accept-language", "en")
-        parts.append(f"lang:{accept_language[:2]}")
+        normalizers: dict[str, Normalizer] = {}
+        for route_normalizers in self._route_settings(self.query_normalizers, request.url.path):
+            normalizers.update(route_normalizers)
+        
+        query = canonical_query(
+            route_query_params(route), request.query_params.multi_items(), normalizers
+        )
+        request.scope["query_string"] = query.encode("latin-1")
+        return query
+    
+    def _route_path(self, path: str) -> str:
+        """Chemin sans le préfixe d'API (/api, /api/v1), comme dans cache_config."""
+        for prefix in ("/api/v1", "/api"):
+            if path.startswith(prefix + "/"):
+                return path[len(prefix):]
+        return path
+    
+    def _route_ttl(self, path: str) -> CacheTTL:
+        """TTL configurés pour la route (sans fenêtre stale par défaut)."""
+        route_path = self._route_path(path)
+        for pattern, ttl in self.cache_config.items():
+            if route_path.startswith(pattern):
+                return ttl
+        return CacheTTL(self.default_ttl, self.default_ttl)
+    
+    def _private_route_ttl(self, path: str) -> Optional[int]:
+        """TTL du cache privé de la route (préfixe le plus long), None sans opt-in."""
+        ttls = self._route_settings(self.private_cache_config, path)
+        return ttls[-1] if ttls else None
+    
+    def _stale_if_error(self, ttl: CacheTTL) -> int:
+        """Conservation après le hard TTL pour stale-if-error."""
+        if ttl.stale_if_error is None:
+            return settings.RESPONSE_CACHE_STALE_IF_ERROR
+        return ttl.stale_if_error
+    
+    def _response_tags(self, request: Request) -> list[str]:
+        """
+        Tags d'invalidation d'une réponse.
+        
+        Les paramètres de route sont connus après le routage (call_next). Les
+        réponses propres à une collection ou à un hadith ne portent que leur
+        tag ; les autres réponses hadith (listes, recherche, quotidien...)
+        portent le tag du corpus.
+        """
+        params = request.path_params
+        tags = []
+        if "collection_id" in params:
+            tags.append(collection_tag(params["collection_id"]))
+        if "hadith_id" in params:
+            tags.append(hadith_tag(params["hadith_id"]))
+        if tags:
+            return tags
+        
+        route_path = self._route_path(request.url.path)
+        for pattern, route_tags in self.cache_tags.items():
+            if route_path == pattern or route_path.startswith(pattern + "/"):
+                tags.extend(route_tags)
+        return tags
+    
+    def _generate_cache_key(self, request: Request, query: str, scope: str = "") -> str:
+        """Générer la clé de cache : portée (cache privé), chemin, query canonique et headers déclarés."""
+        parts = [f"{self.cache_prefix}{scope}{request.url.path}"]
+        if query:
+            parts.append(f"?{query}")
+        
+        # Headers qui font varier la réponse de cette route
+        for vary in self._route_settings(self.cache_vary, request.url.path):
+            for header in vary:
+                parts.append(f"|{header.lower()}={request.headers.get(header, '')}")
         
         # Créer un hash pour éviter les clés trop longues
-        key_string = ":".join(parts)
+        key_string = "".join(parts)
         if len(key_string) > 200:
             # Hash les parties longues
             hash_part = hashlib.md5(key_string.encode()).hexdigest()[:16]
-            key_string = f"{self.cache_prefix}{request.url.path}:{hash_part}"
+            key_string = f"{self.cache_prefix}{scope}{request.url.path}:{hash_part}"
         
         return key_string
     
     async def _cache_response(
         self,
         cache_key: str,
-        path: str,
-        response: StarletteResponse
-    ) -> None:
-        """Cacher la réponse dans Redis."""
+        request: Request,
+        response: StarletteResponse,
+        ttl: Optional[CacheTTL] = None,
+        tags: Optional[list[str]] = None
+    ) -> Optional[CachedEntry]:
+        """
+        Lire la réponse et la cacher dans Redis si elle est réussie (2xx).
+        
+        Returns:
+            L'entrée, partagée avec les requêtes coalescées, ou None si le
+            body est dans un encodage non supporté
+        """
+        # Lire le body de la réponse
+        body = b""
+        async for chunk in response.body_iterator:
+            body += chunk
+        
+        # Recréer le body_iterator
+        async def body_iterator():
+            yield body
+        
+        response.body_iterator = body_iterator()
+        
+        return await self._store_response(
+            cache_key, request, response.status_code, dict(response.headers),
+            response.media_type, body, ttl, tags
+        )
+    
+    async def _store_response(
+        self,
+        cache_key: str,
+        request: Request,
+        status_code: int,
+        headers: dict,
+        media_type: Optional[str],
+        body: bytes,
+        ttl: Optional[CacheTTL] = None,
+        tags: Optional[list[str]] = None
+    ) -> Optional[CachedEntry]:
+        """
+        Construire l'entrée d'une réponse et la cacher si elle est réussie (2xx).
+        
+        Les variantes br et gzip sont calculées ici, une fois par remplissage,
+        hors de la boucle d'événements. La clé Redis vit hard + stale_if_error.
+        `ttl` et `tags` remplacent ceux déduits de la route (cache privé).
+        """
+        path = request.url.path
+        
+        # Ne cacher (et compresser) que les réponses réussies (2xx)
+        cacheable = 200 <= status_code < 300
         try:
-            # Lire le body de la réponse
-            body = b""
-            async for chunk in response.body_iterator:
-                body += chunk
-            
-            # Recréer le body_iterator
-            async def body_iterator():
-                yield body
-            
-            response.body_iterator = body_iterator()
-            
-            # Déterminer le TTL
-            ttl = self.default_ttl
-            for pattern, config_ttl in self.cache_config.items():
-                if path.startswith(pattern):
-                    ttl = config_ttl
-                    break
+            cached_entry = await run_in_threadpool(
+                build_entry, status_code, headers, media_type, body, cacheable
+            )
+        except Exception as e:
+            logger.error(f"Failed to prepare cached response for {path}: {e}")
+            return None
+        
+        if cached_entry is None or not cacheable:
+            return cached_entry
+        
+        try:
+            # Déterminer les TTL
+            ttl = ttl or self._route_ttl(path)
+            hard_ttl = max(ttl.hard, ttl.soft)
+            expire = hard_ttl + self._stale_if_error(ttl)
             
-            # Préparer les données à cacher
-            cache_data = {
-                "content": body.decode("utf-8") if body else "",
-                "status_code": response.status_code,
-                "headers": dict(response.headers),
-                "media_type": response.media_type,
-            }
+            now = time.time()
+            cached_entry.fresh_until = now + ttl.soft
+            cached_entry.stale_until = now + hard_ttl
             
-            # Supprimer les headers qui ne doivent pas être cachés
-            headers_to_remove = ["set-cookie", "x-cache", "x-cache-key"]
-            for header in headers_to_remove:
-                cache_data["headers"].pop(header, None)
+            # Cacher dans Redis (bytes bruts) avec ses tags en un aller-retour,
+            # puis dans le L1
+            serialized = cached_entry.encode()
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.setex(cache_key, expire, serialized)
+                register_tags(
+                    pipe, cache_key, self._response_tags(request) if tags is None else tags, expire
+                )
+                track_entry(
+                    pipe, f"{self.cache_prefix}{self._route_template(request)}",
+                    cache_key, len(serialized), expire
+                )
+                await pipe.execute()
+            self.local_cache.set(cache_key, cached_entry, len(serialized), expire)
             
-            # Cacher dans Redis
-            await self.redis_client.setex(
-                cache_key,
-                ttl,
-                json.dumps(cache_data)
+            logger.debug(
+                f"Cached response for {path} with TTL {ttl.soft}s/{hard_ttl}s "
+                f"({', '.join(cached_entry.variants)})"
             )
             
-            logger.info(f"Cached response for {path} with TTL {ttl}s")
-            
+        except CircuitOpenError:
+            pass
         except Exception as e:
             logger.error(f"Failed to cache response: {e}")
-
+        
+        return cached_entry
+    
+    def _schedule_refresh(self, request: Request, cache_key: str) -> None:
+        """Lancer le rafraîchissement d'une entrée périmée, une fois par worker."""
+        if cache_key in self._refresh_tasks:
+            return
+        
+        # Requête anonyme et sans compression : seul le contenu est rafraîchi
+        scope = {
+            key: value for key, value in request.scope.items()
+            if key in REFRESH_SCOPE_KEYS
+        }
+        scope["headers"] = [
+            (name, value) for name, value in request.scope["headers"]
+            if name not in REFRESH_DROPPED_HEADERS
+        ]
+        
+        task = asyncio.create_task(self._refresh(scope, cache_key))
+        self._refresh_tasks[cache_key] = task
+        task.add_done_callback(lambda _: self._refresh_tasks.pop(cache_key, None))
+    
+    async def _refresh(self, scope: dict, cache_key: str) -> None:
+        """
+        Rafraîchir une entrée en arrière-plan.
+        
+        Un verrou Redis garantit un seul rafraîchissement entre tous les
+        workers ; en cas d'échec, l'entrée périmée reste servie.
+        """
+        lock_key = f"{REFRESH_LOCK_PREFIX}{cache_key}"
+        token = uuid.uuid4().hex
+        timeout = settings.RESPONSE_CACHE_REFRESH_TIMEOUT
+        
+        try:
+            acquired = await self.redis_client.set(
+                lock_key, token, nx=True, px=int(timeout * 1000)
+            )
+        except CircuitOpenError:
+            return
+        except Exception as e:
+            logger.warning(f"Refresh lock unavailable for {cache_key}: {e}")
+            return
+        if not acquired:
+            return  # Déjà en cours dans un autre worker
+        
+        try:
+            status_code, headers, body = await asyncio.wait_for(
+                self._call_origin(scope), timeout
+            )
+            await self._store_response(
+                cache_key, Request(scope), status_code, headers, None, body
+            )
+        except Exception as e:
+            logger.error(f"Background refresh failed for {scope['path']}: {e}")
+        finally:
+            try:
+                await self.redis_client.eval(RELEASE_SCRIPT, 1, lock_key, token)
+            except Exception:
+                pass  # Expire tout seul
+    
+    async def _call_origin(self, scope: dict) -> tuple[int, dict, bytes]:
+        """Exécuter la requête sur l'application, hors de tout client HTTP."""
+        status_code = 500
+        headers: dict = {}
+        chunks = []
+        request_sent = False
+        
+        async def receive() -> dict:
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            # Pas de déconnexion : attendre la fin de la réponse
+            await asyncio.Event().wait()
+        
+        async def send(message: dict) -> None:
+            nonlocal status_code, headers
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = dict(Headers(raw=message.get("headers", [])))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+        
+        await self.app(scope, receive, send)
+        return status_code, headers, b"".join(chunks)
 
 def cache_key_wrapper(
     prefix: str = "",
@@ -243,18 +852,35 @@ def cache_key_wrapper(
 
 
 async def get_redis_client() -> redis.Redis:
-    """Obtenir une instance du client Redis."""
-    return redis.from_url(
-        settings.REDIS_URL,
-        encoding="utf-8",
-        decode_responses=True
-    )
+    """
+    Obtenir le client Redis partagé de l'application (pool borné).
+    
+    Les réponses ne sont pas décodées : le cache HTTP stocke des bytes bruts
+    (variantes compressées).
+    """
+    return redis_manager.client
+
+
+async def invalidate_cache_tags(*tags: str) -> int:
+    """
+    Invalider les réponses cachées enregistrées sous ces tags.
+    
+    Args:
+        tags: Tags (ex: "collection:bukhari", "hadith:123")
+        
+    Returns:
+        Nombre de clés supprimées
+    """
+    return await invalidate_tags(await get_redis_client(), tags)
 
 
 async def invalidate_cache_pattern(pattern: str) -> int:
     """
     Invalider toutes les clés de cache correspondant à un pattern.
     
+    Parcourt le keyspace avec SCAN (jamais KEYS) : préférer
+    invalidate_cache_tags.
+    
     Args:
         pattern: Pattern Redis (ex: "api_cache:hadith*")
         
@@ -262,38 +888,41 @@ async def invalidate_cache_pattern(pattern: str) -> int:
         Nombre de clés supprimées
     """
     redis_client = await get_redis_client()
-    keys = await redis_client.keys(pattern)
     
-    if keys:
-        return await redis_client.delete(*keys)
+    # Caches L1 de ce worker et de tous les autres
+    invalidate_local(patterns=[pattern])
+    await publish_invalidation(redis_client, patterns=[pattern])
     
-    return 0
+    return await scan_delete(redis_client, pattern)
 
 
-async def get_cache_stats() -> dict:
-    """Obtenir les statistiques du cache."""
-    redis_client = await get_redis_client()
+async def get_cache_stats(top: int = 20) -> dict:
+    """
+    Obtenir les statistiques du cache.
     
-    # Compter les clés par type
-    api_cache_keys = await redis_client.keys("api_cache:*")
+    Clés les plus servies et mémoire par préfixe (route pour les réponses),
+    tenues à jour à chaque écriture : aucun parcours du keyspace.
+    """
+    redis_client = await get_redis_client()
+    usage = await cache_usage(redis_client, top)
     
-    # Calculer la taille totale
-    total_size = 0
-    for key in api_cache_keys[:100]:  # Échantillon pour éviter de bloquer
-        try:
-            value = await redis_client.get(key)
-            if value:
-                total_size += len(value)
-        except:
-            pass
+    # Réponses HTTP : préfixes de CacheMiddleware
+    responses = [item for item in usage["prefixes"] if item["prefix"].startswith("api_cache:")]
+    total_size = sum(item["bytes"] for item in responses)
     
     # Infos Redis
     info = await redis_client.info()
     
     return {
-        "total_keys": len(api_cache_keys),
+        "total_keys": sum(item["entries"] for item in responses),
         "estimated_size_mb": round(total_size / 1024 / 1024, 2),
         "hit_rate": info.get("keyspace_hits", 0) / max(info.get("keyspace_hits", 0) + info.get("keyspace_misses", 1), 1) * 100,
         "memory_used_mb": round(info.get("used_memory", 0) / 1024 / 1024, 2),
         "evicted_keys": info.get("evicted_keys", 0),
+        "tiers": {
+            "l1": {**response_l1_stats.stats(), **response_cache.stats()},
+            "l2": response_l2_stats.stats(),
+        },
+        "prefixes": usage["prefixes"],
+        "top_keys": usage["top_keys"],
     }
\ No newline at end of file
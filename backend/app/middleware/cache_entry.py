@@ -0,0 +1,331 @@
+"""
+Format binaire des réponses cachées, avec variantes précompressées.
+
+Une entrée est stockée telle quelle dans Redis (bytes) :
+
+    en-tête fixe   magic "RC", version, status HTTP, taille des métadonnées,
+                   nombre de variantes
+    métadonnées    JSON UTF-8 : headers, media type et fenêtres de fraîcheur
+    table          pour chaque variante : code d'encodage, taille du body
+    bodies         les variantes concaténées (identity, br, gzip)
+
+La compression est faite une seule fois, au remplissage du cache. Un hit
+renvoie la variante acceptée par le client sans décompresser ni recompresser.
+"""
+import gzip
+import json
+import math
+import struct
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+from app.core.config import settings
+
+MAGIC = b"RC"
+FORMAT_VERSION = 1
+
+HEADER = struct.Struct("!2sBHIB")
+VARIANT = struct.Struct("!BI")
+
+ENCODING_CODES = {"identity": 0, "gzip": 1, "br": 2}
+ENCODING_NAMES = {code: name for name, code in ENCODING_CODES.items()}
+
+# Ordre de préférence à qualité égale dans Accept-Encoding
+PREFERRED_ENCODINGS = ("br", "gzip", "identity")
+
+# Headers recalculés à chaque réponse ou propres à une requête
+EXCLUDED_HEADERS = {
+    "content-length", "content-encoding", "set-cookie", "x-cache", "x-cache-key",
+    "cache-control", "surrogate-control",
+}
+
+# Headers CORS calculés pour l'Origin de la requête, absente de la clé
+EXCLUDED_HEADER_PREFIXES = ("access-control-",)
+
+# Types déjà compressés
+SKIP_COMPRESSION_TYPES = ("image/", "video/", "audio/", "application/zip", "application/gzip")
+
+
+class CacheEntryError(ValueError):
+    """Entrée illisible (autre format, version inconnue ou tronquée)."""
+
+
+@dataclass
+class CachedEntry:
+    """
+    Réponse cachée : status, headers et body par encodage.
+
+    `fresh_until` et `stale_until` sont des timestamps Unix : fraîche avant
+    le premier, servie périmée (et rafraîchie en arrière-plan) avant le second.
+    """
+
+    status_code: int
+    headers: Dict[str, str]
+    media_type: Optional[str]
+    variants: Dict[str, bytes] = field(default_factory=dict)
+    fresh_until: float = math.inf
+    stale_until: float = math.inf
+
+    def is_fresh(self, now: float) -> bool:
+        return now < self.fresh_until
+
+    def is_stale_servable(self, now: float) -> bool:
+        """Périmée mais encore servable en stale-while-revalidate."""
+        return self.fresh_until <= now < self.stale_until
+
+    def encode(self) -> bytes:
+        meta = json.dumps(
+            {
+                "headers": self.headers,
+                "media_type": self.media_type,
+                "fresh_until": self.fresh_until,
+                "stale_until": self.stale_until,
+            },
+            separators=(",", ":")
+        ).encode("utf-8")
+        parts: List[bytes] = [
+            HEADER.pack(MAGIC, FORMAT_VERSION, self.status_code, len(meta), len(self.variants)),
+            meta,
+        ]
+        parts.extend(
+            VARIANT.pack(ENCODING_CODES[encoding], len(body))
+            for encoding, body in self.variants.items()
+        )
+        parts.extend(self.variants.values())
+        return b"".join(parts)
+
+    @classmethod
+    def decode(cls, raw: bytes) -> "CachedEntry":
+        """
+        Relire une entrée ; seules les métadonnées sont parsées.
+
+        Raises:
+            CacheEntryError: Si les données ne sont pas une entrée valide
+        """
+        try:
+            magic, version, status_code, meta_length, count = HEADER.unpack_from(raw, 0)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise CacheEntryError(f"Unsupported cache entry format {magic!r} v{version}")
+
+            offset = HEADER.size
+            meta = json.loads(raw[offset:offset + meta_length])
+            offset += meta_length
+
+            table = []
+            for _ in range(count):
+                code, length = VARIANT.unpack_from(raw, offset)
+                table.append((ENCODING_NAMES[code], length))
+                offset += VARIANT.size
+
+            variants = {}
+            for encoding, length in table:
+                variants[encoding] = raw[offset:offset + length]
+                offset += length
+        except (struct.error, KeyError, ValueError) as e:
+            raise CacheEntryError(str(e)) from e
+
+        if offset != len(raw) or "identity" not in variants:
+            raise CacheEntryError("Truncated cache entry")
+
+        return cls(
+            status_code,
+            meta["headers"],
+            meta["media_type"],
+            variants,
+            meta.get("fresh_until", math.inf),
+            meta.get("stale_until", math.inf),
+        )
+
+    def select(self, accept_encoding: str) -> Tuple[str, bytes]:
+        """Variante à renvoyer pour ce header Accept-Encoding."""
+        encoding = negotiate_encoding(accept_encoding, self.variants)
+        return encoding, self.variants[encoding]
+
+    def response_headers(self, encoding: str) -> Dict[str, str]:
+        """Headers de la réponse pour la variante choisie."""
+        headers = dict(self.headers)
+        if encoding != "identity":
+            headers["content-encoding"] = encoding
+        if len(self.variants) > 1:
+            headers["vary"] = merge_vary(headers.get("vary"), "Accept-Encoding")
+        return headers
+
+
+def parse_accept_encoding(accept_encoding: str) -> Dict[str, float]:
+    """Encodages acceptés et leur qualité (q)."""
+    qualities: Dict[str, float] = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name] = quality
+    return qualities
+
+
+def negotiate_encoding(
+    accept_encoding: str,
+    available: Iterable[str],
+    preferred: Iterable[str] = PREFERRED_ENCODINGS
+) -> str:
+    """
+    Choisir le meilleur encodage disponible.
+
+    La qualité la plus haute gagne, dans l'ordre de `preferred` à égalité
+    (br puis gzip par défaut) ; identity sert de repli (toujours stockée).
+    """
+    qualities = parse_accept_encoding(accept_encoding or "")
+    wildcard = qualities.get("*", 0.0)
+
+    best, best_quality = "identity", 0.0
+    for encoding in preferred:
+        if encoding == "identity" or encoding not in available:
+            continue
+        quality = qualities.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+
+    identity_quality = qualities.get("identity", 1.0 if "*" not in qualities else wildcard)
+    if best != "identity" and identity_quality > best_quality:
+        return "identity"
+    return best
+
+
+def cache_control_headers(
+    entry: CachedEntry,
+    now: float,
+    stale_if_error: int,
+    browser_max_age: int
+) -> Dict[str, str]:
+    """
+    Headers de cache HTTP d'une réponse cachée, dérivés de ses fenêtres.
+
+    Les navigateurs, que l'invalidation par tags n'atteint pas, gardent la
+    réponse au plus `browser_max_age` ; Surrogate-Control donne aux CDN la
+    fraîcheur restante de l'entrée. Les deux suivent le cache Redis : une
+    réponse STALE part avec max-age=0 et le reste de sa fenêtre stale.
+
+    Args:
+        entry: Entrée servie
+        now: Timestamp Unix courant
+        stale_if_error: Conservation après le hard TTL, en secondes
+        browser_max_age: max-age maximal côté navigateur
+
+    Returns:
+        Cache-Control et Surrogate-Control (aucun sans fenêtres)
+    """
+    if not math.isfinite(entry.stale_until):
+        return {}
+    max_age = max(0, int(entry.fresh_until - now))
+    stale_while_revalidate = max(0, int(entry.stale_until - max(now, entry.fresh_until)))
+    directives = f"stale-while-revalidate={stale_while_revalidate}, stale-if-error={stale_if_error}"
+    return {
+        "cache-control": f"public, max-age={min(max_age, browser_max_age)}, {directives}",
+        "surrogate-control": f"max-age={max_age}, {directives}",
+    }
+
+
+def merge_vary(vary: Optional[str], header: str) -> str:
+    values = [value.strip() for value in (vary or "").split(",") if value.strip()]
+    if header.lower() not in (value.lower() for value in values):
+        values.append(header)
+    return ", ".join(values)
+
+
+def decode_body(body: bytes, content_encoding: Optional[str]) -> Optional[bytes]:
+    """Body en clair, ou None si l'encodage n'est pas supporté."""
+    encoding = (content_encoding or "identity").strip().lower()
+    if encoding == "identity":
+        return body
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "br" and HAS_BROTLI:
+        return brotli.decompress(body)
+    if encoding == "zstd" and HAS_ZSTD:
+        # Trames sans taille de contenu (compression en streaming)
+        return zstandard.ZstdDecompressor().decompressobj().decompress(body)
+    return None
+
+
+def build_entry(
+    status_code: int,
+    headers: Dict[str, str],
+    media_type: Optional[str],
+    body: bytes,
+    compress: bool = True
+) -> Optional[CachedEntry]:
+    """
+    Construire une entrée depuis une réponse de l'application.
+
+    Un body déjà compressé (par CompressionMiddleware) est d'abord remis en
+    clair, puis br et gzip sont calculés avec les niveaux élevés de la
+    configuration : ce coût est payé une fois par remplissage.
+
+    Args:
+        status_code: Status HTTP
+        headers: Headers de la réponse (noms en minuscules)
+        media_type: Media type de la réponse
+        body: Body tel qu'envoyé par l'application
+        compress: Calculer les variantes compressées
+
+    Returns:
+        L'entrée, ou None si le body est dans un encodage non supporté
+    """
+    identity = decode_body(body, headers.get("content-encoding"))
+    if identity is None:
+        return None
+
+    stored_headers = {
+        name: value for name, value in headers.items()
+        if name.lower() not in EXCLUDED_HEADERS
+        and not name.lower().startswith(EXCLUDED_HEADER_PREFIXES)
+    }
+    if "vary" in stored_headers:
+        # Remis par response_headers() quand il y a plusieurs variantes
+        values = [
+            value.strip() for value in stored_headers.pop("vary").split(",")
+            if value.strip() and value.strip().lower() != "accept-encoding"
+        ]
+        if values:
+            stored_headers["vary"] = ", ".join(values)
+
+    entry = CachedEntry(status_code, stored_headers, media_type, {"identity": identity})
+
+    content_type = headers.get("content-type", media_type or "")
+    if (
+        not compress
+        or len(identity) < settings.RESPONSE_CACHE_MIN_COMPRESS_SIZE
+        or content_type.startswith(SKIP_COMPRESSION_TYPES)
+    ):
+        return entry
+
+    # Ne garder une variante que si elle gagne au moins 10 %
+    max_size = len(identity) * 0.9
+    if HAS_BROTLI:
+        compressed = brotli.compress(
+            identity, quality=settings.RESPONSE_CACHE_BROTLI_QUALITY, mode=brotli.MODE_TEXT
+        )
+        if len(compressed) < max_size:
+            entry.variants["br"] = compressed
+    compressed = gzip.compress(identity, compresslevel=settings.RESPONSE_CACHE_GZIP_LEVEL)
+    if len(compressed) < max_size:
+        entry.variants["gzip"] = compressed
+
+    return entry
@@ -0,0 +1,151 @@
+"""
+Clés canoniques du cache HTTP.
+
+La query string d'une requête est réécrite à partir des paramètres que la
+route déclare (FastAPI) : les paramètres inconnus de l'endpoint sont
+ignorés, ceux égaux à leur valeur par défaut sont omis, les valeurs sont
+normalisées (entiers, booléens, normaliseurs déclarés) puis triées. La même
+query canonique sert de clé et est transmise à l'endpoint, si bien que deux
+requêtes de même clé produisent toujours la même réponse.
+"""
+import re
+import types
+import typing
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from fastapi.dependencies.utils import get_flat_dependant, is_scalar_sequence_field
+
+Normalizer = Callable[[str], str]
+
+TRUE_VALUES = {"1", "true", "on", "yes"}
+FALSE_VALUES = {"0", "false", "off", "no"}
+
+
+def normalize_lower(value: str) -> str:
+    """Valeurs insensibles à la casse (grades, langues : stockés en minuscules)."""
+    return value.strip().lower()
+
+
+def normalize_spaces(value: str) -> str:
+    """Texte libre : espaces de début, de fin et multiples sans effet."""
+    return re.sub(r"\s+", " ", value).strip()
+
+
+def normalize_coordinate(value: str) -> str:
+    """Coordonnées arrondies à 2 décimales (~1 km), comme PrayerCache."""
+    try:
+        return str(round(float(value), 2))
+    except ValueError:
+        return value
+
+
+@dataclass(frozen=True)
+class QueryParam:
+    """Paramètre de query déclaré par un endpoint."""
+    alias: str
+    kind: Optional[type]  # int, float, bool ou None (texte)
+    default: Optional[str]  # Valeur canonique par défaut, None si aucune
+    many: bool
+
+
+def _scalar_type(annotation: Any) -> Optional[type]:
+    """int / float / bool d'une annotation (Optional[...] compris)."""
+    if typing.get_origin(annotation) in (typing.Union, types.UnionType):
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        annotation = args[0] if len(args) == 1 else None
+    return annotation if annotation in (int, float, bool) else None
+
+
+def canonical_value(value: str, kind: Optional[type], normalizer: Optional[Normalizer] = None) -> str:
+    """Forme canonique d'une valeur ; une valeur invalide est gardée telle quelle (422)."""
+    if normalizer is not None:
+        value = normalizer(value)
+    if kind is bool:
+        lowered = value.strip().lower()
+        if lowered in TRUE_VALUES:
+            return "true"
+        if lowered in FALSE_VALUES:
+            return "false"
+    elif kind is int:
+        try:
+            return str(int(value))
+        except ValueError:
+            pass
+    elif kind is float:
+        try:
+            return repr(float(value))
+        except ValueError:
+            pass
+    return value
+
+
+def _declared_default(field, kind: Optional[type]) -> Optional[str]:
+    if field.required or field.default is None:
+        return None
+    default = field.default
+    if isinstance(default, (list, tuple)):
+        return None
+    if isinstance(default, bool):
+        return "true" if default else "false"
+    return canonical_value(str(default), kind)
+
+
+# Par id de route (les routes ne sont pas hashables et vivent autant que l'app)
+_specs: Dict[int, Tuple[QueryParam, ...]] = {}
+
+
+def route_query_params(route) -> Tuple[QueryParam, ...]:
+    """Paramètres de query déclarés par une route (dépendances comprises), mis en cache."""
+    params = _specs.get(id(route))
+    if params is None:
+        fields = get_flat_dependant(route.dependant).query_params
+        declared = []
+        for field in fields:
+            kind = _scalar_type(field.field_info.annotation)
+            declared.append(QueryParam(
+                alias=field.alias,
+                kind=kind,
+                default=_declared_default(field, kind),
+                many=is_scalar_sequence_field(field),
+            ))
+        params = _specs[id(route)] = tuple(declared)
+    return params
+
+
+def canonical_query(
+    params: Iterable[QueryParam],
+    query_items: List[Tuple[str, str]],
+    normalizers: Optional[Dict[str, Normalizer]] = None
+) -> str:
+    """
+    Query string canonique.
+
+    Args:
+        params: Paramètres déclarés par la route
+        query_items: Paires (nom, valeur) de la requête, dans l'ordre
+        normalizers: Normaliseurs par nom de paramètre
+
+    Returns:
+        Query string triée, sans paramètre inconnu ni valeur par défaut
+    """
+    normalizers = normalizers or {}
+    values: Dict[str, List[str]] = {}
+    for name, value in query_items:
+        values.setdefault(name, []).append(value)
+
+    pairs = []
+    for param in sorted(params, key=lambda p: p.alias):
+        given = values.get(param.alias)
+        if not given:
+            continue
+        normalizer = normalizers.get(param.alias)
+        if param.many:
+            pairs.extend((param.alias, canonical_value(v, param.kind, normalizer)) for v in given)
+            continue
+        # Comme FastAPI : la dernière occurrence l'emporte
+        value = canonical_value(given[-1], param.kind, normalizer)
+        if value != param.default:
+            pairs.append((param.alias, value))
+    return urlencode(pairs)
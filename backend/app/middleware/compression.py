@@ -1,24 +1,117 @@
 """
 Middleware de compression pour optimiser les réponses API
+
+Les réponses complètes sont compressées d'un bloc ; les réponses en
+streaming (exports) le sont morceau par morceau, sans être retenues en
+mémoire au-delà de minimum_size.
+
+Au-delà de offload_threshold, la compression tourne dans un pool de threads
+borné pour ne pas bloquer la boucle d'événements (brotli et zlib relâchent
+le GIL). Le niveau est choisi selon la taille du body et le retard de la
+boucle : plus fort pour les petits bodies, plus faible pour les gros et
+quand le worker est chargé.
+
+Encodages proposés, niveaux et taille minimale peuvent être fixés par route
+(ROUTE_COMPRESSION_POLICIES), zstd en plus de brotli et gzip.
 """
-import gzip
-from typing import Callable
-from fastapi import Request, Response
-from fastapi.responses import StreamingResponse
+import asyncio
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
 try:
     import brotli
     HAS_BROTLI = True
 except ImportError:
     HAS_BROTLI = False
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
 from starlette.types import ASGIApp, Receive, Scope, Send
 from starlette.datastructures import Headers, MutableHeaders
-import io
+
+from app.middleware.cache_entry import merge_vary, negotiate_encoding
+from app.monitoring.loop_lag import loop_lag
+from app.monitoring.metrics import response_compression_duration_seconds
+
+# Types déjà compressés
+SKIP_COMPRESSION_TYPES = ("image/", "video/", "audio/", "application/zip", "application/gzip")
+
+# Tailles de body pour le choix du niveau
+SMALL_BODY_SIZE = 16 * 1024
+LARGE_BODY_SIZE = 256 * 1024
+
+# Retard de boucle (secondes) à partir duquel le niveau baisse
+MODERATE_LOOP_LAG = 0.02
+HIGH_LOOP_LAG = 0.1
+
+MAX_LEVELS = {"br": 11, "gzip": 9, "zstd": 19}
+
+AVAILABLE_ENCODINGS = {"br": HAS_BROTLI, "zstd": HAS_ZSTD, "gzip": True}
+
+
+class CompressionPolicy(NamedTuple):
+    """
+    Politique de compression d'une route.
+    
+    encodings: encodages proposés, par ordre de préférence à qualité égale
+        dans Accept-Encoding ; vide : pas de compression
+    levels: niveau par encodage (sinon celui du middleware)
+    minimum_size: taille minimale en octets (None : celle du middleware)
+    """
+    encodings: Tuple[str, ...] = ("br", "zstd", "gzip")
+    levels: Optional[Dict[str, int]] = None
+    minimum_size: Optional[int] = None
+
+
+# Hadiths et Coran, surtout du texte arabe : zstd 3 y atteint le ratio de
+# brotli 4 pour un tiers du CPU (scripts/benchmark_compression_encodings.py)
+ARABIC_TEXT_POLICY = CompressionPolicy(("zstd", "br", "gzip"), {"zstd": 3, "br": 4, "gzip": 6})
+
+# Par template de route, sans le préfixe /api ou /api/v1 ; le préfixe le
+# plus long l'emporte
+ROUTE_COMPRESSION_POLICIES = {
+    "/hadith": ARABIC_TEXT_POLICY,
+    "/quran": ARABIC_TEXT_POLICY,
+    # PDF : flux déjà compressés par reportlab
+    "/hadith/export": CompressionPolicy(()),
+}
+
+
+def adaptive_level(encoding: str, size: int, lag: float, base: int) -> int:
+    """
+    Choisir la qualité brotli ou le niveau gzip d'un body.
+    
+    Args:
+        encoding: "br" ou "gzip"
+        size: Taille du body en octets
+        lag: Retard actuel de la boucle d'événements, en secondes
+        base: Niveau configuré
+        
+    Returns:
+        Niveau entre 1 et le maximum de l'encodage
+    """
+    level = base
+    if size < SMALL_BODY_SIZE:
+        level += 1
+    elif size >= LARGE_BODY_SIZE:
+        level -= 1
+    
+    if lag >= HIGH_LOOP_LAG:
+        level = 1
+    elif lag >= MODERATE_LOOP_LAG:
+        level -= 2
+    
+    return max(1, min(level, MAX_LEVELS[encoding]))
 
 
 class CompressionMiddleware:
     """
-    Middleware pour compresser automatiquement les réponses avec gzip ou brotli
-    selon les préférences du client (Accept-Encoding header).
+    Middleware pour compresser automatiquement les réponses avec zstd, brotli
+    ou gzip selon les préférences du client (Accept-Encoding header) et la
+    politique de la route.
     """
     
     def __init__(
@@ -28,142 +121,260 @@ class CompressionMiddleware:
         gzip_level: int = 6,
         brotli_quality: int = 4,
         brotli_mode: int = 1,  # 0=generic, 1=text, 2=font
-        exclude_paths: list[str] = None
+        exclude_paths: list[str] = None,
+        offload_threshold: Optional[int] = 64 * 1024,  # None : toujours sur la boucle
+        max_workers: int = 2,
+        adaptive_levels: bool = True,
+        zstd_level: int = 3,
+        policies: Optional[Dict[str, CompressionPolicy]] = None
     ):
         self.app = app
         self.minimum_size = minimum_size
         self.gzip_level = gzip_level
         self.brotli_quality = brotli_quality
         self.brotli_mode = brotli_mode
+        self.zstd_level = zstd_level
         self.exclude_paths = exclude_paths or ['/health', '/metrics', '/openapi.json']
+        self.policies = dict(ROUTE_COMPRESSION_POLICIES if policies is None else policies)
+        self.offload_threshold = offload_threshold
+        self.adaptive_levels = adaptive_levels
+        # Pool borné : au plus 2 tâches en attente par thread, les suivantes
+        # attendent leur tour sans bloquer la boucle
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="compression")
+        self._slots = asyncio.Semaphore(max_workers * 2)
     
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         if scope["type"] != "http":
             await self.app(scope, receive, send)
             return
         
-        # Vérifier si le path est exclu
+        # Vérifier si le path est exclu (préfixe de segments : /docs
+        # n'exclut pas /documents)
         path = scope.get("path", "")
-        # Check if any excluded path is contained in the current path
-        for excluded in self.exclude_paths:
-            if excluded in path:
-                await self.app(scope, receive, send)
-                return
-        
-        # Parser Accept-Encoding header
-        headers = Headers(scope=scope)
-        accept_encoding = headers.get("accept-encoding", "")
-        
-        # Déterminer le meilleur encodage disponible
-        encodings = [enc.strip() for enc in accept_encoding.lower().split(",")]
+        policy = self._policy(path)
+        encodings = [enc for enc in policy.encodings if AVAILABLE_ENCODINGS.get(enc)]
+        if not encodings or any(
+            path == excluded or path.startswith(excluded.rstrip("/") + "/")
+            for excluded in self.exclude_paths
+        ):
+            await self.app(scope, receive, send)
+            return
         
-        use_brotli = "br" in encodings
-        use_gzip = "gzip" in encodings
+        # Meilleur encodage selon les qualités d'Accept-Encoding, puis
+        # l'ordre de préférence de la route
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        encoding = negotiate_encoding(accept_encoding, encodings, encodings)
+        minimum_size = policy.minimum_size or self.minimum_size
         
-        if not use_brotli and not use_gzip:
-            await self.app(scope, receive, send)
+        if encoding == "identity":
+            # Réponse en clair, mais qui dépend d'Accept-Encoding pour les caches
+            async def vary_send(message) -> None:
+                if message["type"] == "http.response.start" and self._compressible(message):
+                    headers = MutableHeaders(scope=message)
+                    headers["vary"] = merge_vary(headers.get("vary"), "Accept-Encoding")
+                await send(message)
+            
+            await self.app(scope, receive, vary_send)
             return
         
-        # Intercepter la réponse
+        # Intercepter la réponse : le body n'est retenu que le temps de
+        # savoir s'il atteint minimum_size, puis compressé au fil de l'eau
         initial_message = {}
         body_parts = []
+        buffered_size = 0
+        compressor = None
+        passthrough = False
         
         async def wrapped_send(message) -> None:
-            nonlocal initial_message, body_parts
+            nonlocal initial_message, body_parts, buffered_size, compressor, passthrough
             
             if message["type"] == "http.response.start":
                 initial_message = message
-            elif message["type"] == "http.response.body":
-                body_parts.append(message.get("body", b""))
-                
-                if not message.get("more_body", False):
-                    # Assembler le body complet
-                    full_body = b"".join(body_parts)
-                    
-                    # Vérifier la taille minimale
-                    if len(full_body) < self.minimum_size:
-                        await send(initial_message)
-                        await send({
-                            "type": "http.response.body",
-                            "body": full_body,
-                            "more_body": False
-                        })
-                        return
-                    
-                    # Vérifier le Content-Type
-                    headers = MutableHeaders(scope={"headers": initial_message["headers"]})
-                    content_type = headers.get("content-type", "")
-                    
-                    # Ne pas compresser les images, vidéos, etc.
-                    skip_types = ["image/", "video/", "audio/", "application/zip", "application/gzip"]
-                    if any(content_type.startswith(skip) for skip in skip_types):
-                        await send(initial_message)
-                        await send({
-                            "type": "http.response.body",
-                            "body": full_body,
-                            "more_body": False
-                        })
-                        return
-                    
-                    # Compresser le body
-                    compressed_body = None
-                    encoding = None
-                    
-                    if use_brotli and HAS_BROTLI:
-                        try:
-                            compressed_body = brotli.compress(
-                                full_body,
-                                quality=self.brotli_quality,
-                                mode=self.brotli_mode
-                            )
-                            encoding = "br"
-                        except Exception:
-                            pass
-                    
-                    if not compressed_body and use_gzip:
-                        try:
-                            compressed_body = gzip.compress(full_body, compresslevel=self.gzip_level)
-                            encoding = "gzip"
-                        except Exception:
-                            pass
-                    
-                    # Si la compression a réussi et réduit la taille
-                    if compressed_body and len(compressed_body) < len(full_body) * 0.9:
-                        headers["content-encoding"] = encoding
-                        headers["vary"] = "Accept-Encoding"
-                        # Remove content-length header manually
-                        new_headers = []
-                        for name, value in initial_message["headers"]:
-                            if name.lower() != b"content-length":
-                                new_headers.append((name, value))
-                        initial_message["headers"] = new_headers
-                        
-                        # Envoyer la réponse compressée
-                        await send(initial_message)
-                        await send({
-                            "type": "http.response.body",
-                            "body": compressed_body,
-                            "more_body": False
-                        })
-                    else:
-                        # Envoyer la réponse non compressée
-                        await send(initial_message)
-                        await send({
-                            "type": "http.response.body",
-                            "body": full_body,
-                            "more_body": False
-                        })
-            else:
+                if not self._compressible(message):
+                    passthrough = True
+                    await send(message)
+                return
+            
+            if message["type"] != "http.response.body" or passthrough:
                 await send(message)
+                return
+            
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            
+            # Streaming en cours : chaque morceau est compressé et vidé aussitôt
+            if compressor is not None:
+                chunk = await self._run(
+                    encoding, compressor.compress if more_body else compressor.finish, body
+                )
+                if chunk or not more_body:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+                return
+            
+            body_parts.append(body)
+            buffered_size += len(body)
+            
+            if not more_body:
+                # Réponse complète (cas courant) : compressée d'un bloc
+                full_body = b"".join(body_parts)
+                body_parts = []
+                await self._send_complete(send, initial_message, full_body, encoding, policy)
+                return
+            
+            if buffered_size >= minimum_size:
+                # Réponse en streaming assez grande : compresser au fil de l'eau
+                # (taille totale inconnue, traitée comme un gros body)
+                compressor = self._compressor(encoding, LARGE_BODY_SIZE, policy)
+                self._set_encoding_headers(initial_message, encoding)
+                await send(initial_message)
+                buffered = b"".join(body_parts)
+                body_parts = []
+                await send({
+                    "type": "http.response.body",
+                    "body": await self._run(encoding, compressor.compress, buffered),
+                    "more_body": True
+                })
         
         await self.app(scope, receive, wrapped_send)
+    
+    async def _send_complete(
+        self,
+        send: Send,
+        initial_message: dict,
+        body: bytes,
+        encoding: str,
+        policy: CompressionPolicy
+    ) -> None:
+        """Envoyer une réponse complète, compressée si elle le mérite."""
+        compressed_body = None
+        if len(body) >= (policy.minimum_size or self.minimum_size):
+            try:
+                compressor = self._compressor(encoding, len(body), policy)
+                compressed_body = await self._run(encoding, compressor.finish, body)
+            except Exception:
+                compressed_body = None
+        
+        # Si la compression a réussi et réduit la taille
+        if compressed_body and len(compressed_body) < len(body) * 0.9:
+            self._set_encoding_headers(initial_message, encoding, len(compressed_body))
+            body = compressed_body
+        
+        await send(initial_message)
+        await send({"type": "http.response.body", "body": body, "more_body": False})
+    
+    def _policy(self, path: str) -> CompressionPolicy:
+        """Politique de la route (préfixe le plus long), celle par défaut sinon."""
+        route_path = path
+        for prefix in ("/api/v1", "/api"):
+            if path.startswith(prefix + "/"):
+                route_path = path[len(prefix):]
+                break
+        matches = [
+            pattern for pattern in self.policies
+            if route_path == pattern or route_path.startswith(pattern + "/")
+        ]
+        return self.policies[max(matches, key=len)] if matches else CompressionPolicy()
+    
+    def _compressible(self, message: dict) -> bool:
+        """
+        Ne pas compresser les images, vidéos, etc. ni les réponses déjà
+        encodées (variantes précompressées du cache).
+        """
+        headers = Headers(raw=message["headers"])
+        content_type = headers.get("content-type", "")
+        return "content-encoding" not in headers and not content_type.startswith(SKIP_COMPRESSION_TYPES)
+    
+    def _compressor(self, encoding: str, size: int, policy: CompressionPolicy) -> "StreamCompressor":
+        """Créer un compresseur au niveau adapté à la route, à la taille et à la charge."""
+        defaults = {"br": self.brotli_quality, "gzip": self.gzip_level, "zstd": self.zstd_level}
+        level = (policy.levels or {}).get(encoding, defaults[encoding])
+        if self.adaptive_levels:
+            # Pool saturé : compter comme une boucle modérément chargée
+            lag = max(loop_lag.lag, MODERATE_LOOP_LAG) if self._slots.locked() else loop_lag.lag
+            level = adaptive_level(encoding, size, lag, level)
+        return StreamCompressor(encoding, level, level, self.brotli_mode, level)
+    
+    async def _run(self, encoding: str, func: Callable[[bytes], bytes], data: bytes) -> bytes:
+        """Compresser sur la boucle si data est petit, sinon dans le pool."""
+        start = time.perf_counter()
+        if self.offload_threshold is None or len(data) < self.offload_threshold:
+            result = func(data)
+            mode = "inline"
+        else:
+            async with self._slots:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(self._executor, func, data)
+            mode = "offloaded"
+        response_compression_duration_seconds.labels(encoding=encoding, mode=mode).observe(
+            time.perf_counter() - start
+        )
+        return result
+    
+    def _set_encoding_headers(
+        self,
+        initial_message: dict,
+        encoding: str,
+        content_length: Optional[int] = None
+    ) -> None:
+        headers = MutableHeaders(scope=initial_message)
+        headers["content-encoding"] = encoding
+        headers["vary"] = merge_vary(headers.get("vary"), "Accept-Encoding")
+        if content_length is None:
+            # Taille inconnue en streaming
+            del headers["content-length"]
+        else:
+            headers["content-length"] = str(content_length)
+
+
+class StreamCompressor:
+    """
+    Compresseur incrémental gzip, brotli ou zstd.
+    
+    Chaque appel à `compress` vide le compresseur (flush) : le client reçoit
+    des octets dès le premier morceau, au prix d'un peu de ratio.
+    """
+    
+    def __init__(
+        self,
+        encoding: str,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        brotli_mode: int = 1,
+        zstd_level: int = 3
+    ):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality, mode=brotli_mode)
+        elif encoding == "zstd":
+            self._zstd = zstandard.ZstdCompressor(level=zstd_level).compressobj()
+        else:
+            # wbits 31 : en-tête et CRC gzip
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+    
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        if self.encoding == "zstd":
+            return self._zstd.compress(data) + self._zstd.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+    
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+        if self.encoding == "zstd":
+            return self._zstd.compress(data) + self._zstd.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_FINISH)
 
 
 def get_compression_middleware(
     minimum_size: int = 1000,
     gzip_level: int = 6,
     brotli_quality: int = 4,
-    exclude_paths: list[str] = None
+    exclude_paths: list[str] = None,
+    offload_threshold: Optional[int] = 64 * 1024,
+    max_workers: int = 2,
+    zstd_level: int = 3,
+    policies: Optional[Dict[str, CompressionPolicy]] = None
 ) -> Callable:
     """
     Factory function pour créer le middleware de compression.
@@ -173,6 +384,10 @@ def get_compression_middleware(
         gzip_level: Niveau de compression gzip (1-9)
         brotli_quality: Qualité de compression brotli (0-11)
         exclude_paths: Chemins à exclure de la compression
+        offload_threshold: Taille à partir de laquelle la compression passe dans le pool
+        max_workers: Threads du pool de compression
+        zstd_level: Niveau de compression zstd (1-19)
+        policies: Politiques par route (défaut : ROUTE_COMPRESSION_POLICIES)
         
     Returns:
         Middleware configuré
@@ -183,7 +398,11 @@ def get_compression_middleware(
             minimum_size=minimum_size,
             gzip_level=gzip_level,
             brotli_quality=brotli_quality,
-            exclude_paths=exclude_paths
+            exclude_paths=exclude_paths,
+            offload_threshold=offload_threshold,
+            max_workers=max_workers,
+            zstd_level=zstd_level,
+            policies=policies
         )
     
     return compression_middleware
\ No newline at end of file
@@ -0,0 +1,89 @@
+"""
+Middleware de suivi des requêtes SQL par requête HTTP
+
+Nombre de requêtes et temps passé en base, exposés dans le header
+Server-Timing et en métriques par route ; les formes de requête répétées
+(N+1) sont journalisées. Le budget des endpoints est vérifié par
+app.db.query_tracker.
+"""
+import logging
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.db.query_tracker import QueryStats, current_query_stats
+from app.monitoring.metrics import (
+    db_queries_per_request,
+    db_query_budget_exceeded,
+    db_repeated_queries,
+    db_time_per_request_seconds,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class QueryTrackingMiddleware:
+    """
+    Middleware ASGI : une QueryStats par requête HTTP, placée dans le
+    contexte avant le routage pour couvrir dépendances, endpoint et cache.
+    """
+
+    def __init__(self, app: ASGIApp, server_timing: bool = True):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(scope)
+        token = current_query_stats.set(stats)
+
+        async def wrapped_send(message) -> None:
+            # L'endpoint a fini quand les headers partent (sauf streaming)
+            if message["type"] == "http.response.start" and self.server_timing:
+                headers = MutableHeaders(scope=message)
+                headers.append("server-timing", stats.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, wrapped_send)
+        finally:
+            current_query_stats.reset(token)
+            self._report(stats)
+
+    def _report(self, stats: QueryStats) -> None:
+        """Métriques de la requête et alerte sur les requêtes en boucle."""
+        route = stats.route
+        db_queries_per_request.labels(route=route).observe(stats.count)
+        db_time_per_request_seconds.labels(route=route).observe(stats.duration)
+        if stats.exceeded:
+            db_query_budget_exceeded.labels(route=route).inc()
+
+        repeated = stats.repeated()
+        if repeated:
+            db_repeated_queries.labels(route=route).inc()
+            logger.warning(
+                f"Likely N+1 on {route}: {stats.count} queries, repeated statements {repeated}"
+            )
+
+
+def get_query_tracking_middleware(server_timing: bool = None):
+    """
+    Factory function pour créer le middleware de suivi des requêtes.
+
+    Args:
+        server_timing: Ajouter le header Server-Timing (défaut : QUERY_SERVER_TIMING)
+
+    Returns:
+        Middleware configuré
+    """
+    if server_timing is None:
+        server_timing = settings.QUERY_SERVER_TIMING
+
+    def query_tracking_middleware(app: ASGIApp) -> QueryTrackingMiddleware:
+        return QueryTrackingMiddleware(app, server_timing=server_timing)
+
+    return query_tracking_middleware
@@ -9,16 +9,10 @@ import secrets
 from typing import Dict, Optional
 from datetime import datetime, timedelta
 from ..core.config import settings
-import redis
+from ..core.circuit_breaker import CircuitOpenError
+from ..core.redis_manager import redis_manager
 import json
 
-# Initialize Redis client for rate limiting
-redis_client = None
-try:
-    redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
-except Exception as e:
-    print(f"Warning: Redis connection failed for rate limiting: {e}")
-
 class SecurityMiddleware(BaseHTTPMiddleware):
     """Enhanced security middleware with CSRF protection and rate limiting"""
     
@@ -79,7 +73,11 @@ class SecurityMiddleware(BaseHTTPMiddleware):
     
     async def _check_rate_limit(self, request: Request) -> bool:
         """Check rate limiting using Redis"""
-        if not redis_client or settings.ENVIRONMENT == "development":
+        if settings.ENVIRONMENT == "development":
+            return True
+        
+        # Redis down (circuit open): do not limit rather than wait for it
+        if not redis_manager.available:
             return True
         
         try:
@@ -90,22 +88,19 @@ class SecurityMiddleware(BaseHTTPMiddleware):
             minute_key = f"rate_limit:minute:{client_ip}:{int(time.time() // 60)}"
             hour_key = f"rate_limit:hour:{client_ip}:{int(time.time() // 3600)}"
             
-            # Check minute limit
-            minute_count = redis_client.incr(minute_key)
-            if minute_count == 1:
-                redis_client.expire(minute_key, 60)
-            
-            if minute_count > settings.RATE_LIMIT_PER_MINUTE:
-                return False
-            
-            # Check hour limit
-            hour_count = redis_client.incr(hour_key)
-            if hour_count == 1:
-                redis_client.expire(hour_key, 3600)
-            
-            if hour_count > settings.RATE_LIMIT_PER_HOUR:
-                return False
+            # Both counters in one round trip (EXPIRE NX: only on first hit)
+            async with redis_manager.pipeline() as pipe:
+                pipe.incr(minute_key)
+                pipe.expire(minute_key, 60, nx=True)
+                pipe.incr(hour_key)
+                pipe.expire(hour_key, 3600, nx=True)
+                minute_count, _, hour_count, _ = await pipe.execute()
             
+            return (
+                minute_count <= settings.RATE_LIMIT_PER_MINUTE
+                and hour_count <= settings.RATE_LIMIT_PER_HOUR
+            )
+        except CircuitOpenError:
             return True
         except Exception as e:
             # If Redis fails, allow the request
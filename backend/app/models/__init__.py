@@ -3,7 +3,12 @@ from app.models.favorite import FavoriteVerse
 from app.models.prayer import PrayerLog
 from app.models.zakat import ZakatCalculation
 from app.models.bookmark import Bookmark
-from app.models.hadith import HadithCollection, HadithBook, Hadith, HadithCategory, HadithNote
+from app.models.hadith import (
+    HadithCollection, HadithBook, Hadith, HadithCategory, HadithNote,
+    Narrator, HadithNarrator, NarratorLink, HadithSimilar
+)
+from app.models.search import SearchIndexState
+from app.models.quran import QuranVerse
 
 __all__ = [
     "User", 
@@ -15,5 +20,11 @@ __all__ = [
     "HadithBook", 
     "Hadith",
     "HadithCategory",
-    "HadithNote"
+    "HadithNote",
+    "Narrator",
+    "HadithNarrator",
+    "NarratorLink",
+    "HadithSimilar",
+    "SearchIndexState",
+    "QuranVerse"
 ]
\ No newline at end of file
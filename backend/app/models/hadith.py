@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Boolean, Index
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Boolean, Index, Float, text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -62,6 +62,7 @@ class Hadith(Base):
     grade_text = Column(String(100))
     reference = Column(String(200))
     categories = Column(JSONB, default=list)  # Array of category IDs
+    parallel_cluster_id = Column(Integer)  # Near-duplicate narrations across collections
     
     # Search optimization
     search_vector = Column(Text)  # For full-text search
@@ -79,6 +80,11 @@ class Hadith(Base):
         Index('ix_hadith_collection_number', 'collection_id', 'hadith_number'),
         Index('ix_hadith_book_number', 'book_id', 'hadith_number'),
         Index('ix_hadith_grade', 'grade'),
+        # Partial: most hadiths have no parallel, only clustered rows are looked up
+        Index(
+            'ix_hadiths_parallel_cluster_id', 'parallel_cluster_id',
+            postgresql_where=text('parallel_cluster_id IS NOT NULL')
+        ),
     )
 
 
@@ -120,4 +126,66 @@ class HadithNote(Base):
     # Unique constraint - one note per user per hadith
     __table_args__ = (
         Index('ix_hadith_note_user_hadith', 'user_id', 'hadith_id', unique=True),
-    )
\ No newline at end of file
+    )
+
+class Narrator(Base):
+    __tablename__ = "narrators"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(200), nullable=False)  # Display form as first seen
+    normalized_name = Column(String(200), nullable=False)
+    language = Column(String(2), nullable=False)  # ar, en
+    hadith_count = Column(Integer, default=0)
+    
+    # Relationships
+    hadiths = relationship("HadithNarrator", back_populates="narrator")
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        Index('ix_narrator_language_name', 'language', 'normalized_name', unique=True),
+        Index('ix_narrator_hadith_count', 'hadith_count'),
+    )
+
+
+class HadithNarrator(Base):
+    """Ordered isnad edge: position 0 is the narrator closest to the compiler."""
+    __tablename__ = "hadith_narrators"
+    
+    hadith_id = Column(Integer, ForeignKey("hadiths.id", ondelete="CASCADE"), primary_key=True)
+    language = Column(String(2), primary_key=True)
+    position = Column(Integer, primary_key=True)
+    narrator_id = Column(Integer, ForeignKey("narrators.id", ondelete="CASCADE"), nullable=False)
+    
+    # Relationships
+    narrator = relationship("Narrator", back_populates="hadiths")
+    
+    __table_args__ = (
+        Index('ix_hadith_narrator_narrator', 'narrator_id', 'hadith_id'),
+    )
+
+
+class NarratorLink(Base):
+    """Precomputed chain graph: `narrator_id` narrated from `teacher_id`."""
+    __tablename__ = "narrator_links"
+    
+    narrator_id = Column(Integer, ForeignKey("narrators.id", ondelete="CASCADE"), primary_key=True)
+    teacher_id = Column(Integer, ForeignKey("narrators.id", ondelete="CASCADE"), primary_key=True)
+    hadith_count = Column(Integer, default=0)
+    
+    __table_args__ = (
+        Index('ix_narrator_link_teacher', 'teacher_id', 'narrator_id'),
+    )
+
+
+class HadithSimilar(Base):
+    """Precomputed TF-IDF nearest neighbours of a hadith."""
+    __tablename__ = "hadith_similar"
+    
+    hadith_id = Column(Integer, ForeignKey("hadiths.id", ondelete="CASCADE"), primary_key=True)
+    rank = Column(Integer, primary_key=True)  # 1 = most similar
+    similar_hadith_id = Column(Integer, ForeignKey("hadiths.id", ondelete="CASCADE"), nullable=False)
+    score = Column(Float, nullable=False)  # Cosine similarity
+    
+    # Relationships
+    similar_hadith = relationship("Hadith", foreign_keys=[similar_hadith_id])
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, Text, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from app.db.base import Base
+
+
+class QuranVerse(Base):
+    """One verse of one Quran edition (Arabic text or translation), stored for search."""
+    __tablename__ = "quran_verses"
+
+    id = Column(Integer, primary_key=True, index=True)
+    edition = Column(String(30), nullable=False)  # e.g. 'quran-simple', 'en.sahih'
+    surah = Column(Integer, nullable=False)
+    ayah = Column(Integer, nullable=False)
+    text = Column(Text, nullable=False)
+    # Normalized form the index is built from (Arabic: normalize_arabic, else text)
+    search_text = Column(Text, nullable=False)
+
+    # Written by the importer with the edition's text search configuration
+    search_vector = Column(TSVECTOR)
+
+    __table_args__ = (
+        Index('ix_quran_verse_edition_surah_ayah', 'edition', 'surah', 'ayah', unique=True),
+        Index('idx_quran_verses_fts', 'search_vector', postgresql_using='gin'),
+    )
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class SearchIndexState(Base):
+    """Watermark and progress of the hadith full-text index rebuild jobs."""
+    __tablename__ = "search_index_state"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(50), unique=True, nullable=False, index=True)  # e.g. 'hadiths'
+
+    # Rows modified after this instant still need their vectors refreshed
+    watermark = Column(DateTime(timezone=True))
+
+    # Progress of the current / last job
+    status = Column(String(20), default="idle")  # idle, running, swapping, completed, failed
+    mode = Column(String(20))  # incremental, full
+    total_rows = Column(Integer, default=0)
+    processed_rows = Column(Integer, default=0)
+    last_id = Column(Integer, default=0)
+    error = Column(Text)
+
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
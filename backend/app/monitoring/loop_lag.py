@@ -0,0 +1,36 @@
+"""
+Event loop lag: how late a periodic wake-up fires.
+
+A worker whose loop is busy with CPU work (serialization, compression)
+wakes up late; the smoothed delay is exported as a gauge and read by code
+that can trade quality for CPU, such as the compression middleware.
+"""
+import asyncio
+from typing import Optional
+
+from app.monitoring.metrics import event_loop_lag_seconds
+
+
+class LoopLagMonitor:
+    """Exponentially smoothed event loop lag, in seconds."""
+
+    def __init__(self, interval: float = 0.25, smoothing: float = 0.3):
+        self.interval = interval
+        self.smoothing = smoothing
+        self.lag = 0.0
+
+    def record(self, lag: float) -> None:
+        self.lag = self.smoothing * lag + (1 - self.smoothing) * self.lag
+        event_loop_lag_seconds.set(self.lag)
+
+    async def run(self, interval: Optional[float] = None) -> None:
+        """Measure the lag of the running loop until cancelled."""
+        interval = interval or self.interval
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(interval)
+            self.record(max(0.0, loop.time() - start - interval))
+
+
+loop_lag = LoopLagMonitor()
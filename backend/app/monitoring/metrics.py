@@ -33,16 +33,112 @@ database_connections = Gauge(
     'Active database connections'
 )
 
+db_pool_overflow = Gauge(
+    'db_pool_overflow',
+    'Connections open beyond the pool size'
+)
+
+db_pool_checkout_wait_seconds = Histogram(
+    'db_pool_checkout_wait_seconds',
+    'Time spent waiting for a pooled database connection',
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30)
+)
+
+# Database work per request, by route template
+db_queries_per_request = Histogram(
+    'db_queries_per_request',
+    'Database queries run per request',
+    ['route'],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100)
+)
+
+db_time_per_request_seconds = Histogram(
+    'db_time_per_request_seconds',
+    'Time spent in database queries per request',
+    ['route'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+)
+
+db_repeated_queries = Counter(
+    'db_repeated_queries_total',
+    'Requests repeating one statement QUERY_REPEAT_THRESHOLD times or more (likely N+1)',
+    ['route']
+)
+
+db_query_budget_exceeded = Counter(
+    'db_query_budget_exceeded_total',
+    'Requests exceeding their endpoint query budget',
+    ['route']
+)
+
+# Cache lookups per cache / tier and route template (value caches: key prefix)
 cache_hits = Counter(
     'cache_hits_total',
     'Total cache hits',
-    ['cache_type']
+    ['cache_type', 'route']
 )
 
 cache_misses = Counter(
     'cache_misses_total',
     'Total cache misses',
-    ['cache_type']
+    ['cache_type', 'route']
+)
+
+cache_stale = Counter(
+    'cache_stale_total',
+    'Stale cache entries served (stale-while-revalidate, stale-if-error)',
+    ['cache_type', 'route']
+)
+
+cache_lookup_duration_seconds = Histogram(
+    'cache_lookup_duration_seconds',
+    'Cache lookup latency (L1, then Redis)',
+    ['cache_type', 'route'],
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+)
+
+cache_bytes_served = Counter(
+    'cache_bytes_served_total',
+    'Response bytes served from the cache',
+    ['route', 'encoding']
+)
+
+singleflight_requests = Counter(
+    'singleflight_requests_total',
+    'Coalesced computations by outcome (leader, collapsed_local, collapsed_remote, fallback)',
+    ['name', 'outcome']
+)
+
+# Circuit breakers of shared dependencies (Redis)
+circuit_breaker_state = Gauge(
+    'circuit_breaker_state',
+    'Circuit state (0 closed, 1 half-open, 2 open)',
+    ['name']
+)
+
+circuit_breaker_transitions = Counter(
+    'circuit_breaker_transitions_total',
+    'Circuit state changes, by new state',
+    ['name', 'state']
+)
+
+circuit_breaker_rejected = Counter(
+    'circuit_breaker_rejected_total',
+    'Calls rejected without being attempted (circuit open)',
+    ['name']
+)
+
+# Event loop responsiveness (smoothed delay of a periodic wake-up)
+event_loop_lag_seconds = Gauge(
+    'event_loop_lag_seconds',
+    'Smoothed event loop lag'
+)
+
+response_compression_duration_seconds = Histogram(
+    'response_compression_duration_seconds',
+    'Response compression time, inline on the event loop or offloaded to the pool',
+    ['encoding', 'mode'],
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
 )
 
 prayer_logs_created = Counter(
@@ -159,9 +255,9 @@ def track_cache_metrics(cache_type: str):
         def wrapper(*args, **kwargs):
             result = func(*args, **kwargs)
             if result is not None:
-                cache_hits.labels(cache_type=cache_type).inc()
+                cache_hits.labels(cache_type=cache_type, route=func.__name__).inc()
             else:
-                cache_misses.labels(cache_type=cache_type).inc()
+                cache_misses.labels(cache_type=cache_type, route=func.__name__).inc()
             return result
         return wrapper
     return decorator
@@ -194,11 +290,6 @@ class SystemMetricsCollector:
                     'boot_time': str(datetime.fromtimestamp(psutil.boot_time()))
                 })
                 
-                # Database connections (example)
-                # This would connect to your database pool
-                # db_pool = get_db_pool()
-                # database_connections.set(db_pool.size())
-                
             except Exception as e:
                 print(f"Error collecting system metrics: {e}")
             
@@ -298,17 +389,15 @@ class HealthMetrics:
     @staticmethod
     async def check_redis_health() -> Dict[str, Any]:
         """Check Redis health"""
-        from app.core.cache import redis_client
+        from app.core.redis_manager import redis_manager
         
         try:
-            start = time.time()
-            redis_client.ping()
-            latency = (time.time() - start) * 1000  # ms
+            if not await redis_manager.ping():
+                return redis_manager.health()
             
-            info = redis_client.info()
+            info = await redis_manager.client.info()
             return {
-                "status": "healthy",
-                "latency_ms": round(latency, 2),
+                **redis_manager.health(),
                 "connected_clients": info.get("connected_clients", 0),
                 "used_memory": info.get("used_memory_human", "N/A")
             }
@@ -92,6 +92,22 @@ class Hadith(HadithBase):
         from_attributes = True
 
 
+class ParallelNarration(BaseModel):
+    id: int
+    hadith_number: int
+    reference: Optional[str] = None
+    grade: Optional[str] = None
+    collection: HadithCollection
+    
+    class Config:
+        from_attributes = True
+
+
+class HadithDetail(Hadith):
+    parallel_cluster_id: Optional[int] = None
+    parallel_narrations: List[ParallelNarration] = []
+
+
 class HadithWithCollection(Hadith):
     collection: HadithCollection
     book: HadithBook
@@ -150,6 +166,28 @@ class HadithNote(HadithNoteBase):
         from_attributes = True
 
 
+# Narrator schemas
+class Narrator(BaseModel):
+    id: int
+    name: str
+    normalized_name: str
+    language: str
+    hadith_count: int = 0
+    
+    class Config:
+        from_attributes = True
+
+
+class NarratorLink(BaseModel):
+    narrator: Narrator
+    hadith_count: int
+
+
+class SimilarHadith(BaseModel):
+    hadith: Hadith
+    score: float
+
+
 # Response models
 class HadithSearchResult(BaseModel):
     results: List[HadithWithCollection]
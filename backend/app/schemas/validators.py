@@ -62,6 +62,12 @@ class PrayerTimeRequestValidator(BaseModel):
             pass
         return v
 
+# Quran editions served (and stored for search)
+ALLOWED_QURAN_EDITIONS = [
+    "quran-simple", "quran-uthmani", "en.sahih", "en.pickthall",
+    "fr.hamidullah", "ar.muyassar", "tr.ates", "id.indonesian"
+]
+
 class QuranRequestValidator(BaseModel):
     """Validate Quran API requests"""
     surah: int = Field(..., ge=1, le=114)
@@ -71,11 +77,7 @@ class QuranRequestValidator(BaseModel):
     @validator('edition')
     def validate_edition(cls, v):
         # Whitelist of allowed editions to prevent injection
-        allowed_editions = [
-            "quran-simple", "quran-uthmani", "en.sahih", "en.pickthall",
-            "fr.hamidullah", "ar.muyassar", "tr.ates", "id.indonesian"
-        ]
-        if v not in allowed_editions:
+        if v not in ALLOWED_QURAN_EDITIONS:
             raise ValueError('Invalid edition specified')
         return v
 
@@ -0,0 +1,56 @@
+"""
+Arabic text normalization shared by the hadith and Quran indexes
+"""
+import re
+import unicodedata
+
+# Tashkeel (harakat, tanween, shadda, sukun), Quranic annotation marks and tatweel
+DIACRITICS_RE = re.compile(
+    "[\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06DC\u06DF-\u06E8\u06EA-\u06ED\u0640]"
+)
+
+# Letter variants folded to a single canonical form
+LETTER_MAP = str.maketrans({
+    "\u0622": "\u0627",  # alef madda -> alef
+    "\u0623": "\u0627",  # alef hamza above -> alef
+    "\u0625": "\u0627",  # alef hamza below -> alef
+    "\u0671": "\u0627",  # alef wasla -> alef
+    "\u0649": "\u064A",  # alef maqsura -> ya
+    "\u0629": "\u0647",  # ta marbuta -> ha
+    "\u0624": "\u0648",  # waw hamza -> waw
+    "\u0626": "\u064A",  # ya hamza -> ya
+})
+
+# Anything that is not a word character (Arabic letters included)
+NON_WORD_RE = re.compile(r"[^\w]+", re.UNICODE)
+
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def strip_diacritics(text: str) -> str:
+    """Remove tashkeel and tatweel, keeping the letters."""
+    if not text:
+        return ""
+    return DIACRITICS_RE.sub("", text)
+
+
+def normalize_arabic(text: str) -> str:
+    """
+    Normalize Arabic text for indexing and matching.
+
+    Strips diacritics and tatweel, folds alef/ya/ta marbuta/hamza variants,
+    replaces punctuation with spaces and collapses whitespace.
+
+    Args:
+        text: Raw Arabic (or mixed) text
+
+    Returns:
+        Normalized text
+    """
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFC", text)
+    text = strip_diacritics(text)
+    text = text.translate(LETTER_MAP)
+    text = NON_WORD_RE.sub(" ", text)
+    return WHITESPACE_RE.sub(" ", text).strip()
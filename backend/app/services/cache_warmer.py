@@ -0,0 +1,249 @@
+"""
+Cache warmer: pre-populates the HTTP response cache.
+
+Pages are requested through the application itself (in-process ASGI
+transport), so they are cached by CacheMiddleware under the same keys, tags
+and TTLs as live traffic. A warm-up runs after startup and whenever an
+import asks for one on the `cache:warm` channel; a Redis lock makes a single
+worker do it, with a bounded number of requests in flight.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+from app.core.config import settings
+from app.core.singleflight import RELEASE_SCRIPT
+
+logger = logging.getLogger(__name__)
+
+WARM_CHANNEL = "cache:warm"
+WARM_LOCK_KEY = "cache:warm:lock"
+RECENT_QUERIES_PREFIX = "cache:warm:queries:"
+
+API_PREFIX = "/api"
+
+# Search routes whose most frequent requests are replayed
+TRACKED_QUERY_PATHS = (
+    "/api/hadith/search",
+    "/api/hadith/search/paginated",
+    "/api/v1/hadith/search/optimized",
+    "/api/v1/quran/search",
+)
+
+# Identifies warm-up requests (not counted as user queries)
+WARMER_USER_AGENT = "al-hidaya-cache-warmer"
+
+# Page size used by the frontend for book pages
+BOOK_PAGE_SIZE = 20
+
+
+def recent_queries_key(day: date) -> str:
+    return f"{RECENT_QUERIES_PREFIX}{day.isoformat()}"
+
+
+def is_tracked_query(path: str, user_agent: Optional[str]) -> bool:
+    return path in TRACKED_QUERY_PATHS and user_agent != WARMER_USER_AGENT
+
+
+async def record_query(client, path: str, query_string: str) -> None:
+    """Count a search request in today's ranking (one round trip)."""
+    key = recent_queries_key(date.today())
+    try:
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.zincrby(key, 1, f"{path}?{query_string}")
+            pipe.expire(key, (settings.CACHE_WARM_QUERY_DAYS + 1) * 86400)
+            await pipe.execute()
+    except Exception as e:
+        logger.debug(f"Could not record query {path}: {e}")
+
+
+def merge_top_queries(rankings: Iterable[List[Tuple[Any, float]]], limit: int) -> List[str]:
+    """
+    Merge per-day rankings into the `limit` most frequent URLs.
+
+    Args:
+        rankings: (member, score) lists as returned by ZREVRANGE WITHSCORES
+        limit: Number of URLs to keep
+
+    Returns:
+        URLs, most frequent first
+    """
+    totals: Dict[str, float] = {}
+    for ranking in rankings:
+        for member, score in ranking:
+            url = member.decode("utf-8") if isinstance(member, bytes) else member
+            totals[url] = totals.get(url, 0) + score
+    ordered = sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+    return [url for url, _ in ordered[:limit]]
+
+
+async def request_warmup(client, reason: str) -> None:
+    """Ask the running API to warm its cache (e.g. after an import)."""
+    try:
+        await client.publish(WARM_CHANNEL, reason)
+    except Exception as e:
+        logger.warning(f"Cache warm-up request failed: {e}")
+
+
+class CacheWarmer:
+    """Requests the hot pages of the API through the app, a few at a time."""
+
+    def __init__(
+        self,
+        app,
+        redis_client,
+        concurrency: Optional[int] = None,
+        pages_per_book: Optional[int] = None,
+        top_queries: Optional[int] = None,
+        languages: Optional[List[str]] = None
+    ):
+        self.app = app
+        self.redis_client = redis_client
+        self.concurrency = concurrency or settings.CACHE_WARM_CONCURRENCY
+        self.pages_per_book = pages_per_book or settings.CACHE_WARM_PAGES_PER_BOOK
+        self.top_queries = settings.CACHE_WARM_TOP_QUERIES if top_queries is None else top_queries
+        self.languages = languages or [
+            lang.strip() for lang in settings.CACHE_WARM_LANGUAGES.split(",") if lang.strip()
+        ] or ["en"]
+        self.stats = {"warmed": 0, "failed": 0}
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def run(self) -> Optional[Dict[str, int]]:
+        """
+        Warm the cache unless another worker is already doing it.
+
+        Returns:
+            Stats, or None if the lock is held elsewhere
+        """
+        token = uuid.uuid4().hex
+        timeout = settings.CACHE_WARM_TIMEOUT
+        try:
+            acquired = await self.redis_client.set(
+                WARM_LOCK_KEY, token, nx=True, px=int(timeout * 1000)
+            )
+        except Exception as e:
+            logger.warning(f"Cache warm-up lock unavailable: {e}")
+            return None
+        if not acquired:
+            return None
+
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(self.warm(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Cache warm-up stopped after {timeout}s")
+        finally:
+            try:
+                await self.redis_client.eval(RELEASE_SCRIPT, 1, WARM_LOCK_KEY, token)
+            except Exception:
+                pass
+
+        logger.info(f"Cache warm-up done in {time.monotonic() - start:.1f}s: {self.stats}")
+        return self.stats
+
+    async def warm(self) -> None:
+        """Lists first: the pages to warm are read from them."""
+        transport = httpx.ASGITransport(app=self.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://cache-warmer") as client:
+            collections, categories, _ = await asyncio.gather(
+                self._fetch(client, f"{API_PREFIX}/hadith/collections"),
+                self._fetch(client, f"{API_PREFIX}/hadith/categories"),
+                self._fetch(client, f"{API_PREFIX}/hadith/daily"),
+            )
+
+            collection_ids = [c["collection_id"] for c in collections or []]
+            book_lists = await asyncio.gather(*(
+                self._fetch(client, f"{API_PREFIX}/hadith/collections/{collection_id}/books")
+                for collection_id in collection_ids
+            ))
+
+            urls = []
+            for collection_id, books in zip(collection_ids, book_lists):
+                for book in books or []:
+                    for page in range(1, self.pages_per_book + 1):
+                        urls.append(
+                            f"{API_PREFIX}/hadith/collections/{collection_id}/books/"
+                            f"{book['book_number']}/hadiths?page={page}&per_page={BOOK_PAGE_SIZE}"
+                        )
+            urls.extend(
+                f"{API_PREFIX}/hadith/categories/{category['category_id']}/hadiths"
+                for category in categories or []
+            )
+            urls.extend(await self.recent_queries())
+
+            await asyncio.gather(*(self._fetch(client, url, parse=False) for url in urls))
+
+    async def recent_queries(self) -> List[str]:
+        """Most frequent search URLs over the last CACHE_WARM_QUERY_DAYS days."""
+        if self.top_queries <= 0:
+            return []
+        today = date.today()
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for days_ago in range(settings.CACHE_WARM_QUERY_DAYS):
+                    pipe.zrevrange(
+                        recent_queries_key(today - timedelta(days=days_ago)),
+                        0, self.top_queries - 1, withscores=True
+                    )
+                rankings = await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Could not read recent queries: {e}")
+            return []
+        return merge_top_queries(rankings, self.top_queries)
+
+    async def _fetch(self, client: httpx.AsyncClient, url: str, parse: bool = True) -> Any:
+        """GET `url` once per warmed language; returns the first JSON body."""
+        result = None
+        for language in self.languages:
+            async with self._semaphore:
+                try:
+                    response = await client.get(url, headers={
+                        "User-Agent": WARMER_USER_AGENT,
+                        "Accept-Language": language,
+                        # The cache stores every encoding; skip compressing this copy
+                        "Accept-Encoding": "identity",
+                    })
+                except Exception as e:
+                    logger.warning(f"Cache warm-up failed for {url}: {e}")
+                    self.stats["failed"] += 1
+                    continue
+            if response.status_code >= 400:
+                self.stats["failed"] += 1
+                continue
+            self.stats["warmed"] += 1
+            if parse and result is None:
+                result = response.json()
+        return result
+
+
+async def run_cache_warmer(app, redis_client) -> None:
+    """
+    Warm the cache after startup, then on every request published on
+    WARM_CHANNEL, until cancelled.
+    """
+    await asyncio.sleep(settings.CACHE_WARM_STARTUP_DELAY)
+    await CacheWarmer(app, redis_client).run()
+
+    while True:
+        pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(WARM_CHANNEL)
+            async for message in pubsub.listen():
+                if message and message.get("type") == "message":
+                    logger.info(f"Cache warm-up requested: {message['data']!r}")
+                    await CacheWarmer(app, redis_client).run()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Cache warmer listener error: {e}")
+            await asyncio.sleep(1)
+        finally:
+            try:
+                await pubsub.close()
+            except Exception:
+                pass
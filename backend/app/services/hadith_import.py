@@ -7,8 +7,12 @@ import logging
 import time
 from datetime import datetime
 
-from app.db import SessionLocal
+from app.core.cache import cache, warm_cache
+from app.core.cache_tags import HADITH_CORPUS_TAG, collection_tag
+from app.core.redis_manager import redis_manager
+from app.db import batch_session
 from app.models import HadithCollection, HadithBook, Hadith, HadithCategory
+from app.services.narrator_index import NarratorIndexer
 
 logger = logging.getLogger(__name__)
 
@@ -49,6 +53,7 @@ class HadithImporter:
             "Accept": "application/json"
         }
         self.client = None
+        self.narrator_indexer = NarratorIndexer(db)
         self.stats = {
             "total_hadiths": 0,
             "imported": 0,
@@ -100,6 +105,14 @@ class HadithImporter:
                 # Stop if we've reached the limit
                 if limit and self.stats['imported'] >= limit:
                     break
+            
+            # Refresh narrator counts and the narrated-from graph once per collection
+            self.db.commit()
+            self.narrator_indexer.refresh_aggregates()
+            
+            # Drop the cached pages of this collection and the corpus-wide ones
+            await cache.invalidate_tags([collection_tag(collection_id), HADITH_CORPUS_TAG])
+            await warm_cache(f"import:{collection_id}")
                     
         except Exception as e:
             logger.error(f"Error importing {collection_id}: {str(e)}")
@@ -302,7 +315,15 @@ class HadithImporter:
                 search_vector=f"{english_text} {english_narrator}".lower()
             )
             
-            self.db.add(hadith)
+            # One savepoint per hadith: a failed row is rolled back alone
+            # and the session stays usable for the rest of the import
+            with self.narrator_indexer.savepoint():
+                self.db.add(hadith)
+                
+                # Index the narrator chains (needs the hadith id)
+                self.db.flush()
+                self.narrator_indexer.index_hadith(hadith)
+            
             self.stats['imported'] += 1
             self.stats['total_hadiths'] += 1
             
@@ -356,7 +377,7 @@ async def import_hadiths(collection_id: Optional[str] = None, limit: Optional[in
         collection_id: Specific collection to import (e.g., 'bukhari'). If None, imports all.
         limit: Maximum number of hadiths to import (for testing).
     """
-    db = SessionLocal()
+    db = batch_session()
     
     try:
         async with HadithImporter(db) as importer:
@@ -384,5 +405,11 @@ if __name__ == "__main__":
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
     
-    # Import first 100 hadiths from Bukhari for testing
-    asyncio.run(import_hadiths("bukhari", limit=100))
\ No newline at end of file
+    async def main():
+        try:
+            # Import first 100 hadiths from Bukhari for testing
+            await import_hadiths("bukhari", limit=100)
+        finally:
+            await redis_manager.close()
+    
+    asyncio.run(main())
\ No newline at end of file
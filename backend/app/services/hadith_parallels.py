@@ -0,0 +1,232 @@
+"""
+Cross-collection parallel narrations: MinHash signatures bucketed with LSH.
+
+The normalized Arabic matn of every hadith is shingled into word n-grams and
+summarized by a MinHash signature. Signatures are split into bands; hadiths
+sharing a band land in the same bucket and become candidate pairs, so only a
+tiny fraction of the n^2 pairs is ever compared. Candidates whose estimated
+Jaccard similarity passes the threshold are merged into clusters, stored as
+`hadiths.parallel_cluster_id`.
+"""
+import logging
+import time
+import zlib
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models import Hadith
+from app.services.arabic_text import normalize_arabic
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+logger = logging.getLogger(__name__)
+
+SHINGLE_SIZE = 3  # Words per shingle
+NUM_PERM = 128
+BANDS = 32  # 32 bands x 4 rows: candidate threshold ~ (1/32)^(1/4) = 0.42
+JACCARD_THRESHOLD = 0.5
+# Buckets this large come from formulaic text shared by unrelated hadiths
+MAX_BUCKET_SIZE = 200
+
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+SEED = 30
+
+
+def shingle_text(arabic_text: Optional[str], arabic_chain: Optional[str] = None) -> Set[int]:
+    """
+    Hash the word shingles of a hadith's normalized Arabic matn.
+
+    The isnad is stripped when the text starts with it, since the same matn is
+    transmitted through different chains in each collection.
+
+    Args:
+        arabic_text: Raw Arabic text
+        arabic_chain: Raw Arabic narrator chain, if known
+
+    Returns:
+        Set of 32-bit shingle hashes (empty for empty text)
+    """
+    normalized = normalize_arabic(arabic_text or "")
+    chain = normalize_arabic(arabic_chain or "")
+    if chain and normalized.startswith(chain) and len(normalized) > len(chain):
+        normalized = normalized[len(chain):]
+
+    words = normalized.split()
+    if not words:
+        return set()
+    if len(words) < SHINGLE_SIZE:
+        return {zlib.crc32(" ".join(words).encode("utf-8"))}
+
+    return {
+        zlib.crc32(" ".join(words[i:i + SHINGLE_SIZE]).encode("utf-8"))
+        for i in range(len(words) - SHINGLE_SIZE + 1)
+    }
+
+
+class _UnionFind:
+    def __init__(self):
+        self.parent: Dict[int, int] = {}
+
+    def find(self, item: int) -> int:
+        parent = self.parent.setdefault(item, item)
+        if parent != item:
+            parent = self.parent[item] = self.find(parent)
+        return parent
+
+    def union(self, a: int, b: int) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            # Keep the smallest id as root: cluster ids stay stable across runs
+            if root_a < root_b:
+                self.parent[root_b] = root_a
+            else:
+                self.parent[root_a] = root_b
+
+
+class ParallelNarrationDetector:
+    """Find near-duplicate hadiths and store their cluster ids."""
+
+    def __init__(
+        self,
+        db: Session,
+        threshold: float = JACCARD_THRESHOLD,
+        num_perm: int = NUM_PERM,
+        bands: int = BANDS
+    ):
+        if not HAS_NUMPY:
+            raise RuntimeError(
+                "Parallel narration detection requires numpy: "
+                "pip install -r requirements-ml.txt"
+            )
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+
+        self.db = db
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        generator = np.random.RandomState(SEED)
+        self._a = generator.randint(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = generator.randint(0, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def run(self) -> Dict:
+        """
+        Recompute every cluster and replace `hadiths.parallel_cluster_id`.
+
+        Returns:
+            Job statistics
+        """
+        start_time = time.time()
+
+        ids, signatures = self._signatures()
+        candidates = self._candidate_pairs(signatures)
+        clusters = self._clusters(ids, signatures, candidates)
+        clustered = self._store(clusters)
+
+        elapsed = time.time() - start_time
+        logger.info(
+            f"Parallel narrations: {len(ids)} hadiths, {len(candidates)} candidate pairs, "
+            f"{len(set(clusters.values()))} clusters in {elapsed:.2f}s"
+        )
+
+        return {
+            "hadiths": len(ids),
+            "candidate_pairs": len(candidates),
+            "clusters": len(set(clusters.values())),
+            "clustered_hadiths": clustered,
+            "elapsed_seconds": round(elapsed, 2)
+        }
+
+    def signature(self, shingles: Iterable[int]):
+        """MinHash signature of one shingle set (NUM_PERM uint64 values)."""
+        hashes = np.fromiter(shingles, dtype=np.uint64)
+        # Universal hashing (a*x + b) mod p, vectorized over shingles x permutations
+        permuted = (np.outer(hashes, self._a) + self._b) % MERSENNE_PRIME & MAX_HASH
+        return permuted.min(axis=0)
+
+    def _signatures(self) -> Tuple[List[int], "np.ndarray"]:
+        ids: List[int] = []
+        signatures = []
+
+        query = self.db.query(
+            Hadith.id, Hadith.arabic_text, Hadith.arabic_narrator_chain
+        ).order_by(Hadith.id).yield_per(2000)
+
+        for row in query:
+            shingles = shingle_text(row.arabic_text, row.arabic_narrator_chain)
+            if not shingles:
+                continue
+            ids.append(row.id)
+            signatures.append(self.signature(shingles))
+
+        if not signatures:
+            return ids, np.empty((0, self.num_perm), dtype=np.uint64)
+        return ids, np.vstack(signatures)
+
+    def _candidate_pairs(self, signatures) -> Set[Tuple[int, int]]:
+        """Rows sharing at least one identical band (as row indexes, i < j)."""
+        candidates: Set[Tuple[int, int]] = set()
+
+        for band in range(self.bands):
+            start = band * self.rows
+            buckets: Dict[bytes, List[int]] = defaultdict(list)
+            for row, band_values in enumerate(signatures[:, start:start + self.rows]):
+                buckets[band_values.tobytes()].append(row)
+
+            for members in buckets.values():
+                if len(members) < 2:
+                    continue
+                if len(members) > MAX_BUCKET_SIZE:
+                    logger.debug(f"Skipping LSH bucket of {len(members)} hadiths in band {band}")
+                    continue
+                for i, first in enumerate(members):
+                    for second in members[i + 1:]:
+                        candidates.add((first, second))
+
+        return candidates
+
+    def _clusters(self, ids: List[int], signatures, candidates: Set[Tuple[int, int]]) -> Dict[int, int]:
+        """Verify candidates on the full signature and merge them; returns {hadith_id: cluster_id}."""
+        union_find = _UnionFind()
+
+        for first, second in candidates:
+            estimated_jaccard = float(np.mean(signatures[first] == signatures[second]))
+            if estimated_jaccard >= self.threshold:
+                union_find.union(ids[first], ids[second])
+
+        return {hadith_id: union_find.find(hadith_id) for hadith_id in union_find.parent}
+
+    def _store(self, clusters: Dict[int, int]) -> int:
+        """Replace all cluster ids in one transaction."""
+        self.db.execute(text(
+            "UPDATE hadiths SET parallel_cluster_id = NULL WHERE parallel_cluster_id IS NOT NULL"
+        ))
+
+        params = [
+            {"id": hadith_id, "cluster_id": cluster_id}
+            for hadith_id, cluster_id in clusters.items()
+        ]
+        statement = text("UPDATE hadiths SET parallel_cluster_id = :cluster_id WHERE id = :id")
+        for start in range(0, len(params), 5000):
+            self.db.execute(statement, params[start:start + 5000])
+
+        self.db.commit()
+        return len(params)
+
+
+def detect_parallel_narrations(db: Session, threshold: float = JACCARD_THRESHOLD) -> Optional[Dict]:
+    """Run the detector; returns None when numpy is missing."""
+    if not HAS_NUMPY:
+        logger.warning("numpy not installed, skipping parallel narration detection")
+        return None
+    return ParallelNarrationDetector(db, threshold=threshold).run()
@@ -0,0 +1,194 @@
+"""
+Offline "similar hadiths" job: TF-IDF vectors and top-k cosine neighbours
+"""
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models import Hadith, HadithSimilar
+from app.services.arabic_text import normalize_arabic
+
+try:
+    import numpy as np
+    from scipy import sparse
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.preprocessing import normalize
+    HAS_SKLEARN = True
+except ImportError:
+    HAS_SKLEARN = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOP_K = 10
+DEFAULT_MIN_SCORE = 0.1
+# Rows per sparse x sparse product; bounds the dense score block to
+# BATCH_SIZE x n_hadiths float32 (256 x 40k ~ 40 MB)
+DEFAULT_BATCH_SIZE = 256
+
+# Relative weight of each language in the combined vector
+ENGLISH_WEIGHT = 0.5
+ARABIC_WEIGHT = 0.5
+
+
+class HadithSimilarityJob:
+    """Compute and store the top-k most similar hadiths for every hadith."""
+
+    def __init__(
+        self,
+        db: Session,
+        top_k: int = DEFAULT_TOP_K,
+        min_score: float = DEFAULT_MIN_SCORE,
+        batch_size: int = DEFAULT_BATCH_SIZE
+    ):
+        if not HAS_SKLEARN:
+            raise RuntimeError(
+                "Similar hadiths require the ML dependencies: "
+                "pip install -r requirements-ml.txt"
+            )
+        self.db = db
+        self.top_k = top_k
+        self.min_score = min_score
+        self.batch_size = batch_size
+
+    def run(self) -> Dict:
+        """
+        Vectorize all hadiths, compute neighbours and replace `hadith_similar`.
+
+        Returns:
+            Job statistics
+        """
+        start_time = time.time()
+
+        ids, english_texts, arabic_texts = self._load_texts()
+        if len(ids) < 2:
+            logger.info("Not enough hadiths to compute similarities")
+            return {"hadiths": len(ids), "pairs": 0}
+
+        matrix = self._vectorize(english_texts, arabic_texts)
+        logger.info(f"TF-IDF matrix: {matrix.shape[0]} hadiths x {matrix.shape[1]} terms")
+
+        neighbours = self._top_k_neighbours(matrix)
+        pairs = self._store(ids, neighbours)
+
+        elapsed = time.time() - start_time
+        logger.info(f"Similar hadiths computed in {elapsed:.2f}s: {pairs} pairs")
+
+        return {
+            "hadiths": len(ids),
+            "terms": matrix.shape[1],
+            "pairs": pairs,
+            "elapsed_seconds": round(elapsed, 2)
+        }
+
+    def _load_texts(self) -> Tuple[List[int], List[str], List[str]]:
+        rows = self.db.query(
+            Hadith.id, Hadith.english_text, Hadith.arabic_text
+        ).order_by(Hadith.id).all()
+
+        ids = [row.id for row in rows]
+        english_texts = [row.english_text or "" for row in rows]
+        arabic_texts = [normalize_arabic(row.arabic_text or "") for row in rows]
+        return ids, english_texts, arabic_texts
+
+    def _vectorize(self, english_texts: List[str], arabic_texts: List[str]):
+        """Build one L2-normalized sparse matrix from both languages."""
+        blocks = []
+
+        for texts, weight, options in (
+            (english_texts, ENGLISH_WEIGHT, {"stop_words": "english"}),
+            (arabic_texts, ARABIC_WEIGHT, {}),
+        ):
+            if not any(texts):
+                continue
+            vectorizer = TfidfVectorizer(
+                sublinear_tf=True,
+                min_df=2,
+                max_df=0.5,
+                dtype=np.float32,
+                **options
+            )
+            try:
+                blocks.append(vectorizer.fit_transform(texts) * weight)
+            except ValueError:
+                # Vocabulary empty after pruning (tiny corpora)
+                continue
+
+        if not blocks:
+            raise ValueError("No text to vectorize")
+
+        return normalize(sparse.hstack(blocks).tocsr())
+
+    def _top_k_neighbours(self, matrix) -> List[List[Tuple[int, float]]]:
+        """
+        Top-k cosine neighbours per row, computed as batched sparse products.
+
+        Rows are L2-normalized, so X[batch] . X^T is the cosine similarity.
+        """
+        n_rows = matrix.shape[0]
+        k = min(self.top_k, n_rows - 1)
+        transposed = matrix.T.tocsc()
+        neighbours: List[List[Tuple[int, float]]] = []
+
+        for start in range(0, n_rows, self.batch_size):
+            end = min(start + self.batch_size, n_rows)
+            scores = (matrix[start:end] @ transposed).toarray()
+
+            # Never return a hadith as its own neighbour
+            scores[np.arange(end - start), np.arange(start, end)] = -1.0
+
+            candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            for row, columns in enumerate(candidates):
+                row_scores = scores[row, columns]
+                order = np.argsort(-row_scores)
+                neighbours.append([
+                    (int(columns[i]), float(row_scores[i]))
+                    for i in order
+                    if row_scores[i] >= self.min_score
+                ])
+
+            logger.debug(f"Similarity: {end}/{n_rows} rows")
+
+        return neighbours
+
+    def _store(self, ids: List[int], neighbours: List[List[Tuple[int, float]]]) -> int:
+        """Replace the table in one transaction so readers never see it half-filled."""
+        self.db.execute(text("DELETE FROM hadith_similar"))
+
+        mappings = []
+        pairs = 0
+        for row, row_neighbours in enumerate(neighbours):
+            for rank, (column, score) in enumerate(row_neighbours, start=1):
+                mappings.append({
+                    "hadith_id": ids[row],
+                    "rank": rank,
+                    "similar_hadith_id": ids[column],
+                    "score": round(score, 4)
+                })
+            if len(mappings) >= 5000:
+                self.db.bulk_insert_mappings(HadithSimilar, mappings)
+                pairs += len(mappings)
+                mappings = []
+
+        if mappings:
+            self.db.bulk_insert_mappings(HadithSimilar, mappings)
+            pairs += len(mappings)
+
+        self.db.commit()
+        self.db.execute(text("ANALYZE hadith_similar"))
+        self.db.commit()
+        return pairs
+
+
+def compute_similar_hadiths(
+    db: Session,
+    top_k: int = DEFAULT_TOP_K,
+    min_score: float = DEFAULT_MIN_SCORE
+) -> Optional[Dict]:
+    """Run the similarity job; returns None when the ML dependencies are missing."""
+    if not HAS_SKLEARN:
+        logger.warning("scikit-learn not installed, skipping similar hadiths")
+        return None
+    return HadithSimilarityJob(db, top_k=top_k, min_score=min_score).run()
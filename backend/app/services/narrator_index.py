@@ -0,0 +1,234 @@
+"""
+Narrator (isnad) index built from the narrator chains of imported hadiths
+"""
+import logging
+import re
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models import Hadith, Narrator, HadithNarrator
+from app.services.arabic_text import normalize_arabic
+
+logger = logging.getLogger(__name__)
+
+# Transmission formulas separating narrators, in normalized Arabic
+ARABIC_SEPARATORS = [
+    "حدثنا", "حدثني", "حدثه", "حدثهم",
+    "اخبرنا", "اخبرني", "اخبره",
+    "انبانا", "انباني",
+    "سمعت", "سمع", "يقول", "قال", "قالت", "قالا",
+    "عن", "ان", "انه", "انها",
+    "ح",  # tahwil: switch to another chain
+]
+
+# Honorifics and titles that are not narrator names
+ARABIC_NOISE = [
+    "رضي الله عنه", "رضي الله عنها", "رضي الله عنهما", "رضي الله عنهم",
+    "صلي الله عليه وسلم", "رسول الله", "النبي",
+]
+
+ENGLISH_SEPARATORS = [
+    "narrated by", "narrated", "on the authority of", "reported from",
+    "reported", "who heard", "heard", "from", "that", "said", "told", "informed",
+]
+
+# Segments left over between separators that are not names
+ENGLISH_FILLERS = {"it was", "it is", "he", "she", "they", "we", "the", "and"}
+
+ENGLISH_NOISE_RE = re.compile(
+    r"\((?:ra|r\.a\.|saw|pbuh|may allah be pleased with (?:him|her|them))\)",
+    re.IGNORECASE
+)
+
+ARABIC_SEPARATOR_RE = re.compile(
+    r"(?:^|\s)(?:" + "|".join(ARABIC_SEPARATORS) + r")(?=\s|$)"
+)
+ENGLISH_SEPARATOR_RE = re.compile(
+    r"\b(?:" + "|".join(re.escape(s) for s in ENGLISH_SEPARATORS) + r")\b|[;:,]",
+    re.IGNORECASE
+)
+
+# Longer segments are matn text rather than a name
+MAX_NAME_WORDS = 7
+
+
+def normalize_narrator_name(name: str, language: str) -> str:
+    """Normalize a narrator name for deduplication."""
+    if language == "ar":
+        normalized = normalize_arabic(name)
+        for noise in ARABIC_NOISE:
+            normalized = normalized.replace(noise, " ")
+    else:
+        normalized = ENGLISH_NOISE_RE.sub(" ", name).lower()
+        normalized = re.sub(r"['`‘’]", "", normalized)
+        normalized = re.sub(r"[^\w\s-]", " ", normalized)
+    return re.sub(r"\s+", " ", normalized).strip()
+
+
+def parse_narrator_chain(chain: Optional[str], language: str) -> List[Tuple[str, str]]:
+    """
+    Split a narrator chain into its narrators.
+
+    Args:
+        chain: Raw `narrator_chain` or `arabic_narrator_chain` text
+        language: 'en' or 'ar'
+
+    Returns:
+        Ordered list of (display_name, normalized_name), nearest to the
+        compiler first
+    """
+    if not chain:
+        return []
+
+    if language == "ar":
+        # Split on the normalized form so formulas match with or without tashkeel
+        segments = ARABIC_SEPARATOR_RE.split(normalize_arabic(chain))
+    else:
+        segments = ENGLISH_SEPARATOR_RE.split(chain)
+
+    narrators: List[Tuple[str, str]] = []
+    for segment in segments:
+        normalized = normalize_narrator_name(segment, language)
+        if len(normalized) < 3 or len(normalized.split()) > MAX_NAME_WORDS:
+            continue
+        if language == "en" and normalized in ENGLISH_FILLERS:
+            continue
+        # Consecutive repeats come from formulas like "he said: X said"
+        if narrators and narrators[-1][1] == normalized:
+            continue
+        if language == "ar":
+            display = normalized
+        else:
+            display = re.sub(r"\s+", " ", ENGLISH_NOISE_RE.sub(" ", segment)).strip(" .,:;")
+        narrators.append((display[:200], normalized[:200]))
+
+    return narrators
+
+
+class NarratorIndexer:
+    """Maintain the narrators / hadith_narrators / narrator_links tables."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._narrator_ids: Dict[Tuple[str, str], int] = {}
+
+    def index_hadith(self, hadith: Hadith) -> int:
+        """
+        (Re)index the narrator chains of one hadith.
+
+        The hadith must already have an id (flush before calling).
+
+        Returns:
+            Number of edges written
+        """
+        self.db.query(HadithNarrator).filter(
+            HadithNarrator.hadith_id == hadith.id
+        ).delete(synchronize_session=False)
+
+        edges = 0
+        for language, chain in (("en", hadith.narrator_chain), ("ar", hadith.arabic_narrator_chain)):
+            for position, (display, normalized) in enumerate(parse_narrator_chain(chain, language)):
+                self.db.add(HadithNarrator(
+                    hadith_id=hadith.id,
+                    language=language,
+                    position=position,
+                    narrator_id=self._get_or_create_narrator(language, normalized, display)
+                ))
+                edges += 1
+
+        return edges
+
+    @contextmanager
+    def savepoint(self) -> Iterator[None]:
+        """
+        Run the block in a savepoint (SAVEPOINT / ROLLBACK TO SAVEPOINT).
+
+        If it fails, only the block is rolled back and the narrator ids it
+        cached are dropped, since those rows no longer exist.
+        """
+        known = set(self._narrator_ids)
+        try:
+            with self.db.begin_nested():
+                yield
+        except Exception:
+            for key in set(self._narrator_ids) - known:
+                del self._narrator_ids[key]
+            raise
+
+    def refresh_aggregates(self) -> None:
+        """Recompute per-narrator counts and the narrated-from graph."""
+        self.db.execute(text("""
+            UPDATE narrators SET hadith_count = (
+                SELECT count(DISTINCT hn.hadith_id)
+                FROM hadith_narrators hn
+                WHERE hn.narrator_id = narrators.id
+            )
+        """))
+
+        self.db.execute(text("DELETE FROM narrator_links"))
+        self.db.execute(text("""
+            INSERT INTO narrator_links (narrator_id, teacher_id, hadith_count)
+            SELECT student.narrator_id, teacher.narrator_id, count(DISTINCT student.hadith_id)
+            FROM hadith_narrators student
+            JOIN hadith_narrators teacher
+              ON teacher.hadith_id = student.hadith_id
+             AND teacher.language = student.language
+             AND teacher.position = student.position + 1
+            WHERE student.narrator_id <> teacher.narrator_id
+            GROUP BY student.narrator_id, teacher.narrator_id
+        """))
+        self.db.commit()
+
+    def rebuild(self, batch_size: int = 1000) -> int:
+        """
+        Reindex every hadith, then refresh the aggregates.
+
+        Returns:
+            Number of hadiths indexed
+        """
+        last_id = 0
+        indexed = 0
+
+        while True:
+            hadiths = self.db.query(Hadith).filter(
+                Hadith.id > last_id
+            ).order_by(Hadith.id).limit(batch_size).all()
+            if not hadiths:
+                break
+
+            for hadith in hadiths:
+                self.index_hadith(hadith)
+            self.db.commit()
+
+            last_id = hadiths[-1].id
+            indexed += len(hadiths)
+            logger.info(f"Narrator index: {indexed} hadiths indexed")
+
+        self.refresh_aggregates()
+        return indexed
+
+    def _get_or_create_narrator(self, language: str, normalized: str, display: str) -> int:
+        key = (language, normalized)
+        if key in self._narrator_ids:
+            return self._narrator_ids[key]
+
+        narrator = self.db.query(Narrator).filter(
+            Narrator.language == language,
+            Narrator.normalized_name == normalized
+        ).first()
+
+        if not narrator:
+            narrator = Narrator(
+                name=display,
+                normalized_name=normalized,
+                language=language,
+                hadith_count=0
+            )
+            self.db.add(narrator)
+            self.db.flush()
+
+        self._narrator_ids[key] = narrator.id
+        return narrator.id
@@ -0,0 +1,208 @@
+"""
+Quran verse search over the locally stored editions (quran_verses)
+"""
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.services.arabic_text import normalize_arabic
+
+# Text search configuration used to index and query each edition
+EDITION_SEARCH_CONFIGS: Dict[str, str] = {
+    "quran-simple": "arabic",
+    "quran-uthmani": "arabic",
+    "ar.muyassar": "arabic",
+    "en.sahih": "english",
+    "en.pickthall": "english",
+    "fr.hamidullah": "french",
+    "tr.ates": "turkish",
+    "id.indonesian": "simple",
+}
+
+# Default edition for the legacy `language` parameter
+LANGUAGE_EDITIONS: Dict[str, str] = {
+    "ar": "quran-simple",
+    "en": "en.sahih",
+    "fr": "fr.hamidullah",
+    "tr": "tr.ates",
+    "id": "id.indonesian",
+}
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+HEADLINE_OPTIONS = f"HighlightAll=true, StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}"
+
+# Ranking and highlighting only ever touch the requested page: the GIN index
+# yields the matches, ts_headline runs on at most `per_page` rows
+SEARCH_SQL = f"""
+    WITH matches AS (
+        SELECT v.surah, v.ayah, v.text, v.search_text,
+               ts_rank_cd(v.search_vector, q.query) AS score,
+               count(*) OVER () AS total
+        FROM quran_verses v,
+             websearch_to_tsquery(CAST(:config AS regconfig), :query) AS q(query)
+        WHERE v.edition = :edition
+          AND v.search_vector @@ q.query
+          {{surah_filter}}
+        ORDER BY score DESC, v.surah, v.ayah
+        LIMIT :limit OFFSET :offset
+    )
+    SELECT surah, ayah, text, score, total,
+           ts_headline(
+               CAST(:config AS regconfig), search_text,
+               websearch_to_tsquery(CAST(:config AS regconfig), :query),
+               '{HEADLINE_OPTIONS}'
+           ) AS highlight
+    FROM matches
+    ORDER BY score DESC, surah, ayah
+"""
+
+
+def is_arabic_edition(edition: str) -> bool:
+    return EDITION_SEARCH_CONFIGS.get(edition) == "arabic"
+
+
+def prepare_search_text(edition: str, verse_text: str) -> str:
+    """Text the index is built from: Arabic is normalized like the hadith side."""
+    if is_arabic_edition(edition):
+        return normalize_arabic(verse_text)
+    return verse_text
+
+
+def align_highlight(original: str, highlighted: str) -> str:
+    """
+    Carry highlights computed on normalized Arabic back to the original text.
+
+    `highlighted` is the ts_headline of `normalize_arabic(original)`: the same
+    words without tashkeel. Each original word is marked when one of the
+    normalized words it produced is.
+
+    Args:
+        original: Verse text as stored (with diacritics)
+        highlighted: ts_headline output over the normalized text
+
+    Returns:
+        Original text with <mark> tags, or `highlighted` if the words do not line up
+    """
+    marked: List[bool] = []
+    inside = False
+    for token in highlighted.split():
+        starts = HIGHLIGHT_START in token
+        marked.append(inside or starts)
+        if starts:
+            inside = True
+        if HIGHLIGHT_STOP in token:
+            inside = False
+
+    words = original.split()
+    position = 0
+    output = []
+    for word in words:
+        count = len(normalize_arabic(word).split())
+        if any(marked[position:position + count]):
+            output.append(f"{HIGHLIGHT_START}{word}{HIGHLIGHT_STOP}")
+        else:
+            output.append(word)
+        position += count
+
+    if position != len(marked):
+        return highlighted
+    return " ".join(output)
+
+
+class QuranSearchService:
+    """Ranked, paginated and highlighted verse search."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def search(
+        self,
+        query: str,
+        edition: str = "quran-simple",
+        page: int = 1,
+        per_page: int = 20,
+        surah: Optional[int] = None
+    ) -> Dict:
+        """
+        Search one edition.
+
+        Args:
+            query: Search terms (websearch syntax: "phrase", -exclude, OR)
+            edition: Whitelisted edition identifier
+            page: Page number
+            per_page: Results per page
+            surah: Restrict to one surah
+
+        Returns:
+            Paginated results with a highlighted text per verse
+        """
+        config = EDITION_SEARCH_CONFIGS[edition]
+        search_query = normalize_arabic(query) if config == "arabic" else query.strip()
+
+        if not search_query:
+            return self._page(query, edition, page, per_page, 0, [])
+
+        params = {
+            "config": config,
+            "query": search_query,
+            "edition": edition,
+            "limit": per_page,
+            "offset": (page - 1) * per_page,
+        }
+        surah_filter = ""
+        if surah:
+            surah_filter = "AND v.surah = :surah"
+            params["surah"] = surah
+
+        rows = self.db.execute(
+            text(SEARCH_SQL.format(surah_filter=surah_filter)), params
+        ).fetchall()
+
+        if rows:
+            total = rows[0].total
+        elif page > 1:
+            # Past the last page: the window count is not available
+            total = self._count(params, surah_filter)
+        else:
+            total = 0
+
+        results = [
+            {
+                "surah": row.surah,
+                "ayah": row.ayah,
+                "text": row.text,
+                "highlight": (
+                    align_highlight(row.text, row.highlight)
+                    if config == "arabic" else row.highlight
+                ),
+                "score": round(float(row.score), 4),
+            }
+            for row in rows
+        ]
+        return self._page(query, edition, page, per_page, total, results)
+
+    def _count(self, params: Dict, surah_filter: str) -> int:
+        return self.db.execute(
+            text(f"""
+                SELECT count(*)
+                FROM quran_verses v
+                WHERE v.edition = :edition
+                  AND v.search_vector @@ websearch_to_tsquery(CAST(:config AS regconfig), :query)
+                  {surah_filter}
+            """),
+            params
+        ).scalar()
+
+    @staticmethod
+    def _page(query: str, edition: str, page: int, per_page: int, total: int, results: List[Dict]) -> Dict:
+        return {
+            "query": query,
+            "edition": edition,
+            "count": total,
+            "page": page,
+            "per_page": per_page,
+            "pages": (total + per_page - 1) // per_page,
+            "results": results,
+        }
@@ -0,0 +1,366 @@
+"""
+Online rebuild of the hadith full-text search vectors.
+
+Vectors are refreshed in bounded, individually committed batches so that no
+statement holds row locks for long or runs into ``statement_timeout``:
+
+- incremental: only rows modified after the stored watermark are refreshed.
+- full: every row is written into shadow columns, the shadow GIN indexes are
+  built concurrently, then the shadows are swapped in with a single short
+  transaction.
+"""
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import batch_session, get_batch_engine
+from app.models import SearchIndexState
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = "hadiths"
+
+# Arbitrary application-wide key for pg_try_advisory_lock
+REBUILD_LOCK_KEY = 72_150_026
+
+# Same expressions as the update_hadith_search_vectors() trigger
+SEARCH_VECTOR_EXPRESSIONS: Dict[str, str] = {
+    "search_vector_en": (
+        "to_tsvector('english', "
+        "COALESCE(english_text, '') || ' ' || "
+        "COALESCE(narrator_chain, '') || ' ' || "
+        "COALESCE(reference, ''))"
+    ),
+    "search_vector_ar": "to_tsvector('arabic', COALESCE(arabic_text, ''))",
+    "search_vector_fr": (
+        "to_tsvector('french', "
+        "COALESCE(french_text, '') || ' ' || "
+        "COALESCE(narrator_chain, '') || ' ' || "
+        "COALESCE(reference, ''))"
+    ),
+}
+
+# GIN index backing each vector column
+SEARCH_VECTOR_INDEXES: Dict[str, str] = {
+    "search_vector_en": "idx_hadith_fts_en",
+    "search_vector_ar": "idx_hadith_fts_ar",
+    "search_vector_fr": "idx_hadith_fts_fr",
+}
+
+SHADOW_SUFFIX = "_shadow"
+
+MODIFIED_AT = "COALESCE(updated_at, created_at)"
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class RebuildInProgressError(Exception):
+    """Raised when another rebuild already holds the advisory lock."""
+
+
+class SearchIndexRebuilder:
+    """Refresh hadith search vectors in bounded batches with progress reporting."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = batch_session,
+        batch_size: Optional[int] = None,
+        pause_seconds: Optional[float] = None
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.SEARCH_INDEX_BATCH_SIZE
+        self.pause_seconds = (
+            settings.SEARCH_INDEX_BATCH_PAUSE if pause_seconds is None else pause_seconds
+        )
+
+    # ------------------------------------------------------------------ #
+    # Public API
+    # ------------------------------------------------------------------ #
+
+    def run(self, full: bool = False) -> Dict:
+        """
+        Run a rebuild to completion in the calling thread.
+
+        Args:
+            full: Rebuild every row into shadow columns and swap them in,
+                instead of only refreshing rows past the watermark.
+
+        Returns:
+            Final job status
+        """
+        lock_conn = get_batch_engine().connect()
+        try:
+            acquired = lock_conn.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": REBUILD_LOCK_KEY}
+            ).scalar()
+            if not acquired:
+                raise RebuildInProgressError("A search index rebuild is already running")
+
+            db = self.session_factory()
+            try:
+                state = self._get_or_create_state(db)
+                started = db.execute(text("SELECT now()")).scalar()
+                self._start(db, state, "full" if full else "incremental", started)
+
+                try:
+                    if full:
+                        self._run_full(db, state, started)
+                    else:
+                        self._run_incremental(db, state, started)
+                except Exception as e:
+                    db.rollback()
+                    state.status = "failed"
+                    state.error = str(e)
+                    state.finished_at = datetime.now(timezone.utc)
+                    db.commit()
+                    logger.error(f"Search index rebuild failed: {e}")
+                    raise
+
+                return self._serialize(state)
+            finally:
+                db.close()
+        finally:
+            lock_conn.execute(
+                text("SELECT pg_advisory_unlock(:key)"), {"key": REBUILD_LOCK_KEY}
+            )
+            lock_conn.close()
+
+    def get_status(self, db: Session) -> Dict:
+        """Return the progress of the current or last rebuild."""
+        state = db.query(SearchIndexState).filter(
+            SearchIndexState.name == INDEX_NAME
+        ).first()
+        if not state:
+            return {"name": INDEX_NAME, "status": "idle", "watermark": None}
+        return self._serialize(state)
+
+    def is_running(self, db: Session) -> bool:
+        """Check whether a rebuild currently holds the advisory lock."""
+        return bool(db.execute(
+            text("""
+                SELECT EXISTS (
+                    SELECT 1 FROM pg_locks
+                    WHERE locktype = 'advisory' AND objid = :key AND granted
+                )
+            """),
+            {"key": REBUILD_LOCK_KEY}
+        ).scalar())
+
+    # ------------------------------------------------------------------ #
+    # Incremental mode
+    # ------------------------------------------------------------------ #
+
+    def _run_incremental(self, db: Session, state: SearchIndexState, started: datetime):
+        watermark = state.watermark or EPOCH
+
+        state.total_rows = db.execute(
+            text(f"SELECT count(*) FROM hadiths WHERE {MODIFIED_AT} > :watermark"),
+            {"watermark": watermark}
+        ).scalar()
+        db.commit()
+
+        assignments = ", ".join(
+            f"{column} = {expression}"
+            for column, expression in SEARCH_VECTOR_EXPRESSIONS.items()
+        )
+        self._process_batches(
+            db,
+            state,
+            f"""
+                WITH batch AS (
+                    SELECT id FROM hadiths
+                    WHERE {MODIFIED_AT} > :watermark AND id > :last_id
+                    ORDER BY id
+                    LIMIT :batch_size
+                )
+                UPDATE hadiths h SET {assignments}
+                FROM batch WHERE h.id = batch.id
+                RETURNING h.id
+            """,
+            {"watermark": watermark}
+        )
+
+        self._finish(db, state, started)
+
+    # ------------------------------------------------------------------ #
+    # Full mode (shadow columns + atomic swap)
+    # ------------------------------------------------------------------ #
+
+    def _run_full(self, db: Session, state: SearchIndexState, started: datetime):
+        # Adding a nullable column without default only touches the catalog
+        for column in SEARCH_VECTOR_EXPRESSIONS:
+            db.execute(text(
+                f"ALTER TABLE hadiths ADD COLUMN IF NOT EXISTS {column}{SHADOW_SUFFIX} tsvector"
+            ))
+        state.total_rows = db.execute(text("SELECT count(*) FROM hadiths")).scalar()
+        db.commit()
+
+        shadow_assignments = ", ".join(
+            f"{column}{SHADOW_SUFFIX} = {expression}"
+            for column, expression in SEARCH_VECTOR_EXPRESSIONS.items()
+        )
+        self._process_batches(
+            db,
+            state,
+            f"""
+                WITH batch AS (
+                    SELECT id FROM hadiths
+                    WHERE id > :last_id
+                    ORDER BY id
+                    LIMIT :batch_size
+                )
+                UPDATE hadiths h SET {shadow_assignments}
+                FROM batch WHERE h.id = batch.id
+                RETURNING h.id
+            """,
+            {}
+        )
+
+        self._build_shadow_indexes()
+
+        state.status = "swapping"
+        db.commit()
+
+        # Rows written while the shadows were filling only got live vectors
+        catchup_started = db.execute(text("SELECT now()")).scalar()
+        self._catch_up_shadows(db, shadow_assignments, started)
+        db.commit()
+
+        self._swap_shadows(db, shadow_assignments, catchup_started)
+
+        with get_batch_engine().connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("ANALYZE hadiths"))
+
+        self._finish(db, state, started)
+
+    def _build_shadow_indexes(self):
+        """Build the shadow GIN indexes without blocking writes."""
+        with get_batch_engine().connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            for column, index_name in SEARCH_VECTOR_INDEXES.items():
+                shadow_index = f"{index_name}{SHADOW_SUFFIX}"
+                # A failed CONCURRENTLY build leaves an invalid index behind
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {shadow_index}"))
+                conn.execute(text(
+                    f"CREATE INDEX CONCURRENTLY {shadow_index} "
+                    f"ON hadiths USING gin ({column}{SHADOW_SUFFIX})"
+                ))
+
+    def _catch_up_shadows(self, db: Session, shadow_assignments: str, since: datetime):
+        db.execute(
+            text(f"UPDATE hadiths SET {shadow_assignments} WHERE {MODIFIED_AT} >= :since"),
+            {"since": since}
+        )
+
+    def _swap_shadows(self, db: Session, shadow_assignments: str, since: datetime):
+        """Replace the live columns and indexes with the shadows in one transaction."""
+        db.execute(text("SET LOCAL lock_timeout = '5s'"))
+        db.execute(text("LOCK TABLE hadiths IN ACCESS EXCLUSIVE MODE"))
+
+        # Writes are blocked from here on, so this last pass is exact and tiny
+        self._catch_up_shadows(db, shadow_assignments, since)
+
+        for column, index_name in SEARCH_VECTOR_INDEXES.items():
+            db.execute(text(f"ALTER TABLE hadiths DROP COLUMN IF EXISTS {column}"))
+            db.execute(text(
+                f"ALTER TABLE hadiths RENAME COLUMN {column}{SHADOW_SUFFIX} TO {column}"
+            ))
+            db.execute(text(f"ALTER INDEX {index_name}{SHADOW_SUFFIX} RENAME TO {index_name}"))
+
+        db.commit()
+
+    # ------------------------------------------------------------------ #
+    # Helpers
+    # ------------------------------------------------------------------ #
+
+    def _process_batches(self, db: Session, state: SearchIndexState, sql: str, params: Dict):
+        """Run a keyset-paginated batch UPDATE until it touches no more rows."""
+        statement = text(sql)
+        last_id = 0
+
+        while True:
+            ids = [
+                row[0] for row in db.execute(
+                    statement,
+                    {**params, "last_id": last_id, "batch_size": self.batch_size}
+                ).fetchall()
+            ]
+            if not ids:
+                break
+
+            last_id = max(ids)
+            state.processed_rows = (state.processed_rows or 0) + len(ids)
+            state.last_id = last_id
+            db.commit()
+
+            logger.debug(
+                f"Search index rebuild: {state.processed_rows}/{state.total_rows} rows"
+            )
+
+            if self.pause_seconds:
+                time.sleep(self.pause_seconds)
+
+    def _get_or_create_state(self, db: Session) -> SearchIndexState:
+        state = db.query(SearchIndexState).filter(
+            SearchIndexState.name == INDEX_NAME
+        ).first()
+        if not state:
+            state = SearchIndexState(name=INDEX_NAME, watermark=None)
+            db.add(state)
+            db.commit()
+        return state
+
+    def _start(self, db: Session, state: SearchIndexState, mode: str, started: datetime):
+        state.status = "running"
+        state.mode = mode
+        state.total_rows = 0
+        state.processed_rows = 0
+        state.last_id = 0
+        state.error = None
+        state.started_at = started
+        state.finished_at = None
+        db.commit()
+        logger.info(f"Search index rebuild started ({mode})")
+
+    def _finish(self, db: Session, state: SearchIndexState, started: datetime):
+        # Everything modified before the job started is now indexed
+        state.watermark = started
+        state.status = "completed"
+        state.finished_at = datetime.now(timezone.utc)
+        db.commit()
+        logger.info(
+            f"Search index rebuild completed ({state.mode}): "
+            f"{state.processed_rows} rows"
+        )
+
+    @staticmethod
+    def _serialize(state: SearchIndexState) -> Dict:
+        total = state.total_rows or 0
+        processed = state.processed_rows or 0
+        return {
+            "name": state.name,
+            "status": state.status,
+            "mode": state.mode,
+            "watermark": state.watermark,
+            "total_rows": total,
+            "processed_rows": processed,
+            "progress": round(processed / total * 100, 1) if total else 100.0,
+            "error": state.error,
+            "started_at": state.started_at,
+            "finished_at": state.finished_at,
+        }
+
+
+def run_search_index_rebuild(full: bool = False) -> None:
+    """Background task entry point; failures are recorded in the job state."""
+    try:
+        SearchIndexRebuilder().run(full=full)
+    except RebuildInProgressError as e:
+        logger.warning(str(e))
+    except Exception:
+        # Already logged and stored on the state row
+        pass
@@ -0,0 +1,275 @@
+"""
+Query language for hadith search.
+
+Supported syntax::
+
+    patience "reward of the patient" -anger     terms, phrases, exclusions
+    fasting OR prayer                           alternatives
+    narrator:"abu huraira" -narrator:aisha      narrator (isnad index)
+    ref:bukhari:52  ref:52  ref:"book of faith" reference
+    book:2  book:"book of prayer"               book number or name
+    collection:muslim  grade:sahih              collection and grade
+
+Free text is rebuilt into a `websearch_to_tsquery` string and matched against
+the language's GIN-indexed tsvector; field prefixes compile to predicates on
+indexed columns, never to ILIKE scans over the hadith texts. Languages
+without a tsvector (mixed content) match the same terms with ILIKE.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, func, literal_column, not_, or_, select, text
+from sqlalchemy.orm import Query
+
+from app.models import Hadith, HadithBook, HadithCollection, HadithNarrator, Narrator
+from app.services.narrator_index import normalize_narrator_name
+
+# Text search configuration and tsvector column per search language
+TSVECTOR_COLUMNS = {
+    "english": ("english", "search_vector_en"),
+    "arabic": ("arabic", "search_vector_ar"),
+    "french": ("french", "search_vector_fr"),
+}
+
+FIELDS = {"narrator", "ref", "book", "collection", "grade"}
+
+# Columns matched with ILIKE when the language has no tsvector
+FALLBACK_COLUMNS = (
+    Hadith.english_text,
+    Hadith.arabic_text,
+    Hadith.french_text,
+    Hadith.narrator_chain,
+    Hadith.reference,
+)
+
+# -? field: ( "phrase" | "unclosed phrase | word )
+TOKEN_RE = re.compile(r'(-?)(?:([A-Za-z]+):)?(?:"([^"]*)"?|(\S+))')
+
+ARABIC_CHAR_RE = re.compile("[\u0600-\u06FF]")
+
+# ref:bukhari:52 or ref:52
+REFERENCE_NUMBER_RE = re.compile(r"^(?:([\w-]+):)?(\d+)$")
+
+
+@dataclass
+class FieldFilter:
+    """A `field:value` clause."""
+    field: str
+    value: str
+    negated: bool = False
+
+
+@dataclass
+class TextTerm:
+    """A free-text word or phrase."""
+    value: str
+    negated: bool = False
+
+
+@dataclass
+class ParsedQuery:
+    """A search query split into its free-text and field-scoped parts."""
+    # Free text in websearch_to_tsquery syntax ('' when there is none)
+    text: str = ""
+    filters: List[FieldFilter] = field(default_factory=list)
+    # The same free text as groups of OR-ed terms, all groups required
+    terms: List[List[TextTerm]] = field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.text and not self.filters
+
+
+def parse_search_query(query: Optional[str]) -> ParsedQuery:
+    """
+    Parse a user search query.
+
+    Never raises: unknown prefixes are kept as plain terms and an unclosed
+    quote runs to the end of the query.
+
+    Args:
+        query: Raw query string
+
+    Returns:
+        ParsedQuery
+    """
+    parsed = ParsedQuery()
+    if not query or not query.strip():
+        return parsed
+
+    parts: List[str] = []
+    for match in TOKEN_RE.finditer(query):
+        negated, prefix, phrase, word = match.groups()
+        is_phrase = phrase is not None
+        value = (phrase if is_phrase else word or "").strip()
+
+        if prefix and prefix.lower() in FIELDS:
+            if value:
+                parsed.filters.append(FieldFilter(prefix.lower(), value, bool(negated)))
+            continue
+
+        if prefix:
+            # Not a field: keep "word:rest" as text
+            value = f"{prefix} {value}".strip()
+        if not value:
+            continue
+
+        if not is_phrase and value == "OR":
+            # A leading or repeated OR has nothing to join
+            if parts and parts[-1] != "OR":
+                parts.append("OR")
+            continue
+
+        # Quotes and dashes inside a term would change websearch semantics
+        value = value.replace('"', " ").strip()
+        if not is_phrase:
+            value = value.lstrip("-")
+        if not value:
+            continue
+
+        term = f'"{value}"' if is_phrase or " " in value else value
+        text_term = TextTerm(value, bool(negated))
+        if parts and parts[-1] == "OR":
+            parsed.terms[-1].append(text_term)
+        else:
+            parsed.terms.append([text_term])
+        parts.append(f"-{term}" if negated else term)
+
+    while parts and parts[-1] == "OR":
+        parts.pop()
+
+    parsed.text = " ".join(parts)
+    return parsed
+
+
+class SearchQueryCompiler:
+    """Apply a ParsedQuery to a SQLAlchemy query on Hadith."""
+
+    def __init__(self, language: str = "english"):
+        self.config, self.vector_column = TSVECTOR_COLUMNS.get(
+            language, TSVECTOR_COLUMNS["english"]
+        )
+
+    def apply(self, hadith_query: Query, parsed: ParsedQuery) -> Tuple[Query, bool]:
+        """
+        Add the full-text match, relevance ordering and field predicates.
+
+        Returns:
+            (query, ranked) - ranked is False when there was no free text to
+            order by, so the caller picks its own ordering
+        """
+        ranked = False
+        if parsed.text:
+            tsquery = f"websearch_to_tsquery('{self.config}', :search_query)"
+            hadith_query = hadith_query.filter(
+                text(f"hadiths.{self.vector_column} @@ {tsquery}")
+            ).order_by(
+                text(f"ts_rank(hadiths.{self.vector_column}, {tsquery}) DESC")
+            ).params(search_query=parsed.text)
+            ranked = True
+
+        return self._apply_filters(hadith_query, parsed), ranked
+
+    def apply_fallback(self, hadith_query: Query, parsed: ParsedQuery) -> Query:
+        """
+        ILIKE match for languages without a tsvector (mixed content).
+
+        Each group needs one of its terms in one of FALLBACK_COLUMNS, and an
+        excluded term must appear in none; field prefixes compile as in apply().
+        """
+        for group in parsed.terms:
+            alternatives = []
+            for term in group:
+                pattern = f"%{_escape_like(term.value)}%"
+                if term.negated:
+                    # NULL columns must not hide the row
+                    alternatives.append(not_(or_(*(
+                        func.coalesce(column, "").ilike(pattern, escape="\\")
+                        for column in FALLBACK_COLUMNS
+                    ))))
+                else:
+                    alternatives.append(or_(*(
+                        column.ilike(pattern, escape="\\") for column in FALLBACK_COLUMNS
+                    )))
+            hadith_query = hadith_query.filter(or_(*alternatives))
+
+        return self._apply_filters(hadith_query, parsed)
+
+    def _apply_filters(self, hadith_query: Query, parsed: ParsedQuery) -> Query:
+        for field_filter in parsed.filters:
+            predicate = self._predicate(field_filter)
+            if predicate is None:
+                continue
+            hadith_query = hadith_query.filter(
+                not_(predicate) if field_filter.negated else predicate
+            )
+        return hadith_query
+
+    def _predicate(self, field_filter: FieldFilter):
+        compile_field = getattr(self, f"_{field_filter.field}_predicate")
+        return compile_field(field_filter.value)
+
+    def _narrator_predicate(self, value: str):
+        """Hadiths whose chain contains a narrator starting with `value` (idx_narrator_name_pattern)."""
+        language = "ar" if ARABIC_CHAR_RE.search(value) else "en"
+        normalized = normalize_narrator_name(value, language)
+        if not normalized:
+            return None
+
+        narrator_ids = select(Narrator.id).where(
+            Narrator.language == language,
+            Narrator.normalized_name.like(_escape_like(normalized) + "%", escape="\\")
+        )
+        hadith_ids = select(HadithNarrator.hadith_id).where(
+            HadithNarrator.narrator_id.in_(narrator_ids)
+        )
+        return Hadith.id.in_(hadith_ids)
+
+    def _ref_predicate(self, value: str):
+        """`collection:number` / `number` hit ix_hadith_collection_number; other text the English vector."""
+        match = REFERENCE_NUMBER_RE.match(value.strip())
+        if match:
+            collection, number = match.groups()
+            predicate = Hadith.hadith_number == int(number)
+            if collection:
+                predicate = and_(predicate, Hadith.collection_id.in_(
+                    _collection_ids(collection)
+                ))
+            return predicate
+
+        # The reference is part of search_vector_en
+        return literal_column("hadiths.search_vector_en").op("@@")(
+            func.phraseto_tsquery("english", value)
+        )
+
+    def _book_predicate(self, value: str):
+        """Book number, or a book name matched on the (small) books table."""
+        if value.isdigit():
+            book_ids = select(HadithBook.id).where(HadithBook.book_number == int(value))
+        else:
+            pattern = f"%{_escape_like(value)}%"
+            book_ids = select(HadithBook.id).where(or_(
+                HadithBook.name.ilike(pattern, escape="\\"),
+                HadithBook.arabic_name.ilike(pattern, escape="\\")
+            ))
+        return Hadith.book_id.in_(book_ids)
+
+    def _collection_predicate(self, value: str):
+        return Hadith.collection_id.in_(_collection_ids(value))
+
+    def _grade_predicate(self, value: str):
+        # Grades are stored lowercase (idx_hadith_grade)
+        return Hadith.grade == value.lower()
+
+
+def _collection_ids(value: str):
+    slug = value.strip().lower()
+    return select(HadithCollection.id).where(or_(
+        HadithCollection.collection_id == slug,
+        func.lower(HadithCollection.name).like(f"%{_escape_like(slug)}%", escape="\\")
+    ))
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
@@ -3,10 +3,22 @@ Optimized search service using PostgreSQL full-text search
 """
 from typing import List, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import func, or_, and_, cast, text
+from sqlalchemy import func, and_, cast, text
 from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from app.core.cache import cache, generate_cache_key
+from app.core.cache_tags import HADITH_CORPUS_TAG
+from app.core.redis_manager import run_async
+from app.core.singleflight import DistributedSingleFlight
 from app.models import Hadith, HadithCollection
 from app.schemas.hadith import PaginatedHadiths
+from app.services.search_indexer import SearchIndexRebuilder
+from app.services.search_query import TSVECTOR_COLUMNS, SearchQueryCompiler, parse_search_query
+
+# Short-lived: lets concurrent identical searches on other workers reuse the
+# result instead of each running the query
+SEARCH_RESULT_TTL = 60
+
+search_flight = DistributedSingleFlight("hadith_search")
 
 
 class SearchService:
@@ -30,7 +42,8 @@ class SearchService:
         Perform optimized hadith search using full-text search.
         
         Args:
-            query: Search query
+            query: Search query; supports "phrases", -exclusions, OR and
+                narrator:/ref:/book:/collection:/grade: prefixes
             collection_id: Filter by collection
             book_id: Filter by book
             grade: Filter by hadith grade
@@ -42,49 +55,58 @@ class SearchService:
         Returns:
             PaginatedHadiths with search results
         """
+        cache_key = generate_cache_key(
+            query, collection_id, book_id, grade, category, language, page, per_page,
+            prefix="search:hadiths"
+        )
+        cached_result = run_async(cache.get, cache_key)
+        if cached_result is not None:
+            return PaginatedHadiths.model_validate(cached_result)
+        
+        def compute() -> PaginatedHadiths:
+            result = self._search_hadiths(
+                query, collection_id, book_id, grade, category, language, page, per_page
+            )
+            run_async(
+                cache.set, cache_key, result.model_dump(mode="json"), SEARCH_RESULT_TTL,
+                tags=[HADITH_CORPUS_TAG]
+            )
+            return result
+        
+        # Identical concurrent searches share one query, in this worker and across workers
+        result = search_flight.do(cache_key, compute, lambda: run_async(cache.get, cache_key))
+        if isinstance(result, PaginatedHadiths):
+            return result
+        return PaginatedHadiths.model_validate(result)
+    
+    def _search_hadiths(
+        self,
+        query: str,
+        collection_id: Optional[str],
+        book_id: Optional[int],
+        grade: Optional[str],
+        category: Optional[str],
+        language: str,
+        page: int,
+        per_page: int
+    ) -> PaginatedHadiths:
         # Base query
         hadith_query = self.db.query(Hadith)
         
-        # Apply search if query provided
-        if query and query.strip():
-            if language == "arabic":
-                # Use Arabic full-text search
-                search_query = func.plainto_tsquery('arabic', query)
-                hadith_query = hadith_query.filter(
-                    text("hadiths.search_vector_ar @@ plainto_tsquery('arabic', :query)")
-                ).params(query=query)
-                
-                # Order by relevance
-                hadith_query = hadith_query.order_by(
-                    text("ts_rank(hadiths.search_vector_ar, plainto_tsquery('arabic', :query)) DESC")
-                ).params(query=query)
-                
-            elif language == "english":
-                # Use English full-text search
-                search_query = func.plainto_tsquery('english', query)
-                hadith_query = hadith_query.filter(
-                    text("hadiths.search_vector_en @@ plainto_tsquery('english', :query)")
-                ).params(query=query)
-                
-                # Order by relevance
-                hadith_query = hadith_query.order_by(
-                    text("ts_rank(hadiths.search_vector_en, plainto_tsquery('english', :query)) DESC")
-                ).params(query=query)
-                
-            else:
-                # Fallback to ILIKE for other languages or mixed content
-                search_term = f"%{query}%"
-                hadith_query = hadith_query.filter(
-                    or_(
-                        Hadith.english_text.ilike(search_term),
-                        Hadith.arabic_text.ilike(search_term),
-                        Hadith.french_text.ilike(search_term),
-                        Hadith.narrator_chain.ilike(search_term),
-                        Hadith.reference.ilike(search_term)
-                    )
-                )
+        parsed = parse_search_query(query)
+        ranked = False
+        
+        if language in TSVECTOR_COLUMNS:
+            # Free text on the language's GIN-indexed tsvector, field prefixes
+            # (narrator:, ref:, book:, ...) on indexed columns
+            hadith_query, ranked = SearchQueryCompiler(language).apply(hadith_query, parsed)
         else:
-            # No search query, order by hadith number
+            # Fallback to ILIKE on the parsed terms for other languages or
+            # mixed content; field prefixes still apply
+            hadith_query = SearchQueryCompiler().apply_fallback(hadith_query, parsed)
+        
+        if not ranked:
+            # No relevance to rank by, order by hadith number
             hadith_query = hadith_query.order_by(Hadith.collection_id, Hadith.hadith_number)
         
         # Apply filters
@@ -118,7 +140,7 @@ class SearchService:
         hadiths = hadith_query.offset(offset).limit(per_page).all()
         
         return PaginatedHadiths(
-            items=hadiths,
+            hadiths=hadiths,
             total=total,
             page=page,
             per_page=per_page,
@@ -201,33 +223,16 @@ class SearchService:
         
         return popular_terms[:limit]
     
-    def rebuild_search_indexes(self):
+    def rebuild_search_indexes(self, full: bool = False) -> dict:
         """
-        Rebuild search vectors for all hadiths.
+        Rebuild search vectors in bounded batches.
         This should be run after bulk imports.
-        """
-        # Update English search vectors
-        self.db.execute(
-            text("""
-                UPDATE hadiths 
-                SET search_vector_en = to_tsvector('english',
-                    COALESCE(english_text, '') || ' ' ||
-                    COALESCE(narrator_chain, '') || ' ' ||
-                    COALESCE(reference, '')
-                )
-            """)
-        )
-        
-        # Update Arabic search vectors
-        self.db.execute(
-            text("""
-                UPDATE hadiths 
-                SET search_vector_ar = to_tsvector('arabic', COALESCE(arabic_text, ''))
-            """)
-        )
         
-        self.db.commit()
-        
-        # Analyze tables for query optimization
-        self.db.execute(text("ANALYZE hadiths"))
-        self.db.commit()
\ No newline at end of file
+        Args:
+            full: Rebuild every row into shadow columns and swap them in;
+                otherwise only rows modified since the last rebuild are refreshed.
+            
+        Returns:
+            Final rebuild job status
+        """
+        return SearchIndexRebuilder().run(full=full)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Compare cache value codecs on a typical 20-hadith page: encode / decode time,
+stored size and Redis memory (MEMORY USAGE, when Redis is reachable)
+
+Usage: python scripts/benchmark_cache_serialization.py [--synthetic] [--iterations N]
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import argparse
+import json
+import random
+import statistics
+import time
+
+import redis
+
+from app.core.config import settings
+from app.core.serialization import (
+    HAS_LZ4,
+    HAS_MSGPACK,
+    HAS_ORJSON,
+    HAS_ZSTD,
+    ValueCodec,
+)
+
+PAGE_SIZE = 20
+
+
+def load_page() -> dict:
+    """First page of hadiths, as cached by the API (PaginatedHadiths)."""
+    from app.db.session import SessionLocal
+    from app.models import Hadith
+    from app.schemas.hadith import PaginatedHadiths
+
+    db = SessionLocal()
+    try:
+        query = db.query(Hadith).order_by(Hadith.id)
+        hadiths = query.limit(PAGE_SIZE).all()
+        total = query.count()
+        page = PaginatedHadiths(
+            hadiths=hadiths, total=total, page=1, per_page=PAGE_SIZE,
+            pages=(total + PAGE_SIZE - 1) // PAGE_SIZE
+        )
+        return page.model_dump(mode="json")
+    finally:
+        db.close()
+
+
+def synthetic_page() -> dict:
+    """Page of the same shape and text lengths, for runs without a database."""
+    rng = random.Random(42)
+    arabic_words = (
+        "حَدَّثَنَا الْحُمَيْدِيُّ عَبْدُ اللَّهِ بْنُ الزُّبَيْرِ قَالَ سُفْيَانُ يَحْيَى سَعِيدٍ "
+        "الأَنْصَارِيُّ أَخْبَرَنِي مُحَمَّدُ إِبْرَاهِيمَ التَّيْمِيُّ سَمِعَ عَلْقَمَةَ وَقَّاصٍ اللَّيْثِيَّ "
+        "يَقُولُ سَمِعْتُ عُمَرَ الْخَطَّابِ الْمِنْبَرِ رَسُولَ إِنَّمَا الأَعْمَالُ بِالنِّيَّاتِ"
+    ).split()
+    english_words = (
+        "Narrated Umar bin Al-Khattab I heard Allah's Messenger saying The reward of deeds "
+        "depends upon the intentions and every person will get what he has intended So "
+        "whoever emigrated for worldly benefits or for a woman to marry his emigration was"
+    ).split()
+
+    def text(words, length):
+        return " ".join(rng.choice(words) for _ in range(length))
+
+    return {
+        "hadiths": [
+            {
+                "id": i,
+                "collection_id": 1,
+                "book_id": 1,
+                "hadith_number": i,
+                "arabic_text": text(arabic_words, rng.randint(40, 160)),
+                "english_text": text(english_words, rng.randint(60, 220)),
+                "french_text": None,
+                "narrator_chain": "Narrated 'Umar bin Al-Khattab",
+                "arabic_narrator_chain": "عَنْ عُمَرَ بْنِ الْخَطَّابِ",
+                "grade": "Sahih",
+                "grade_text": "Sahih",
+                "reference": f"Sahih al-Bukhari {i}",
+                "categories": ["faith", "intention"],
+                "created_at": "2024-03-01T12:30:00",
+                "updated_at": None,
+            }
+            for i in range(1, PAGE_SIZE + 1)
+        ],
+        "total": 7563,
+        "page": 1,
+        "per_page": PAGE_SIZE,
+        "pages": 379,
+    }
+
+
+class LegacyJson:
+    """Format used before the binary codecs: json.dumps(default=str)."""
+
+    def dumps(self, value):
+        return json.dumps(value, default=str)
+
+    def loads(self, raw):
+        return json.loads(raw)
+
+
+def codecs():
+    yield "json (legacy)", LegacyJson()
+    available = {"json": True, "msgpack": HAS_MSGPACK, "orjson": HAS_ORJSON}
+    compressions = ["none"] + [name for name, ok in (("zstd", HAS_ZSTD), ("lz4", HAS_LZ4)) if ok]
+    for serializer, ok in available.items():
+        if not ok:
+            continue
+        for compression in compressions:
+            yield f"{serializer} + {compression}", ValueCodec(serializer, compression, threshold=1024)
+
+
+def timed(fn, iterations: int) -> float:
+    """Median duration of fn() in microseconds."""
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations) * 1_000_000
+
+
+def redis_memory(client, name: str, raw) -> str:
+    if client is None:
+        return "n/a"
+    key = f"bench:serialization:{name}"
+    client.setex(key, 60, raw)
+    try:
+        return str(client.memory_usage(key, samples=0))
+    finally:
+        client.delete(key)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--synthetic", action="store_true", help="Do not read the page from the database")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    page = synthetic_page() if args.synthetic else load_page()
+
+    try:
+        client = redis.from_url(settings.REDIS_URL)
+        client.ping()
+    except Exception as e:
+        print(f"Redis unavailable ({e}): memory not measured")
+        client = None
+
+    print(f"{PAGE_SIZE}-hadith page, median of {args.iterations} runs")
+    print("=" * 72)
+    print(f"{'codec':<20} {'encode µs':>10} {'decode µs':>10} {'bytes':>10} {'redis bytes':>12}")
+    for name, codec in codecs():
+        raw = codec.dumps(page)
+        encode = timed(lambda: codec.dumps(page), args.iterations)
+        decode = timed(lambda: codec.loads(raw), args.iterations)
+        size = len(raw.encode("utf-8") if isinstance(raw, str) else raw)
+        print(f"{name:<20} {encode:>10.1f} {decode:>10.1f} {size:>10} {redis_memory(client, name, raw):>12}")
+
+
+if __name__ == "__main__":
+    main()
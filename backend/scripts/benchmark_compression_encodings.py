@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Compare zstd, brotli and gzip levels on real API pages: compression time,
+ratio and bytes saved per millisecond of CPU
+
+Pages are fetched from a running API, or read from saved response bodies.
+
+Usage: python scripts/benchmark_compression_encodings.py [--base-url URL] [--path PATH ...]
+                                                         [--file FILE ...] [--rounds N]
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import argparse
+import statistics
+import time
+import urllib.request
+
+from app.middleware.compression import HAS_BROTLI, HAS_ZSTD, StreamCompressor
+
+# Largest anonymous pages: hadith listings and full surahs, mostly Arabic text
+DEFAULT_PATHS = [
+    "/api/hadith/collections/bukhari/hadiths/paginated?per_page=100",
+    "/api/hadith/search/paginated?query=%D8%A7%D9%84%D9%86%D9%8A%D8%A9&per_page=100",
+    "/api/hadith/collections/muslim/books/1/hadiths",
+    "/api/v1/quran/surah/2",
+    "/api/v1/quran/surahs",
+]
+
+LEVELS = {
+    "gzip": [1, 6, 9],
+    "br": [1, 4, 5, 6, 9],
+    "zstd": [1, 3, 6, 9, 12],
+}
+
+
+def fetch(base_url: str, path: str) -> bytes:
+    request = urllib.request.Request(base_url.rstrip("/") + path, headers={"Accept-Encoding": "identity"})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return response.read()
+
+
+def measure(encoding: str, level: int, page: bytes, rounds: int) -> tuple:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        compressed = StreamCompressor(encoding, level, level, zstd_level=level).finish(page)
+        timings.append(time.perf_counter() - start)
+    return len(compressed), statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--path", action="append", help="API path to fetch (repeatable)")
+    parser.add_argument("--file", action="append", help="Saved response body instead of the API (repeatable)")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.file:
+        pages = {name: Path(name).read_bytes() for name in args.file}
+    else:
+        pages = {path: fetch(args.base_url, path) for path in args.path or DEFAULT_PATHS}
+
+    encodings = ["gzip"] + (["br"] if HAS_BROTLI else []) + (["zstd"] if HAS_ZSTD else [])
+    total = sum(len(page) for page in pages.values())
+    print(f"{len(pages)} pages, {total / 1024:.0f} KB, median of {args.rounds} rounds")
+    print("=" * 72)
+    print(f"{'encoding':<10} {'level':>5} {'ratio':>8} {'ms/page':>10} {'MB/s':>8} {'KB saved/ms':>12}")
+    for encoding in encodings:
+        for level in LEVELS[encoding]:
+            size, seconds = 0, 0.0
+            for page in pages.values():
+                page_size, page_seconds = measure(encoding, level, page, args.rounds)
+                size += page_size
+                seconds += page_seconds
+            print(
+                f"{encoding:<10} {level:>5} {total / size:>8.2f} {seconds * 1000 / len(pages):>10.2f} "
+                f"{total / seconds / 1024 / 1024:>8.0f} {(total - size) / 1024 / (seconds * 1000):>12.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
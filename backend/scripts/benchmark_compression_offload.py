@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Measure request latency under mixed load through CompressionMiddleware:
+compression inline on the event loop, offloaded to the thread pool, and
+offloaded with adaptive levels
+
+Usage: python scripts/benchmark_compression_offload.py [--duration S] [--concurrency N]
+                                                       [--large-ratio R] [--encoding br|gzip]
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+from app.middleware.compression import CompressionMiddleware
+from app.monitoring.loop_lag import loop_lag
+
+# Simulated I/O (database, cache) of every request
+IO_DELAY = 0.001
+
+
+def hadith_page(count: int) -> bytes:
+    """A hadith listing page, the shape of the largest API responses."""
+    return json.dumps({
+        "items": [
+            {
+                "id": i,
+                "collection": "bukhari",
+                "hadith_number": str(i),
+                "arabic_text": "حدثنا الحميدي عبد الله بن الزبير قال حدثنا سفيان قال حدثنا يحيى بن سعيد "
+                               f"الأنصاري إنما الأعمال بالنيات وإنما لكل امرئ ما نوى {i}",
+                "english_text": f"Narrated Umar bin Al-Khattab: the reward of deeds depends upon the intentions {i}",
+                "grade": "sahih",
+            }
+            for i in range(count)
+        ],
+        "total": count,
+    }, ensure_ascii=False).encode("utf-8")
+
+
+SMALL_BODY = hadith_page(5)     # ~2 KB
+LARGE_BODY = hadith_page(1300)  # ~500 KB
+
+
+async def app(scope, receive, send):
+    body = LARGE_BODY if scope["path"] == "/large" else SMALL_BODY
+    await asyncio.sleep(IO_DELAY)
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": body, "more_body": False})
+
+
+async def request(middleware, path: str, encoding: str) -> float:
+    scope = {"type": "http", "method": "GET", "path": path, "headers": [(b"accept-encoding", encoding.encode())]}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    await middleware(scope, receive, send)
+    return time.perf_counter() - start
+
+
+async def load(middleware, duration: float, concurrency: int, large_ratio: float, encoding: str) -> dict:
+    latencies = {"/small": [], "/large": []}
+    deadline = time.perf_counter() + duration
+    rng = random.Random(42)
+
+    async def client():
+        while time.perf_counter() < deadline:
+            path = "/large" if rng.random() < large_ratio else "/small"
+            latencies[path].append(await request(middleware, path, encoding))
+
+    monitor = asyncio.create_task(loop_lag.run(interval=0.05))
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    monitor.cancel()
+    loop_lag.lag = 0.0
+    return latencies
+
+
+def percentile(values: list, p: float) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100)[int(p) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--large-ratio", type=float, default=0.1)
+    parser.add_argument("--encoding", choices=["br", "gzip"], default="br")
+    args = parser.parse_args()
+
+    variants = [
+        ("inline", CompressionMiddleware(app, offload_threshold=None, adaptive_levels=False)),
+        ("offloaded", CompressionMiddleware(app, adaptive_levels=False)),
+        ("offloaded + adaptive", CompressionMiddleware(app)),
+    ]
+
+    print(
+        f"{args.concurrency} clients, {args.large_ratio:.0%} large ({len(LARGE_BODY) // 1024} KB) / "
+        f"small ({len(SMALL_BODY) // 1024} KB), {args.encoding}, {args.duration:g}s per variant"
+    )
+    print("=" * 88)
+    print(f"{'variant':<22} {'req/s':>8} {'small p50':>10} {'small p99':>10} {'large p50':>10} {'large p99':>10}  (ms)")
+    for name, middleware in variants:
+        latencies = asyncio.run(load(middleware, args.duration, args.concurrency, args.large_ratio, args.encoding))
+        small, large = latencies["/small"], latencies["/large"]
+        print(
+            f"{name:<22} {(len(small) + len(large)) / args.duration:>8.0f} "
+            f"{percentile(small, 50) * 1000:>10.1f} {percentile(small, 99) * 1000:>10.1f} "
+            f"{percentile(large, 50) * 1000:>10.1f} {percentile(large, 99) * 1000:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Measure peak memory and time to first byte of a large streamed export
+through CompressionMiddleware, against the previous buffer-then-compress
+behaviour
+
+Usage: python scripts/benchmark_streaming_compression.py [--size-mb N] [--chunk-kb N]
+                                                         [--encoding br|gzip] [--pdf]
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from app.middleware.compression import CompressionMiddleware, StreamCompressor
+
+# Per-chunk production time of the simulated export (rendering, DB reads)
+CHUNK_DELAY = 0.001
+
+
+class BufferedCompression:
+    """Previous behaviour: the whole body is held, then compressed at once."""
+
+    def __init__(self, app, encoding: str):
+        self.app = app
+        self.encoding = encoding
+
+    async def __call__(self, scope, receive, send):
+        start = {}
+        parts = []
+
+        async def wrapped_send(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            parts.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                body = StreamCompressor(self.encoding).finish(b"".join(parts))
+                await send(start)
+                await send({"type": "http.response.body", "body": body, "more_body": False})
+
+        await self.app(scope, receive, wrapped_send)
+
+
+def synthetic_chunks(size: int, chunk_size: int):
+    """Export-like text (Arabic and English hadith lines), produced chunk by chunk."""
+    line = (
+        "حدثنا الحميدي عبد الله بن الزبير قال حدثنا سفيان إنما الأعمال بالنيات | "
+        "Narrated Umar bin Al-Khattab: the reward of deeds depends upon the intentions\n"
+    ).encode("utf-8")
+    produced = 0
+    index = 0
+    while produced < size:
+        # Vary the content so the compressor cannot just repeat one block
+        chunk = (line * (chunk_size // len(line) + 1))[:chunk_size] + str(index).encode()
+        produced += len(chunk)
+        index += 1
+        yield chunk
+
+
+def pdf_chunks():
+    """Chunks of the real PDF export, as StreamingResponse iterates its buffer."""
+    from app.db.session import SessionLocal
+    from app.services.hadith_export import export_hadiths_to_pdf
+
+    db = SessionLocal()
+    try:
+        return list(export_hadiths_to_pdf(db=db, limit=500))
+    finally:
+        db.close()
+
+
+def make_app(chunks_factory, media_type: bytes):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", media_type)]})
+        for chunk in chunks_factory():
+            await asyncio.sleep(CHUNK_DELAY)
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+    return app
+
+
+async def measure(app, encoding: str) -> dict:
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/api/hadith/export/pdf",
+        "headers": [(b"accept-encoding", encoding.encode())],
+    }
+    first_byte = None
+    sent = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal first_byte, sent
+        if message["type"] == "http.response.body" and message["body"]:
+            sent += len(message["body"])
+            if first_byte is None:
+                first_byte = time.perf_counter()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    total = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "ttfb_ms": (first_byte - start) * 1000,
+        "total_ms": total * 1000,
+        "peak_mb": peak / 1024 / 1024,
+        "sent_mb": sent / 1024 / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size-mb", type=float, default=50)
+    parser.add_argument("--chunk-kb", type=int, default=64)
+    parser.add_argument("--encoding", choices=["br", "gzip"], default="gzip")
+    parser.add_argument("--pdf", action="store_true", help="Stream the real PDF export (needs the database)")
+    args = parser.parse_args()
+
+    if args.pdf:
+        chunks = pdf_chunks()
+        factory, media_type = (lambda: iter(chunks)), b"application/pdf"
+        label = f"PDF export ({sum(map(len, chunks)) / 1024 / 1024:.1f} MB)"
+    else:
+        size, chunk_size = int(args.size_mb * 1024 * 1024), args.chunk_kb * 1024
+        factory, media_type = (lambda: synthetic_chunks(size, chunk_size)), b"text/plain"
+        label = f"synthetic export ({args.size_mb:g} MB in {args.chunk_kb} KB chunks)"
+
+    app = make_app(factory, media_type)
+    variants = [
+        ("buffered (previous)", BufferedCompression(app, args.encoding)),
+        ("streaming", CompressionMiddleware(app)),
+    ]
+
+    print(f"{label}, {args.encoding}")
+    print("=" * 72)
+    print(f"{'middleware':<22} {'TTFB ms':>10} {'total ms':>10} {'peak MB':>10} {'sent MB':>10}")
+    for name, middleware in variants:
+        result = asyncio.run(measure(middleware, args.encoding))
+        print(
+            f"{name:<22} {result['ttfb_ms']:>10.1f} {result['total_ms']:>10.1f} "
+            f"{result['peak_mb']:>10.1f} {result['sent_mb']:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
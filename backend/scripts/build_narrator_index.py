@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Build the narrator (isnad) index for hadiths imported before it existed
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy.orm import Session
+from app.db.session import batch_session
+from app.services.narrator_index import NarratorIndexer
+import logging
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+def main() -> int:
+    """Parse every narrator chain into the narrators / hadith_narrators tables; returns the exit code"""
+    db: Session = batch_session()
+    
+    try:
+        indexed = NarratorIndexer(db).rebuild()
+        logger.info(f"Narrator index built for {indexed} hadiths")
+        return 0
+        
+    except Exception:
+        logger.exception("Error building narrator index")
+        db.rollback()
+        return 1
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
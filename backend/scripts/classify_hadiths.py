@@ -11,7 +11,7 @@ import json
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from app.db import SessionLocal
+from app.db import batch_session
 from app.models.hadith import Hadith, HadithCollection, HadithBook
 from sqlalchemy import func, distinct
 
@@ -58,7 +58,7 @@ def classify_hadith_by_theme(hadith_text):
 
 def analyze_hadiths():
     """Analyse et classe tous les hadiths"""
-    db = SessionLocal()
+    db = batch_session()
     
     print("=" * 80)
     print("CLASSIFICATION DES HADITHS PAR LIVRE ET PAR THÈMES")
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Precompute the "similar hadiths" table (requires requirements-ml.txt)
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy.orm import Session
+from app.db.session import batch_session
+from app.services.hadith_similarity import DEFAULT_MIN_SCORE, DEFAULT_TOP_K, compute_similar_hadiths
+import argparse
+import logging
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+def main(top_k: int, min_score: float) -> int:
+    """Vectorize every hadith and store its top-k neighbours; returns the exit code"""
+    db: Session = batch_session()
+    
+    try:
+        stats = compute_similar_hadiths(db, top_k=top_k, min_score=min_score)
+        if stats is None:
+            logger.error("Missing ML dependencies: pip install -r requirements-ml.txt")
+            return 1
+        logger.info(f"Similar hadiths stored: {stats}")
+        return 0
+        
+    except Exception:
+        logger.exception("Error computing similar hadiths")
+        db.rollback()
+        return 1
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--top-k", type=int, default=DEFAULT_TOP_K, help="Neighbours kept per hadith")
+    parser.add_argument("--min-score", type=float, default=DEFAULT_MIN_SCORE, help="Minimum cosine similarity")
+    args = parser.parse_args()
+    sys.exit(main(args.top_k, args.min_score))
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Cluster near-duplicate hadiths across collections (requires requirements-ml.txt)
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy.orm import Session
+from app.db.session import batch_session
+from app.services.hadith_parallels import JACCARD_THRESHOLD, detect_parallel_narrations
+import argparse
+import logging
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+def main(threshold: float) -> int:
+    """Recompute hadiths.parallel_cluster_id with MinHash LSH; returns the exit code"""
+    db: Session = batch_session()
+    
+    try:
+        stats = detect_parallel_narrations(db, threshold=threshold)
+        if stats is None:
+            logger.error("Missing ML dependencies: pip install -r requirements-ml.txt")
+            return 1
+        logger.info(f"Parallel narrations stored: {stats}")
+        return 0
+        
+    except Exception:
+        logger.exception("Error detecting parallel narrations")
+        db.rollback()
+        return 1
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threshold", type=float, default=JACCARD_THRESHOLD, help="Minimum estimated Jaccard similarity")
+    args = parser.parse_args()
+    sys.exit(main(args.threshold))
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Generate the nginx micro-cache locations from the response cache TTLs
+
+Each route of ROUTE_CACHE_TTLS gets a location that caches anonymous 200
+responses for min(soft TTL, RESPONSE_CACHE_EDGE_TTL) seconds, serves stale
+copies while one request refreshes them and reuses upstream connections.
+The output is included in the server block of nginx/nginx.conf.
+
+Usage: python scripts/generate_nginx_cache.py [--output PATH]
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import argparse
+
+from app.core.config import settings
+from app.middleware.cache import ROUTE_CACHE_TTLS, CacheTTL
+
+DEFAULT_OUTPUT = Path(__file__).parent.parent.parent / "nginx" / "api_cache.conf"
+
+# Routes are mounted under /api (app.main)
+API_PREFIX = "/api"
+
+HEADER = """\
+# Generated by backend/scripts/generate_nginx_cache.py from ROUTE_CACHE_TTLS
+# (app/middleware/cache.py): edit the TTLs there and regenerate.
+#
+# Anonymous GETs are micro-cached for at most {edge_ttl}s; the application cache
+# (Redis, invalidated by tags) stays the source of truth behind it.
+"""
+
+LOCATION = """
+# {route}: {soft}s fresh, {hard}s stale in the application cache
+location ^~ {location} {{
+    proxy_cache api_cache;
+    proxy_cache_valid 200 {edge_ttl}s;
+    # Cache-Control is meant for browsers: the edge keeps its own short TTL
+    proxy_ignore_headers Cache-Control Expires;
+    proxy_cache_use_stale error timeout updating http_500 http_502 http_503 http_504;
+    proxy_cache_background_update on;
+    proxy_cache_lock on;
+    proxy_cache_lock_timeout 5s;
+    proxy_cache_bypass $http_authorization;
+    proxy_no_cache $http_authorization;
+    add_header X-Edge-Cache $upstream_cache_status always;
+
+    proxy_pass http://backend;
+    proxy_http_version 1.1;
+    proxy_set_header Connection "";
+    proxy_set_header Host $host;
+    proxy_set_header X-Real-IP $remote_addr;
+    proxy_set_header X-Forwarded-For $proxy_add_x_forwarded_for;
+    proxy_set_header X-Forwarded-Proto $scheme;
+}}
+"""
+
+
+def render(routes: dict, edge_ttl: int) -> str:
+    """
+    nginx locations for the cached routes.
+
+    Args:
+        routes: Route path (without /api) -> CacheTTL
+        edge_ttl: Maximum edge TTL in seconds
+
+    Returns:
+        Configuration to include in the server block
+    """
+    parts = [HEADER.format(edge_ttl=edge_ttl)]
+    for route, ttl in sorted(routes.items()):
+        ttl = CacheTTL(*ttl)
+        parts.append(LOCATION.format(
+            route=route,
+            location=f"{API_PREFIX}{route}",
+            soft=ttl.soft,
+            hard=max(ttl.hard, ttl.soft),
+            edge_ttl=max(1, min(ttl.soft, edge_ttl)),
+        ))
+    return "".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    args.output.write_text(render(ROUTE_CACHE_TTLS, settings.RESPONSE_CACHE_EDGE_TTL))
+    print(f"Wrote {len(ROUTE_CACHE_TTLS)} cached locations to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,7 +16,7 @@ from datetime import datetime
 sys.path.append(str(Path(__file__).parent.parent))
 
 from sqlalchemy.orm import Session
-from app.db.session import SessionLocal
+from app.db.session import batch_session
 from app.models.hadith import Hadith, HadithCollection, HadithBook
 import logging
 
@@ -190,7 +190,7 @@ class ComprehensiveHadithImporter:
     
     def import_collection(self, collection_id: str):
         """Import all hadiths for a collection"""
-        db: Session = SessionLocal()
+        db: Session = batch_session()
         
         try:
             # Get collection from database
@@ -14,7 +14,7 @@ from typing import Optional, List, Dict, Any
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.db import SessionLocal
+from app.db import batch_session
 from app.models import Hadith, HadithCollection, HadithBook
 from app.services.hadith_import import HadithImporter, COLLECTION_MAPPING
 
@@ -30,7 +30,7 @@ class HadithImportManager:
     """Manages hadith imports with various options."""
     
     def __init__(self):
-        self.db = SessionLocal()
+        self.db = batch_session()
         self.importer = None
         
     async def __aenter__(self):
@@ -11,7 +11,7 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from sqlalchemy.orm import Session
-from app.db.session import SessionLocal
+from app.db.session import batch_session
 from app.models.hadith import HadithBook, HadithCollection
 import logging
 
@@ -141,7 +141,7 @@ HADITH_BOOKS = {
 
 def import_hadith_books():
     """Import hadith books metadata"""
-    db: Session = SessionLocal()
+    db: Session = batch_session()
     
     try:
         for collection_id, books in HADITH_BOOKS.items():
@@ -13,7 +13,7 @@ import time
 sys.path.append(str(Path(__file__).parent.parent))
 
 from sqlalchemy.orm import Session
-from app.db.session import SessionLocal
+from app.db.session import batch_session
 from app.models.hadith import Hadith, HadithCollection
 import logging
 logger = logging.getLogger(__name__)
@@ -61,7 +61,7 @@ class HadithAPIImporter:
             
     def import_collection_hadiths(self, collection_id: str, limit: int = 50):
         """Importer des hadiths pour une collection"""
-        db: Session = SessionLocal()
+        db: Session = batch_session()
         
         try:
             # Vérifier que la collection existe
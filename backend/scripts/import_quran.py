@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Store the whitelisted Quran editions locally for verse search
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.session import batch_session
+from app.schemas.validators import ALLOWED_QURAN_EDITIONS
+from app.services.quran_search import EDITION_SEARCH_CONFIGS, prepare_search_text
+import argparse
+import json
+import logging
+import requests
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+UPSERT_SQL = text("""
+    INSERT INTO quran_verses (edition, surah, ayah, text, search_text, search_vector)
+    VALUES (
+        :edition, :surah, :ayah, :text, :search_text,
+        to_tsvector(CAST(:config AS regconfig), :search_text)
+    )
+    ON CONFLICT (edition, surah, ayah) DO UPDATE SET
+        text = EXCLUDED.text,
+        search_text = EXCLUDED.search_text,
+        search_vector = EXCLUDED.search_vector
+""")
+
+def load_edition(edition: str, source_dir: Path = None) -> dict:
+    """Full edition JSON (alquran.cloud format), from disk if available"""
+    if source_dir:
+        path = source_dir / f"{edition}.json"
+        if path.exists():
+            return json.loads(path.read_text(encoding="utf-8"))
+    
+    response = requests.get(f"{settings.ALQURAN_API_URL}/quran/{edition}", timeout=60)
+    response.raise_for_status()
+    return response.json()
+
+def import_edition(db: Session, edition: str, source_dir: Path = None) -> int:
+    """Upsert every verse of one edition"""
+    data = load_edition(edition, source_dir)
+    config = EDITION_SEARCH_CONFIGS[edition]
+    
+    rows = []
+    for surah in data["data"]["surahs"]:
+        for ayah in surah["ayahs"]:
+            rows.append({
+                "edition": edition,
+                "surah": surah["number"],
+                "ayah": ayah["numberInSurah"],
+                "text": ayah["text"],
+                "search_text": prepare_search_text(edition, ayah["text"]),
+                "config": config,
+            })
+    
+    db.execute(UPSERT_SQL, rows)
+    db.commit()
+    return len(rows)
+
+def import_quran(editions, source_dir: Path = None):
+    """Import the requested editions into quran_verses"""
+    db: Session = batch_session()
+    
+    try:
+        for edition in editions:
+            count = import_edition(db, edition, source_dir)
+            logger.info(f"Imported {count} verses for {edition}")
+        
+        db.execute(text("ANALYZE quran_verses"))
+        db.commit()
+        
+    except Exception as e:
+        logger.error(f"Error importing Quran: {str(e)}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--edition", action="append", choices=ALLOWED_QURAN_EDITIONS,
+                        help="Edition to import (repeatable, default: all)")
+    parser.add_argument("--source-dir", type=Path,
+                        help="Directory with <edition>.json files instead of downloading")
+    args = parser.parse_args()
+    import_quran(args.edition or ALLOWED_QURAN_EDITIONS, args.source_dir)
@@ -11,7 +11,7 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from sqlalchemy.orm import Session
-from app.db.session import SessionLocal
+from app.db.session import batch_session
 from app.models.hadith import Hadith, HadithCollection
 import logging
 logger = logging.getLogger(__name__)
@@ -187,7 +187,7 @@ SAMPLE_HADITHS = [
 
 def import_sample_hadiths():
     """Importer les hadiths d'exemple"""
-    db: Session = SessionLocal()
+    db: Session = batch_session()
     
     try:
         imported = 0
@@ -5,7 +5,7 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.db import SessionLocal
+from app.db import batch_session
 from app.models import HadithCollection
 import logging
 
@@ -84,7 +84,7 @@ COLLECTIONS = [
 
 def init_collections():
     """Initialize hadith collections"""
-    db = SessionLocal()
+    db = batch_session()
     
     try:
         for collection_data in COLLECTIONS:
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Measure Quran verse search latency against the database (target: p95 < 20 ms)
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import statistics
+import time
+from app.db.session import SessionLocal
+from app.services.quran_search import QuranSearchService
+
+# (query, edition)
+TEST_QUERIES = [
+    ("mercy", "en.sahih"),
+    ("patience", "en.sahih"),
+    ('"straight path"', "en.sahih"),
+    ("prayer -night", "en.pickthall"),
+    ("miséricorde", "fr.hamidullah"),
+    ("الرحمن", "quran-simple"),
+    ("الصَّلَاةَ", "quran-uthmani"),
+    ("صبر", "ar.muyassar"),
+    ("rahmet", "tr.ates"),
+    ("sabar", "id.indonesian"),
+]
+
+ROUNDS = 20
+
+def main():
+    db = SessionLocal()
+    service = QuranSearchService(db)
+    
+    try:
+        # Warm-up
+        for query, edition in TEST_QUERIES:
+            service.search(query, edition)
+        
+        times = []
+        for _ in range(ROUNDS):
+            for query, edition in TEST_QUERIES:
+                for page in (1, 2):
+                    start = time.perf_counter()
+                    service.search(query, edition, page=page)
+                    times.append((time.perf_counter() - start) * 1000)
+        
+        times.sort()
+        p95 = times[int(len(times) * 0.95) - 1]
+        print("Quran Search Performance")
+        print("=" * 50)
+        print(f"Searches:   {len(times)}")
+        print(f"Median:     {statistics.median(times):.2f} ms")
+        print(f"p95:        {p95:.2f} ms")
+        print(f"Max:        {times[-1]:.2f} ms")
+        print("PASS" if p95 < 20 else "FAIL: p95 above 20 ms")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -11,8 +11,8 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.db.session import SessionLocal
+from sqlalchemy import func, select, update
+from app.db.session import batch_session
 from app.models.hadith import Hadith, HadithBook, HadithCollection
 import logging
 
@@ -21,32 +21,28 @@ logging.basicConfig(level=logging.INFO)
 
 def update_book_counts():
     """Update hadith count for each book"""
-    db: Session = SessionLocal()
+    db: Session = batch_session()
     
     try:
-        # Get all books
-        books = db.query(HadithBook).all()
-        
-        for book in books:
-            # Count hadiths in this book
-            hadith_count = db.query(func.count(Hadith.id)).filter(
-                Hadith.book_id == book.id
-            ).scalar()
-            
-            # Update count
-            book.hadith_count = hadith_count
-            logger.info(f"Updated {book.name} (ID: {book.id}): {hadith_count} hadiths")
+        # One correlated UPDATE per table instead of a COUNT per row
+        book_counts = select(func.count(Hadith.id)).where(
+            Hadith.book_id == HadithBook.id
+        ).scalar_subquery()
+        books = db.execute(
+            update(HadithBook).values(hadith_count=book_counts),
+            execution_options={"synchronize_session": False}
+        ).rowcount
+        logger.info(f"Updated hadith counts of {books} books")
         
         # Also update collection totals
-        collections = db.query(HadithCollection).all()
-        
-        for collection in collections:
-            total_count = db.query(func.count(Hadith.id)).filter(
-                Hadith.collection_id == collection.id
-            ).scalar()
-            
-            collection.total_hadiths = total_count
-            logger.info(f"Updated {collection.name}: {total_count} total hadiths")
+        collection_counts = select(func.count(Hadith.id)).where(
+            Hadith.collection_id == HadithCollection.id
+        ).scalar_subquery()
+        collections = db.execute(
+            update(HadithCollection).values(total_hadiths=collection_counts),
+            execution_options={"synchronize_session": False}
+        ).rowcount
+        logger.info(f"Updated hadith totals of {collections} collections")
         
         db.commit()
         logger.info("Book counts updated successfully")
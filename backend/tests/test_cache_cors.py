@@ -0,0 +1,58 @@
+"""
+Response cache and CORS ordering tests
+"""
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from starlette.middleware.cors import CORSMiddleware
+
+from app.middleware.cache import CacheMiddleware
+
+fakeredis = pytest.importorskip("fakeredis")
+
+ORIGINS = ["http://a.test", "http://b.test"]
+
+
+def build_app() -> FastAPI:
+    """Cache inside CORS, as registered by app.main."""
+    app = FastAPI()
+
+    @app.get("/api/hadith/collections")
+    def collections():
+        return [{"collection_id": "bukhari"}]
+
+    app.add_middleware(CacheMiddleware, redis_client=fakeredis.FakeAsyncRedis())
+    app.add_middleware(CORSMiddleware, allow_origins=ORIGINS, allow_credentials=True)
+    return app
+
+
+async def fetch(app: FastAPI, origins: list) -> list:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+        responses = []
+        for origin in origins:
+            headers = {"origin": origin} if origin else {}
+            responses.append(await client.get("/api/hadith/collections", headers=headers))
+        return responses
+
+
+class TestCacheBehindCors:
+    """Test that cached responses get CORS headers for the current Origin."""
+
+    def test_main_registers_cors_outside_the_cache(self):
+        """Test the middleware order of the application."""
+        from app.main import app
+
+        classes = [middleware.cls for middleware in app.user_middleware]
+        assert classes.index(CORSMiddleware) < classes.index(CacheMiddleware)
+
+    def test_hits_follow_the_request_origin(self):
+        """Test an origin-less fill (the warmer) then hits from two origins."""
+        fill, first, second = asyncio.run(fetch(build_app(), [None, "http://a.test", "http://b.test"]))
+
+        assert "access-control-allow-origin" not in fill.headers
+        assert first.headers["x-cache"] == second.headers["x-cache"] == "HIT"
+        assert first.headers["access-control-allow-origin"] == "http://a.test"
+        assert second.headers["access-control-allow-origin"] == "http://b.test"
+        assert "Origin" in second.headers["vary"]
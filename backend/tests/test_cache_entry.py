@@ -0,0 +1,167 @@
+"""
+Cached response entry format tests
+"""
+import gzip
+import json
+
+import pytest
+from app.middleware.cache_entry import (
+    HAS_BROTLI,
+    HAS_ZSTD,
+    CacheEntryError,
+    CachedEntry,
+    build_entry,
+    cache_control_headers,
+    negotiate_encoding,
+)
+
+ARABIC_BODY = json.dumps(
+    [{"id": i, "arabic_text": "إنما الأعمال بالنيات وإنما لكل امرئ ما نوى"} for i in range(100)],
+    ensure_ascii=False
+).encode("utf-8")
+
+
+class TestCachedEntry:
+    """Test building, encoding and serving cached responses."""
+
+    def test_round_trip(self):
+        """Test an encoded entry decodes to the same variants and metadata."""
+        entry = build_entry(200, {"content-type": "application/json"}, "application/json", ARABIC_BODY)
+        decoded = CachedEntry.decode(entry.encode())
+
+        assert decoded.status_code == 200
+        assert decoded.media_type == "application/json"
+        assert decoded.variants == entry.variants
+        assert decoded.variants["identity"] == ARABIC_BODY
+        assert gzip.decompress(decoded.variants["gzip"]) == ARABIC_BODY
+        assert ("br" in decoded.variants) == HAS_BROTLI
+
+    def test_small_body_is_not_compressed(self):
+        """Test that bodies under the threshold only keep the identity variant."""
+        entry = build_entry(200, {"content-type": "application/json"}, "application/json", b'{"ok":true}')
+
+        assert list(entry.variants) == ["identity"]
+        assert "vary" not in entry.response_headers("identity")
+
+    def test_compressed_body_is_stored_in_clear(self):
+        """Test a body already gzipped upstream is decoded before storing."""
+        headers = {
+            "content-type": "application/json",
+            "content-encoding": "gzip",
+            "content-length": "123",
+            "vary": "Accept-Encoding",
+        }
+        entry = build_entry(200, headers, "application/json", gzip.compress(ARABIC_BODY))
+
+        assert entry.variants["identity"] == ARABIC_BODY
+        assert "content-encoding" not in entry.headers
+        assert "content-length" not in entry.headers
+        assert entry.response_headers("gzip")["content-encoding"] == "gzip"
+        assert entry.response_headers("gzip")["vary"] == "Accept-Encoding"
+
+    def test_cors_headers_are_not_stored(self):
+        """Test that headers computed for the request's Origin are never replayed."""
+        headers = {
+            "content-type": "application/json",
+            "access-control-allow-origin": "http://a.test",
+            "access-control-allow-credentials": "true",
+        }
+        entry = build_entry(200, headers, "application/json", ARABIC_BODY)
+
+        assert entry.headers == {"content-type": "application/json"}
+
+    def test_select_variant(self):
+        """Test the variant follows Accept-Encoding."""
+        entry = build_entry(200, {"content-type": "application/json"}, "application/json", ARABIC_BODY)
+
+        assert entry.select("gzip")[0] == "gzip"
+        assert entry.select("")[0] == "identity"
+        assert entry.select("gzip;q=0, deflate")[0] == "identity"
+        if HAS_BROTLI:
+            assert entry.select("gzip, deflate, br")[0] == "br"
+            assert entry.select("br;q=0.5, gzip")[0] == "gzip"
+
+    @pytest.mark.skipif(not HAS_ZSTD, reason="zstandard not installed")
+    def test_zstd_response_is_decoded(self):
+        """Test that a streamed zstd body from CompressionMiddleware is stored in clear."""
+        import zstandard
+
+        compressor = zstandard.ZstdCompressor().compressobj()
+        body = compressor.compress(ARABIC_BODY) + compressor.flush()
+        entry = build_entry(200, {"content-encoding": "zstd"}, "application/json", body)
+
+        assert entry.variants["identity"] == ARABIC_BODY
+
+    def test_freshness_windows(self):
+        """Test fresh / stale windows survive encoding."""
+        entry = build_entry(200, {}, "application/json", b"{}")
+        entry.fresh_until = 100.0
+        entry.stale_until = 200.0
+        decoded = CachedEntry.decode(entry.encode())
+
+        assert decoded.is_fresh(99)
+        assert not decoded.is_stale_servable(99)
+        assert decoded.is_stale_servable(150)
+        assert not decoded.is_fresh(150)
+        assert not decoded.is_stale_servable(200)
+
+    def test_unreadable_entry(self):
+        """Test that legacy JSON entries and truncated data are rejected."""
+        with pytest.raises(CacheEntryError):
+            CachedEntry.decode(b'{"content": "", "status_code": 200}')
+
+        raw = build_entry(200, {}, "application/json", ARABIC_BODY).encode()
+        with pytest.raises(CacheEntryError):
+            CachedEntry.decode(raw[:-10])
+
+
+class TestNegotiateEncoding:
+    """Test Accept-Encoding negotiation."""
+
+    def test_wildcard(self):
+        """Test that * accepts any stored encoding."""
+        assert negotiate_encoding("*", ["identity", "gzip"]) == "gzip"
+
+    def test_identity_preferred(self):
+        """Test an explicitly preferred identity wins."""
+        assert negotiate_encoding("identity, gzip;q=0.5", ["identity", "gzip"]) == "identity"
+
+    def test_preference_order(self):
+        """Test that the preferred order only breaks ties between equal q-values."""
+        available = ["zstd", "br", "gzip"]
+        assert negotiate_encoding("gzip, br, zstd", available, available) == "zstd"
+        assert negotiate_encoding("gzip, br, zstd", available, ["br", "zstd", "gzip"]) == "br"
+        assert negotiate_encoding("zstd;q=0.5, gzip", available, available) == "gzip"
+
+
+class TestCacheControlHeaders:
+    """Test HTTP cache headers derived from the entry windows."""
+
+    def entry(self):
+        entry = build_entry(200, {"cache-control": "no-cache"}, "application/json", b"{}")
+        entry.fresh_until = 1000.0
+        entry.stale_until = 4000.0
+        return entry
+
+    def test_fresh_entry(self):
+        """Test browsers are capped while surrogates get the remaining freshness."""
+        headers = cache_control_headers(self.entry(), 400.0, 3600, 300)
+
+        assert headers["cache-control"] == (
+            "public, max-age=300, stale-while-revalidate=3000, stale-if-error=3600"
+        )
+        assert headers["surrogate-control"] == (
+            "max-age=600, stale-while-revalidate=3000, stale-if-error=3600"
+        )
+
+    def test_stale_entry(self):
+        """Test a stale entry is sent with the rest of its stale window."""
+        headers = cache_control_headers(self.entry(), 2500.0, 3600, 300)
+
+        assert headers["cache-control"].startswith("public, max-age=0, stale-while-revalidate=1500")
+
+    def test_unstored_entry(self):
+        """Test entries without windows get no headers and drop the app's own."""
+        entry = self.entry()
+        assert "cache-control" not in entry.headers
+        assert cache_control_headers(build_entry(500, {}, None, b"{}", False), 0.0, 3600, 300) == {}
@@ -0,0 +1,76 @@
+"""
+Canonical HTTP cache key tests
+"""
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from app.middleware.cache_keys import (
+    canonical_query,
+    normalize_coordinate,
+    normalize_lower,
+    normalize_spaces,
+    route_query_params,
+)
+
+router = APIRouter()
+
+
+def pagination(page: int = Query(1, ge=1), per_page: int = Query(20, ge=1, le=100)):
+    return page, per_page
+
+
+@router.get("/hadiths")
+def list_hadiths(
+    grade: Optional[str] = None,
+    exact: bool = False,
+    paging=Depends(pagination),
+):
+    return []
+
+
+@router.get("/search")
+def search(query: str = Query(...), categories: List[str] = Query([])):
+    return []
+
+
+def params_of(path):
+    return route_query_params(next(route for route in router.routes if route.path == path))
+
+
+class TestCanonicalQuery:
+    """Test query canonicalization from the declared parameters."""
+
+    def test_defaults_and_unknown_params_are_dropped(self):
+        """Test that defaults, ignored params and order do not change the query."""
+        params = params_of("/hadiths")
+        variants = [
+            [("grade", "sahih")],
+            [("per_page", "20"), ("grade", "sahih"), ("utm_source", "x")],
+            [("page", "01"), ("grade", "sahih"), ("exact", "0")],
+        ]
+
+        assert {canonical_query(params, items) for items in variants} == {"grade=sahih"}
+
+    def test_values_are_normalized(self):
+        """Test type coercion and declared normalizers."""
+        params = params_of("/hadiths")
+        items = [("grade", " Sahih "), ("exact", "True"), ("per_page", "50")]
+
+        assert canonical_query(params, items, {"grade": normalize_lower}) == "exact=true&grade=sahih&per_page=50"
+
+    def test_required_and_repeated_params(self):
+        """Test that required params are kept and list params keep every value."""
+        params = params_of("/search")
+        items = [("categories", "faith"), ("query", "  fasting   in  ramadan"), ("categories", "prayer")]
+
+        assert canonical_query(params, items, {"query": normalize_spaces}) == (
+            "categories=faith&categories=prayer&query=fasting+in+ramadan"
+        )
+
+    def test_invalid_values_are_kept(self):
+        """Test that values the endpoint will reject stay distinct."""
+        assert canonical_query(params_of("/hadiths"), [("page", "abc")]) == "page=abc"
+
+    def test_coordinates(self):
+        """Test that nearby coordinates share a key."""
+        assert normalize_coordinate("48.85661") == normalize_coordinate("48.8551") == "48.86"
@@ -0,0 +1,68 @@
+"""
+Cache usage accounting tests
+"""
+import asyncio
+
+from app.core.cache_stats import HITS_KEY, KeyHits, key_prefix
+
+
+class FakePipeline:
+    """Records queued commands, runs nothing."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.client.commands.append((name, args))
+        return queue
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    async def execute(self):
+        self.client.executions += 1
+        return []
+
+
+class FakeRedis:
+    def __init__(self):
+        self.commands = []
+        self.executions = 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class TestCacheStats:
+    """Test hit counting and key prefixes."""
+
+    def test_key_prefix(self):
+        """Test that value keys are grouped by their first two segments."""
+        assert key_prefix("quran:surah:1:en.asad") == "quran:surah"
+        assert key_prefix("search:hadiths:prayer:None") == "search:hadiths"
+        assert key_prefix("plain") == "plain"
+
+    def test_flush_batches_hits(self):
+        """Test that hits are summed per key and flushed in one pipeline, with trimming."""
+        hits = KeyHits()
+        for key in ["a", "b", "a", "a"]:
+            hits.record(key)
+        client = FakeRedis()
+
+        assert asyncio.run(hits.flush(client, keep=10)) == 2
+
+        assert client.executions == 1
+        assert ("zincrby", (HITS_KEY, 3, "a")) in client.commands
+        assert ("zincrby", (HITS_KEY, 1, "b")) in client.commands
+        assert client.commands[-1] == ("zremrangebyrank", (HITS_KEY, 0, -11))
+
+    def test_flush_without_hits(self):
+        """Test that nothing is sent when no key was hit."""
+        client = FakeRedis()
+
+        assert asyncio.run(KeyHits().flush(client)) == 0
+        assert client.executions == 0
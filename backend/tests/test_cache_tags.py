@@ -0,0 +1,107 @@
+"""
+Tag-based cache invalidation tests
+"""
+import asyncio
+
+from app.core.cache_tags import (
+    REGISTER_SCRIPT,
+    collection_tag,
+    invalidate_tags,
+    register_tags,
+    tag_key,
+)
+from app.core.local_cache import LocalLRUCache
+
+
+class FakePipeline:
+    """Queues commands and runs them on the fake client."""
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((name, args))
+            return self
+        return queue
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.commands = []
+
+    async def execute(self):
+        results = [getattr(self.client, name)(*args) for name, args in self.commands]
+        self.commands = []
+        return results
+
+
+class FakeRedis:
+    """Just enough of a Redis client for tag invalidation."""
+
+    def __init__(self):
+        self.data = {}
+        self.published = []
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def sadd(self, key, *members):
+        self.data.setdefault(key, set()).update(members)
+
+    def smembers(self, key):
+        return set(self.data.get(key, set()))
+
+    def delete(self, *keys):
+        return sum(1 for key in keys if self.data.pop(key, None) is not None)
+
+    unlink = delete
+
+    def eval(self, script, numkeys, *args):
+        assert script == REGISTER_SCRIPT
+        for key in args[:numkeys]:
+            self.sadd(key, args[numkeys])
+
+    async def publish(self, channel, message):
+        self.published.append((channel, message))
+
+
+class TestCacheTags:
+    """Test registration and invalidation by tag."""
+
+    def test_register_and_invalidate(self):
+        """Test that invalidating a tag deletes exactly its entries."""
+        client = FakeRedis()
+        client.data.update({"a": "1", "b": "2", "c": "3"})
+        pipe = client.pipeline()
+        register_tags(pipe, "a", [collection_tag("bukhari")], 60)
+        register_tags(pipe, "b", [collection_tag("bukhari"), "hadith:1"], 60)
+        register_tags(pipe, "c", [collection_tag("muslim")], 60)
+        asyncio.run(pipe.execute())
+
+        assert asyncio.run(invalidate_tags(client, [collection_tag("bukhari")])) == 2
+        assert set(client.data) == {"c", tag_key("hadith:1"), tag_key("collection:muslim")}
+        assert tag_key("collection:bukhari") not in client.data
+
+    def test_invalidate_drops_local_entries(self):
+        """Test that invalidated keys leave the L1 caches and are broadcast."""
+        client = FakeRedis()
+        client.data["a"] = "1"
+        register_tags(client, "a", ["user:42"], 60)
+        local = LocalLRUCache("test", max_entries=10, max_bytes=1000, max_ttl=60)
+        local.set("a", 1, size=1)
+
+        asyncio.run(invalidate_tags(client, ["user:42"]))
+
+        assert local.get("a") is None
+        assert len(client.published) == 1
+
+    def test_unknown_tag(self):
+        """Test that an unused tag deletes nothing and broadcasts nothing."""
+        client = FakeRedis()
+
+        assert asyncio.run(invalidate_tags(client, ["hadith:404"])) == 0
+        assert asyncio.run(invalidate_tags(client, [])) == 0
+        assert client.published == []
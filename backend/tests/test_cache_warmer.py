@@ -0,0 +1,28 @@
+"""
+Cache warmer tests
+"""
+from app.services.cache_warmer import WARMER_USER_AGENT, is_tracked_query, merge_top_queries
+
+
+class TestRecentQueries:
+    """Test the ranking of recent search requests."""
+
+    def test_merge_days(self):
+        """Test that scores add up across days and the top N are kept."""
+        today = [(b"/api/hadith/search?q=prayer", 5.0), (b"/api/hadith/search?q=fasting", 2.0)]
+        yesterday = [("/api/hadith/search?q=fasting", 4.0), ("/api/v1/quran/search?q=mercy", 1.0)]
+
+        assert merge_top_queries([today, yesterday], 2) == [
+            "/api/hadith/search?q=fasting",
+            "/api/hadith/search?q=prayer",
+        ]
+
+    def test_empty(self):
+        """Test that no recorded queries yields nothing to warm."""
+        assert merge_top_queries([[], []], 10) == []
+
+    def test_tracked_paths(self):
+        """Test that only search routes from real clients are counted."""
+        assert is_tracked_query("/api/hadith/search", "Mozilla/5.0")
+        assert not is_tracked_query("/api/hadith/search", WARMER_USER_AGENT)
+        assert not is_tracked_query("/api/hadith/collections", "Mozilla/5.0")
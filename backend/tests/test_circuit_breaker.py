@@ -0,0 +1,113 @@
+"""
+Circuit breaker tests
+"""
+import asyncio
+import time
+
+import pytest
+from app.core.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from app.core.redis_manager import RedisManager
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def fail(breaker):
+    with pytest.raises(ConnectionError):
+        with breaker.guard():
+            raise ConnectionError("refused")
+
+
+def succeed(breaker):
+    with breaker.guard():
+        pass
+
+
+class TestCircuitBreaker:
+    """Test state transitions (no Redis server needed)."""
+
+    def setup_method(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker("test", failure_threshold=3, recovery_timeout=10, clock=self.clock)
+
+    def test_opens_after_consecutive_failures(self):
+        """Test that only consecutive failures open the circuit, then calls are rejected."""
+        fail(self.breaker)
+        fail(self.breaker)
+        succeed(self.breaker)
+        fail(self.breaker)
+        fail(self.breaker)
+        assert self.breaker.state == CLOSED
+
+        fail(self.breaker)
+        assert self.breaker.state == OPEN
+        assert self.breaker.is_open
+        with pytest.raises(CircuitOpenError):
+            succeed(self.breaker)
+
+    def test_half_open_probe(self):
+        """Test that a single probe is let through after the recovery timeout."""
+        for _ in range(3):
+            fail(self.breaker)
+        self.clock.now = 10
+
+        assert self.breaker.state == HALF_OPEN
+        assert not self.breaker.is_open
+        with self.breaker.guard():
+            # Other calls are rejected while the probe is in flight
+            assert self.breaker.is_open
+            with pytest.raises(CircuitOpenError):
+                succeed(self.breaker)
+        assert self.breaker.state == CLOSED
+
+    def test_failed_probe_reopens(self):
+        """Test that a failed probe opens the circuit for another recovery period."""
+        for _ in range(3):
+            fail(self.breaker)
+        self.clock.now = 10
+        fail(self.breaker)
+
+        assert self.breaker.state == OPEN
+        self.clock.now = 19
+        assert self.breaker.state == OPEN
+        self.clock.now = 20
+        assert self.breaker.state == HALF_OPEN
+
+    def test_other_errors_do_not_count(self):
+        """Test that errors from a dependency that answered leave the circuit closed."""
+        for _ in range(5):
+            with pytest.raises(ValueError):
+                with self.breaker.guard():
+                    raise ValueError("WRONGTYPE")
+        assert self.breaker.state == CLOSED
+
+
+class TestGuardedRedis:
+    """Test the shared client against an unreachable Redis."""
+
+    def test_unreachable_redis_fails_fast(self):
+        """Test that once open, commands and pipelines fail without connecting."""
+        manager = RedisManager(url="redis://127.0.0.1:1", socket_timeout=0.2)
+        manager.breaker.failure_threshold = 2
+
+        async def run():
+            for _ in range(2):
+                with pytest.raises(Exception):
+                    await manager.client.get("key")
+            assert not manager.available
+
+            start = time.perf_counter()
+            with pytest.raises(CircuitOpenError):
+                await manager.client.get("key")
+            with pytest.raises(CircuitOpenError):
+                async with manager.pipeline() as pipe:
+                    pipe.get("key")
+                    await pipe.execute()
+            return time.perf_counter() - start
+
+        assert asyncio.run(run()) < 0.01
@@ -0,0 +1,184 @@
+"""
+Compression middleware tests
+"""
+import asyncio
+import gzip
+import threading
+
+import pytest
+from app.middleware import compression
+from app.middleware.compression import HAS_BROTLI, HAS_ZSTD, CompressionMiddleware, adaptive_level
+
+if HAS_BROTLI:
+    import brotli
+if HAS_ZSTD:
+    import zstandard
+
+ARABIC_LINE = "إنما الأعمال بالنيات وإنما لكل امرئ ما نوى\n".encode("utf-8")
+
+
+def make_app(chunks, content_type=b"application/json", events=None, headers=()):
+    async def app(scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", content_type), *headers],
+        })
+        for index, chunk in enumerate(chunks):
+            if events is not None:
+                events.append(("produced", index))
+            await send({"type": "http.response.body", "body": chunk, "more_body": index < len(chunks) - 1})
+    return app
+
+
+def run(middleware, accept_encoding="gzip", events=None, path="/api/export"):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+        if events is not None and message["type"] == "http.response.body" and message["body"]:
+            events.append(("sent", len(messages)))
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "headers": [(b"accept-encoding", accept_encoding.encode())],
+    }
+    asyncio.run(middleware(scope, receive, send))
+    headers = {name.decode(): value.decode() for name, value in messages[0]["headers"]}
+    bodies = [message for message in messages[1:] if message["type"] == "http.response.body"]
+    return headers, bodies
+
+
+class TestCompressionMiddleware:
+    """Test whole and streamed response compression."""
+
+    def test_small_response_is_not_compressed(self):
+        """Test that bodies under minimum_size are sent as is."""
+        headers, bodies = run(CompressionMiddleware(make_app([b"{}"]), minimum_size=1000))
+
+        assert "content-encoding" not in headers
+        assert bodies[0]["body"] == b"{}"
+
+    def test_complete_response(self):
+        """Test that a single-message body is compressed in one block with its length."""
+        body = ARABIC_LINE * 100
+        headers, bodies = run(CompressionMiddleware(make_app([body])))
+
+        assert headers["content-encoding"] == "gzip"
+        assert int(headers["content-length"]) == len(bodies[0]["body"])
+        assert gzip.decompress(bodies[0]["body"]) == body
+
+    def test_streamed_response_is_compressed_incrementally(self):
+        """Test that compressed bytes are sent before the app produces its next chunk."""
+        events = []
+        chunks = [ARABIC_LINE * 50 for _ in range(5)]
+        middleware = CompressionMiddleware(make_app(chunks, b"application/pdf", events))
+
+        headers, bodies = run(middleware, events=events)
+
+        assert headers["content-encoding"] == "gzip"
+        assert "content-length" not in headers
+        assert len(bodies) == len(chunks)
+        assert all(message["more_body"] for message in bodies[:-1])
+        assert not bodies[-1]["more_body"]
+        # Each chunk is flushed to the client before the next one is produced
+        assert [kind for kind, _ in events] == ["produced", "sent"] * len(chunks)
+        assert gzip.decompress(b"".join(message["body"] for message in bodies)) == b"".join(chunks)
+
+    def test_streaming_waits_for_minimum_size(self):
+        """Test that small leading chunks are buffered, then a short stream is sent uncompressed."""
+        headers, bodies = run(CompressionMiddleware(make_app([b"a" * 10, b"b" * 10]), minimum_size=1000))
+
+        assert "content-encoding" not in headers
+        assert [message["body"] for message in bodies] == [b"a" * 10 + b"b" * 10]
+
+    @pytest.mark.skipif(not HAS_BROTLI, reason="brotli not installed")
+    def test_streamed_brotli(self):
+        """Test that brotli streams decode to the original body."""
+        chunks = [ARABIC_LINE * 50 for _ in range(3)]
+        headers, bodies = run(CompressionMiddleware(make_app(chunks)), "br, gzip")
+
+        assert headers["content-encoding"] == "br"
+        assert brotli.decompress(b"".join(message["body"] for message in bodies)) == b"".join(chunks)
+
+    def test_precompressed_response_passes_through(self):
+        """Test that encoded bodies and binary media types are not recompressed."""
+        headers, bodies = run(CompressionMiddleware(make_app([b"\x00" * 5000], b"image/png")))
+
+        assert "content-encoding" not in headers
+        assert bodies[0]["body"] == b"\x00" * 5000
+
+
+class TestOffload:
+    """Test thread pool offload and adaptive levels."""
+
+    def test_adaptive_level(self):
+        """Test that small bodies get a higher level, large bodies and a lagging loop a lower one."""
+        assert adaptive_level("br", 4 * 1024, 0.0, 4) == 5
+        assert adaptive_level("br", 64 * 1024, 0.0, 4) == 4
+        assert adaptive_level("br", 512 * 1024, 0.0, 4) == 3
+        assert adaptive_level("br", 512 * 1024, 0.05, 4) == 1
+        assert adaptive_level("gzip", 64 * 1024, 0.2, 6) == 1
+        assert adaptive_level("gzip", 1024, 0.0, 9) == 9
+
+    def test_large_body_is_compressed_in_pool(self, monkeypatch):
+        """Test that bodies above offload_threshold are compressed outside the event loop thread."""
+        threads = []
+        finish = compression.StreamCompressor.finish
+
+        def recording_finish(self, data=b""):
+            threads.append(threading.current_thread().name)
+            return finish(self, data)
+
+        monkeypatch.setattr(compression.StreamCompressor, "finish", recording_finish)
+        small, large = ARABIC_LINE * 100, ARABIC_LINE * 2000
+        middleware = CompressionMiddleware(make_app([small]), offload_threshold=len(large))
+        run(middleware)
+        middleware.app = make_app([large])
+        headers, bodies = run(middleware)
+
+        assert threads[0] == threading.current_thread().name
+        assert threads[1].startswith("compression")
+        assert gzip.decompress(bodies[0]["body"]) == large
+
+
+class TestRoutePolicies:
+    """Test per-route encodings, exclusions and Vary."""
+
+    def test_arabic_text_routes_prefer_zstd(self):
+        """Test that hadith and Quran routes pick zstd, other routes brotli, within client q-values."""
+        middleware = CompressionMiddleware(make_app([ARABIC_LINE * 100]))
+        accept = "gzip, deflate, br, zstd"
+
+        if HAS_ZSTD:
+            headers, bodies = run(middleware, accept, path="/api/hadith/collections/bukhari/hadiths")
+            assert headers["content-encoding"] == "zstd"
+            decompressor = zstandard.ZstdDecompressor().decompressobj()
+            assert decompressor.decompress(bodies[0]["body"]) == ARABIC_LINE * 100
+            assert run(middleware, accept, path="/api/v1/quran/surah/2")[0]["content-encoding"] == "zstd"
+        if HAS_BROTLI:
+            assert run(middleware, accept)[0]["content-encoding"] == "br"
+        headers, _ = run(middleware, "zstd;q=0.5, gzip", path="/api/hadith/daily")
+        assert headers["content-encoding"] == "gzip"
+
+    def test_exclusions_match_path_segments(self):
+        """Test that exclusions and empty policies apply by prefix, not substring."""
+        middleware = CompressionMiddleware(make_app([ARABIC_LINE * 100]), exclude_paths=["/docs"])
+
+        assert "content-encoding" not in run(middleware, path="/docs")[0]
+        assert "content-encoding" not in run(middleware, path="/docs/oauth2-redirect")[0]
+        assert run(middleware, path="/api/documents")[0]["content-encoding"] == "gzip"
+        assert "content-encoding" not in run(middleware, path="/api/hadith/export/pdf")[0]
+        assert run(middleware, path="/api/hadith/exports")[0]["content-encoding"] == "gzip"
+
+    def test_vary_is_merged(self):
+        """Test that Accept-Encoding is added to the app's Vary, also on uncompressed variants."""
+        app = make_app([ARABIC_LINE * 100], headers=[(b"vary", b"Origin")])
+
+        assert run(CompressionMiddleware(app))[0]["vary"] == "Origin, Accept-Encoding"
+        assert run(CompressionMiddleware(app), "")[0]["vary"] == "Origin, Accept-Encoding"
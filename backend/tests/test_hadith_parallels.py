@@ -0,0 +1,117 @@
+"""
+Parallel narration detection tests (shingling, MinHash, LSH banding)
+"""
+import pytest
+
+from app.services import hadith_parallels
+from app.services.hadith_parallels import (
+    SHINGLE_SIZE,
+    ParallelNarrationDetector,
+    _UnionFind,
+    detect_parallel_narrations,
+    shingle_text,
+)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+CHAIN = "حدثنا مالك عن نافع عن ابن عمر"
+MATN = (
+    "قال رسول الله صلى الله عليه وسلم إنما الأعمال بالنيات وإنما لكل امرئ ما نوى "
+    "فمن كانت هجرته إلى الله ورسوله فهجرته إلى الله ورسوله ومن كانت هجرته "
+    "إلى دنيا يصيبها أو امرأة ينكحها فهجرته إلى ما هاجر إليه"
+)
+# Same matn through another chain, one word changed
+PARALLEL = MATN.replace("ينكحها", "يتزوجها")
+UNRELATED = (
+    "الطهور شطر الإيمان والحمد لله تملأ الميزان وسبحان الله والحمد لله تملآن "
+    "ما بين السماوات والأرض والصلاة نور والصدقة برهان والصبر ضياء والقرآن حجة لك أو عليك"
+)
+
+
+def estimated_jaccard(first, second) -> float:
+    return float(np.mean(first == second))
+
+
+class TestShingleText:
+    """Test the word shingles of the normalized matn."""
+
+    def test_isnad_is_stripped(self):
+        """Test that the same matn through two chains has the same shingles."""
+        assert shingle_text(f"{CHAIN} {MATN}", CHAIN) == shingle_text(MATN)
+        assert shingle_text(f"حدثنا قتيبة {MATN}", "حدثنا قتيبة") == shingle_text(MATN)
+
+    def test_diacritics_do_not_matter(self):
+        """Test that vocalized and bare text give the same shingles."""
+        assert shingle_text("إِنَّمَا الأَعْمَالُ بِالنِّيَّاتِ") == shingle_text("انما الاعمال بالنيات")
+
+    def test_short_and_empty_text(self):
+        """Test texts shorter than one shingle and empty texts."""
+        assert len(shingle_text("الدين النصيحة")) == 1
+        assert shingle_text("") == set()
+        assert shingle_text(None) == set()
+        assert len(shingle_text("الدين النصيحة قلنا لمن قال")) == 5 - SHINGLE_SIZE + 1
+
+
+def test_missing_numpy(monkeypatch):
+    """Test that detection is skipped, not failed, without numpy."""
+    monkeypatch.setattr(hadith_parallels, "HAS_NUMPY", False)
+    assert detect_parallel_narrations(db=None) is None
+
+
+@pytest.mark.skipif(np is None, reason="numpy not installed (requirements-ml.txt)")
+class TestMinHashLsh:
+    """Test signatures, bucket collisions and clustering."""
+
+    def setup_method(self):
+        self.detector = ParallelNarrationDetector(db=None)
+
+    def signatures(self, *texts):
+        return np.vstack([self.detector.signature(shingle_text(t)) for t in texts])
+
+    def test_signature_estimates_jaccard(self):
+        """Test that near-duplicates score high and unrelated texts low."""
+        matn, parallel, unrelated = self.signatures(MATN, PARALLEL, UNRELATED)
+        first, second = shingle_text(MATN), shingle_text(PARALLEL)
+        exact = len(first & second) / len(first | second)
+
+        assert (self.detector.signature(first) == matn).all()
+        assert abs(estimated_jaccard(matn, parallel) - exact) < 0.15
+        assert estimated_jaccard(matn, parallel) >= self.detector.threshold
+        assert estimated_jaccard(matn, unrelated) < 0.1
+
+    def test_near_duplicates_share_a_bucket(self):
+        """Test that only the near-duplicate pair becomes a candidate."""
+        signatures = self.signatures(MATN, UNRELATED, PARALLEL)
+        assert self.detector._candidate_pairs(signatures) == {(0, 2)}
+
+    def test_oversized_buckets_are_skipped(self, monkeypatch):
+        """Test that a bucket shared by too many hadiths yields no pairs."""
+        monkeypatch.setattr(hadith_parallels, "MAX_BUCKET_SIZE", 2)
+        signatures = self.signatures(MATN, MATN, MATN)
+        assert self.detector._candidate_pairs(signatures) == set()
+
+    def test_clusters(self):
+        """Test that verified candidates merge under the smallest hadith id."""
+        ids = [30, 10, 20, 40]
+        signatures = self.signatures(MATN, PARALLEL, UNRELATED, MATN)
+        candidates = self.detector._candidate_pairs(signatures)
+
+        assert self.detector._clusters(ids, signatures, candidates) == {10: 10, 30: 10, 40: 10}
+
+    def test_union_find_is_transitive(self):
+        """Test that chained pairs end in one cluster rooted at the smallest id."""
+        union_find = _UnionFind()
+        union_find.union(5, 9)
+        union_find.union(9, 2)
+        union_find.union(7, 8)
+
+        assert {union_find.find(item) for item in (2, 5, 9)} == {2}
+        assert union_find.find(8) == 7
+
+    def test_bands_must_divide_permutations(self):
+        """Test the LSH layout validation."""
+        with pytest.raises(ValueError):
+            ParallelNarrationDetector(db=None, num_perm=100, bands=32)
@@ -0,0 +1,73 @@
+"""
+Similar hadiths job tests (TF-IDF vectors, top-k sparse neighbours)
+"""
+import pytest
+
+from app.services import hadith_similarity
+from app.services.hadith_similarity import HadithSimilarityJob, compute_similar_hadiths
+
+pytestmark = pytest.mark.skipif(
+    not hadith_similarity.HAS_SKLEARN, reason="ML dependencies not installed (requirements-ml.txt)"
+)
+
+ENGLISH = [
+    "Actions are judged by intentions and every person gets what he intended",
+    "Every person gets what he intended, actions are judged by intentions",
+    "Purity is half of faith and praise fills the scale",
+    "Praise fills the scale and purity is half of faith",
+    "The strong man controls himself when he is angry",
+]
+
+
+def brute_force(matrix, k, min_score):
+    """Reference neighbours from the dense cosine matrix."""
+    import numpy as np
+
+    scores = (matrix @ matrix.T).toarray()
+    np.fill_diagonal(scores, -1.0)
+    return [
+        [(int(column), float(scores[row, column])) for column in np.argsort(-scores[row])[:k]
+         if scores[row, column] >= min_score]
+        for row in range(matrix.shape[0])
+    ]
+
+
+class TestTopKNeighbours:
+    """Test the batched sparse top-k computation."""
+
+    def test_matches_brute_force_across_batches(self):
+        """Test that batching gives the dense result, without self matches."""
+        import numpy as np
+        from scipy import sparse
+        from sklearn.preprocessing import normalize
+
+        generator = np.random.RandomState(0)
+        matrix = normalize(sparse.random(23, 40, density=0.3, format="csr", random_state=generator))
+        job = HadithSimilarityJob(db=None, top_k=3, min_score=0.0, batch_size=5)
+
+        neighbours = job._top_k_neighbours(matrix)
+        expected = brute_force(matrix, 3, 0.0)
+
+        assert len(neighbours) == 23
+        for row, (found, reference) in enumerate(zip(neighbours, expected)):
+            assert row not in [column for column, _ in found]
+            assert [column for column, _ in found] == [column for column, _ in reference]
+            assert [score for _, score in found] == pytest.approx([score for _, score in reference], abs=1e-5)
+
+    def test_paraphrases_are_nearest(self):
+        """Test that each paraphrase pair are each other's first neighbour."""
+        job = HadithSimilarityJob(db=None, top_k=2, min_score=0.1, batch_size=2)
+        matrix = job._vectorize(ENGLISH, [""] * len(ENGLISH))
+
+        neighbours = job._top_k_neighbours(matrix)
+
+        assert [row[0][0] for row in neighbours[:4]] == [1, 0, 3, 2]
+        # Below min_score: no neighbour rather than a meaningless one
+        assert neighbours[4] == []
+
+    def test_missing_dependencies(self, monkeypatch):
+        """Test that the job is skipped when scikit-learn is missing."""
+        monkeypatch.setattr(hadith_similarity, "HAS_SKLEARN", False)
+        assert compute_similar_hadiths(db=None) is None
+        with pytest.raises(RuntimeError):
+            HadithSimilarityJob(db=None)
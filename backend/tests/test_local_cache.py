@@ -0,0 +1,98 @@
+"""
+In-process L1 cache tests
+"""
+import json
+import time
+
+from app.core.local_cache import LocalLRUCache, _handle_message, invalidation_message
+
+
+class TestLocalLRUCache:
+    """Test bounds, TTL and invalidation of the L1 cache."""
+    
+    def test_get_set(self):
+        """Test a stored value is returned and counted as a hit."""
+        local = LocalLRUCache("test", max_entries=10, max_bytes=1000, max_ttl=60)
+        local.set("a", {"x": 1}, size=10)
+        
+        assert local.get("a") == {"x": 1}
+        assert local.get("missing") is None
+        assert local.stats()["hits"] == 1
+        assert local.stats()["misses"] == 1
+    
+    def test_evicts_least_recently_used_by_count(self):
+        """Test that the entry count bound evicts the LRU entry."""
+        local = LocalLRUCache("test", max_entries=2, max_bytes=1000, max_ttl=60)
+        local.set("a", 1, size=1)
+        local.set("b", 2, size=1)
+        local.get("a")
+        local.set("c", 3, size=1)
+        
+        assert local.get("b") is None
+        assert local.get("a") == 1
+        assert local.get("c") == 3
+    
+    def test_evicts_by_bytes(self):
+        """Test that the byte bound evicts until the total fits."""
+        local = LocalLRUCache("test", max_entries=100, max_bytes=400, max_ttl=60)
+        for key in "abcde":
+            local.set(key, key, size=100)
+        
+        assert local.stats()["bytes"] <= 400
+        assert local.get("a") is None
+        assert local.get("e") == "e"
+    
+    def test_rejects_oversized_entries(self):
+        """Test that one entry cannot take over the cache."""
+        local = LocalLRUCache("test", max_entries=100, max_bytes=400, max_ttl=60)
+        assert local.set("big", "x", size=200) is False
+    
+    def test_ttl_expiry(self):
+        """Test that entries expire on their own TTL."""
+        local = LocalLRUCache("test", max_entries=10, max_bytes=1000, max_ttl=60)
+        local.set("a", 1, size=1, ttl=0.01)
+        time.sleep(0.02)
+        
+        assert local.get("a") is None
+        assert local.stats()["entries"] == 0
+    
+    def test_ttl_capped(self):
+        """Test that the L1 never keeps an entry longer than max_ttl."""
+        local = LocalLRUCache("test", max_entries=10, max_bytes=1000, max_ttl=0.01)
+        local.set("a", 1, size=1, ttl=3600)
+        time.sleep(0.02)
+        
+        assert local.get("a") is None
+    
+    def test_delete_matching(self):
+        """Test glob-pattern invalidation."""
+        local = LocalLRUCache("test", max_entries=10, max_bytes=1000, max_ttl=60)
+        local.set("api_cache:/api/hadith/collections", 1, size=1)
+        local.set("api_cache:/api/quran/surahs", 2, size=1)
+        
+        assert local.delete_matching("api_cache:/api/hadith*") == 1
+        assert local.get("api_cache:/api/quran/surahs") == 2
+
+
+class TestBroadcastInvalidation:
+    """Test handling of invalidations received over pub/sub."""
+    
+    def test_remote_message_invalidates(self):
+        """Test that another process's message drops local entries."""
+        local = LocalLRUCache("test", max_entries=10, max_bytes=1000, max_ttl=60)
+        local.set("a", 1, size=1)
+        
+        message = json.loads(invalidation_message(keys=["a"]))
+        message["origin"] = "another-node"
+        _handle_message(json.dumps(message))
+        
+        assert local.get("a") is None
+    
+    def test_own_message_ignored(self):
+        """Test that a process does not drop entries on its own broadcast."""
+        local = LocalLRUCache("test", max_entries=10, max_bytes=1000, max_ttl=60)
+        local.set("a", 1, size=1)
+        
+        _handle_message(invalidation_message(keys=["a"]))
+        
+        assert local.get("a") == 1
@@ -0,0 +1,95 @@
+"""
+Narrator chain parsing tests
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.models import HadithNarrator, Narrator
+from app.services.narrator_index import NarratorIndexer, parse_narrator_chain, normalize_narrator_name
+
+
+class TestEnglishNarratorChain:
+    """Test parsing of English narrator chains."""
+    
+    def test_single_narrator(self):
+        """Test the common 'Narrated X:' form."""
+        assert parse_narrator_chain("Narrated Abu Huraira:", "en") == [
+            ("Abu Huraira", "abu huraira")
+        ]
+    
+    def test_honorifics_removed(self):
+        """Test that honorifics do not become part of the name."""
+        narrators = parse_narrator_chain("Narrated Abu Huraira (RA):", "en")
+        assert narrators == [("Abu Huraira", "abu huraira")]
+    
+    def test_multiple_narrators_in_order(self):
+        """Test that chain order is preserved, nearest to the compiler first."""
+        narrators = parse_narrator_chain(
+            "It was narrated from Malik, from Nafi, from Ibn Umar that", "en"
+        )
+        assert [n for _, n in narrators] == ["malik", "nafi", "ibn umar"]
+    
+    def test_apostrophes_normalized(self):
+        """Test that transliteration apostrophes do not split duplicates."""
+        assert normalize_narrator_name("'Umar bin Al-Khattab", "en") == \
+            normalize_narrator_name("Umar bin Al-Khattab", "en")
+    
+    def test_empty_chain(self):
+        """Test empty and missing chains."""
+        assert parse_narrator_chain("", "en") == []
+        assert parse_narrator_chain(None, "en") == []
+
+
+class TestArabicNarratorChain:
+    """Test parsing of Arabic narrator chains."""
+    
+    def test_isnad_with_tashkeel(self):
+        """Test splitting a vocalized isnad on transmission formulas."""
+        chain = (
+            "حَدَّثَنَا الْحُمَيْدِيُّ عَبْدُ اللَّهِ بْنُ الزُّبَيْرِ، قَالَ حَدَّثَنَا سُفْيَانُ، "
+            "قَالَ حَدَّثَنَا يَحْيَى بْنُ سَعِيدٍ الأَنْصَارِيُّ، قَالَ أَخْبَرَنِي مُحَمَّدُ بْنُ إِبْرَاهِيمَ التَّيْمِيُّ، "
+            "أَنَّهُ سَمِعَ عَلْقَمَةَ بْنَ وَقَّاصٍ اللَّيْثِيَّ، يَقُولُ سَمِعْتُ عُمَرَ بْنَ الْخَطَّابِ ـ رضى الله عنه ـ"
+        )
+        narrators = [n for _, n in parse_narrator_chain(chain, "ar")]
+        
+        assert len(narrators) == 6
+        assert narrators[1] == "سفيان"
+        # Honorific stripped from the companion
+        assert narrators[-1] == "عمر بن الخطاب"
+    
+    def test_same_name_with_and_without_tashkeel(self):
+        """Test that vocalization does not create duplicate narrators."""
+        assert normalize_narrator_name("سُفْيَانُ", "ar") == normalize_narrator_name("سفيان", "ar")
+
+
+class TestNarratorIndexerSavepoint:
+    """Test that a failed hadith does not poison the import session."""
+
+    def setup_method(self):
+        self.engine = create_engine("sqlite://")
+        Narrator.__table__.create(self.engine)
+        HadithNarrator.__table__.create(self.engine)
+        self.db = Session(self.engine)
+        self.indexer = NarratorIndexer(self.db)
+
+    def teardown_method(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def test_failed_block_is_rolled_back_alone(self):
+        """Test that earlier work survives and the session stays usable."""
+        kept = self.indexer._get_or_create_narrator("en", "malik", "Malik")
+
+        with pytest.raises(RuntimeError):
+            with self.indexer.savepoint():
+                self.indexer._get_or_create_narrator("en", "nafi", "Nafi")
+                raise RuntimeError("flush failed")
+
+        assert list(self.indexer._narrator_ids) == [("en", "malik")]
+
+        # The rolled-back narrator is created again, not served from the cache
+        recreated = self.indexer._get_or_create_narrator("en", "nafi", "Nafi")
+        self.db.commit()
+        names = {n.id: n.normalized_name for n in self.db.query(Narrator)}
+        assert names == {kept: "malik", recreated: "nafi"}
@@ -0,0 +1,55 @@
+"""
+Private per-user response cache tests
+"""
+from datetime import timedelta
+
+from starlette.requests import Request
+from app.core.security import access_token_user_id, create_access_token, create_refresh_token
+from app.middleware.cache import CacheMiddleware
+
+
+def make_request(path: str) -> Request:
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": []})
+
+
+class TestAccessTokenUserId:
+    """Test the user id read from bearer tokens."""
+
+    def test_access_token(self):
+        """Test that a valid access token yields its user id."""
+        assert access_token_user_id(create_access_token({"sub": "a@example.com", "uid": 7})) == 7
+
+    def test_tokens_without_user_id(self):
+        """Test that refresh, expired, legacy and tampered tokens are ignored."""
+        assert access_token_user_id(create_refresh_token({"sub": "a@example.com", "uid": 7})) is None
+        assert access_token_user_id(
+            create_access_token({"sub": "a@example.com", "uid": 7}, timedelta(seconds=-1))
+        ) is None
+        assert access_token_user_id(create_access_token({"sub": "a@example.com"})) is None
+        token = create_access_token({"sub": "a@example.com", "uid": 7})
+        assert access_token_user_id(token[:-2] + "xx") is None
+
+
+class TestPrivateRoutes:
+    """Test private cache opt-in and key scoping."""
+
+    def setup_method(self):
+        self.middleware = CacheMiddleware(app=None, redis_client=object())
+
+    def test_opt_in_by_route(self):
+        """Test that the longest configured prefix wins and other routes are not cached."""
+        assert self.middleware._private_route_ttl("/api/prayer-logs/") == 300
+        assert self.middleware._private_route_ttl("/api/prayer-logs/stats") == 60
+        assert self.middleware._private_route_ttl("/api/zakat/calculations/3") == 600
+        assert self.middleware._private_route_ttl("/api/users/profile") is None
+        assert self.middleware._private_route_ttl("/api/zakat/calculate") is None
+
+    def test_keys_are_scoped_per_user(self):
+        """Test that two users never share a key, nor with the public cache."""
+        request = make_request("/api/bookmarks/")
+        public = self.middleware._generate_cache_key(request, "")
+        first = self.middleware._generate_cache_key(request, "", "private:7:")
+        second = self.middleware._generate_cache_key(request, "", "private:8:")
+
+        assert len({public, first, second}) == 3
+        assert first == "api_cache:private:7:/api/bookmarks/"
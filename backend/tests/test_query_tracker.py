@@ -0,0 +1,116 @@
+"""
+Per-request query tracking tests
+"""
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.db.query_tracker import QueryBudgetExceeded, QueryStats, query_budget
+from app.middleware.query_tracking import QueryTrackingMiddleware
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE book (id INTEGER PRIMARY KEY, collection INTEGER)"))
+        for i in range(6):
+            conn.execute(text("INSERT INTO book VALUES (:id, :collection)"), {"id": i, "collection": i % 3})
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def client(engine):
+    app = FastAPI()
+
+    def count_per_collection():
+        with engine.connect() as conn:
+            return [
+                conn.execute(text("SELECT count(*) FROM book WHERE collection = :c"), {"c": c}).scalar()
+                for c in range(6)
+            ]
+
+    @app.get("/loop")
+    def loop():
+        return count_per_collection()
+
+    @app.get("/budgeted")
+    @query_budget(2)
+    def budgeted():
+        return count_per_collection()
+
+    @app.get("/grouped")
+    @query_budget(2)
+    def grouped():
+        with engine.connect() as conn:
+            rows = conn.execute(text("SELECT collection, count(*) FROM book GROUP BY collection")).all()
+        return dict(rows)
+
+    app.add_middleware(QueryTrackingMiddleware)
+    return TestClient(app)
+
+
+class TestQueryStats:
+    """Test the per-request counters."""
+
+    def test_repeated_shapes(self):
+        """Test that only statements run at least the threshold are reported."""
+        stats = QueryStats()
+        for _ in range(5):
+            stats.record("SELECT  *\n FROM book WHERE id = ?", 0.002)
+        stats.record("SELECT 1", 0.001)
+
+        assert stats.count == 6
+        assert stats.repeated(5) == {"SELECT * FROM book WHERE id = ?": 5}
+        assert stats.server_timing() == 'db;dur=11.0;desc="6 queries"'
+
+    def test_unrouted_request(self):
+        """Test that a request without route has a bounded label and no budget."""
+        stats = QueryStats({"type": "http", "path": "/nowhere"})
+        assert stats.route == "unmatched"
+        assert stats.budget is None
+        stats.check_budget()
+
+
+class TestQueryTrackingMiddleware:
+    """Test the middleware around real SQLAlchemy queries."""
+
+    def test_server_timing_header(self, client):
+        """Test that queries of a sync endpoint are counted in Server-Timing."""
+        response = client.get("/loop")
+        assert response.status_code == 200
+        assert response.headers["server-timing"].startswith("db;dur=")
+        assert response.headers["server-timing"].endswith('desc="6 queries"')
+
+    def test_repeated_queries_are_logged(self, client, caplog):
+        """Test that a query run in a loop is reported as a likely N+1."""
+        with caplog.at_level(logging.WARNING, logger="app.middleware.query_tracking"):
+            client.get("/loop")
+        assert "Likely N+1 on /loop" in caplog.text
+
+    def test_budget_is_enforced(self, client, monkeypatch):
+        """Test that the query past the budget fails in development and test."""
+        monkeypatch.setattr(settings, "QUERY_BUDGET_ENFORCE", True)
+        with pytest.raises(QueryBudgetExceeded, match="/budgeted exceeded its query budget of 2"):
+            client.get("/budgeted")
+
+        assert client.get("/grouped").headers["server-timing"].endswith('desc="1 queries"')
+
+    def test_budget_is_only_reported(self, client, monkeypatch, caplog):
+        """Test that production serves the request and logs the overrun."""
+        monkeypatch.setattr(settings, "QUERY_BUDGET_ENFORCE", False)
+        with caplog.at_level(logging.WARNING, logger="app.db.query_tracker"):
+            response = client.get("/budgeted")
+
+        assert response.status_code == 200
+        assert "exceeded its query budget of 2" in caplog.text
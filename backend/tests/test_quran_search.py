@@ -0,0 +1,41 @@
+"""
+Quran search text preparation and highlighting tests
+"""
+from app.services.quran_search import align_highlight, prepare_search_text
+
+
+class TestPrepareSearchText:
+    """Test the text each edition is indexed from."""
+    
+    def test_arabic_is_normalized(self):
+        """Test that Arabic editions drop tashkeel like the hadith index."""
+        assert prepare_search_text("quran-uthmani", "الرَّحْمَٰنِ الرَّحِيمِ") == "الرحمن الرحيم"
+    
+    def test_translation_is_unchanged(self):
+        """Test that translations are indexed as stored."""
+        assert prepare_search_text("en.sahih", "The Most Merciful.") == "The Most Merciful."
+
+
+class TestAlignHighlight:
+    """Test carrying highlights back onto the original Arabic."""
+    
+    def test_marks_original_words(self):
+        """Test that the marked normalized word marks the word with tashkeel."""
+        original = "بِسْمِ اللَّهِ الرَّحْمَٰنِ الرَّحِيمِ"
+        highlighted = "بسم الله <mark>الرحمن</mark> الرحيم"
+        assert align_highlight(original, highlighted) == (
+            "بِسْمِ اللَّهِ <mark>الرَّحْمَٰنِ</mark> الرَّحِيمِ"
+        )
+    
+    def test_pause_marks_are_skipped(self):
+        """Test that standalone Quranic marks do not shift the alignment."""
+        original = "ذَٰلِكَ الْكِتَابُ لَا رَيْبَ ۛ فِيهِ"
+        highlighted = "ذلك <mark>الكتاب</mark> لا ريب فيه"
+        assert align_highlight(original, highlighted) == (
+            "ذَٰلِكَ <mark>الْكِتَابُ</mark> لَا رَيْبَ ۛ فِيهِ"
+        )
+    
+    def test_mismatch_falls_back(self):
+        """Test that unaligned word counts return the headline as-is."""
+        highlighted = "<mark>الرحمن</mark> الرحيم"
+        assert align_highlight("الرَّحْمَٰنِ", highlighted) == highlighted
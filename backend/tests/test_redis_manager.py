@@ -0,0 +1,75 @@
+"""
+Shared Redis manager tests
+"""
+import asyncio
+
+import anyio
+import pytest
+from app.core.redis_manager import RedisManager, run_async
+
+
+class TestRedisManager:
+    """Test client sharing and sync access (no Redis server needed)."""
+
+    def test_one_client_per_event_loop(self):
+        """Test that a loop reuses its client and pool, and another loop gets its own."""
+        manager = RedisManager(url="redis://localhost:6379", max_connections=5)
+
+        async def clients():
+            return manager.client, manager.client
+
+        first, same = asyncio.run(clients())
+        other, _ = asyncio.run(clients())
+
+        assert first is same
+        assert first is not other
+        assert first.connection_pool.max_connections == 5
+
+    def test_run_async_outside_worker_thread(self):
+        """Test that scripts run the coroutine on their own event loop."""
+        async def add(a, b=0):
+            await asyncio.sleep(0)
+            return a + b
+
+        assert run_async(add, 1, b=2) == 3
+
+    def test_run_async_in_worker_thread(self):
+        """Test that worker threads run the coroutine on the application loop."""
+        async def loop_id():
+            return id(asyncio.get_running_loop())
+
+        async def main():
+            return id(asyncio.get_running_loop()), await anyio.to_thread.run_sync(run_async, loop_id)
+
+        app_loop, coroutine_loop = asyncio.run(main())
+        assert app_loop == coroutine_loop
+
+    def test_run_async_errors_propagate_once(self):
+        """Test that a RuntimeError of the coroutine is raised, not retried on a new loop."""
+        calls = []
+
+        async def closed_loop():
+            calls.append(1)
+            raise RuntimeError("Event loop is closed")
+
+        async def main():
+            await anyio.to_thread.run_sync(run_async, closed_loop)
+
+        with pytest.raises(RuntimeError, match="Event loop is closed"):
+            asyncio.run(main())
+        with pytest.raises(RuntimeError, match="Event loop is closed"):
+            run_async(closed_loop)
+        assert len(calls) == 2
+
+    def test_unreachable_redis_is_unhealthy(self):
+        """Test that a failed ping is recorded instead of raised."""
+        manager = RedisManager(url="redis://127.0.0.1:1", socket_timeout=0.2)
+
+        async def check():
+            return await manager.ping(), manager.health()
+
+        healthy, health = asyncio.run(check())
+
+        assert not healthy
+        assert health["status"] == "unhealthy"
+        assert health["error"]
@@ -0,0 +1,118 @@
+"""
+Search query language parsing tests
+"""
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.models import Hadith
+from app.services.search_query import FieldFilter, SearchQueryCompiler, TextTerm, parse_search_query
+
+
+def fallback_sql(query: str) -> str:
+    """SQL of the ILIKE fallback used for languages without a tsvector."""
+    compiled = SearchQueryCompiler().apply_fallback(Session().query(Hadith), parse_search_query(query))
+    return str(compiled.statement.compile(dialect=postgresql.dialect()))
+
+
+class TestSearchQueryParser:
+    """Test parsing of free text into websearch_to_tsquery syntax."""
+    
+    def test_plain_terms(self):
+        """Test that plain terms are kept as-is."""
+        assert parse_search_query("patience reward").text == "patience reward"
+    
+    def test_phrase(self):
+        """Test that quoted phrases stay quoted."""
+        assert parse_search_query('"reward of the patient"').text == '"reward of the patient"'
+    
+    def test_unclosed_phrase(self):
+        """Test that an unclosed quote runs to the end of the query."""
+        assert parse_search_query('charity "the upper hand').text == 'charity "the upper hand"'
+    
+    def test_exclusion(self):
+        """Test term and phrase exclusions."""
+        parsed = parse_search_query('prayer -night -"last third"')
+        assert parsed.text == 'prayer -night -"last third"'
+    
+    def test_or(self):
+        """Test that OR is kept between terms and dropped when dangling."""
+        assert parse_search_query("fasting OR prayer").text == "fasting OR prayer"
+        assert parse_search_query("OR fasting OR OR prayer OR").text == "fasting OR prayer"
+    
+    def test_lowercase_or_is_a_term(self):
+        """Test that only uppercase OR is an operator."""
+        assert parse_search_query("fasting or prayer").text == "fasting or prayer"
+    
+    def test_empty(self):
+        """Test empty and blank queries."""
+        assert parse_search_query("").is_empty
+        assert parse_search_query("   ").is_empty
+        assert parse_search_query(None).is_empty
+
+
+class TestSearchQueryFields:
+    """Test field-scoped clauses."""
+    
+    def test_narrator_field(self):
+        """Test a quoted narrator clause next to free text."""
+        parsed = parse_search_query('narrator:"abu huraira" fasting')
+        assert parsed.text == "fasting"
+        assert parsed.filters == [FieldFilter("narrator", "abu huraira")]
+    
+    def test_negated_field(self):
+        """Test that a leading dash negates a field clause."""
+        parsed = parse_search_query("-narrator:aisha")
+        assert parsed.text == ""
+        assert parsed.filters == [FieldFilter("narrator", "aisha", negated=True)]
+    
+    def test_reference_with_collection(self):
+        """Test that the value keeps its own colons."""
+        parsed = parse_search_query("ref:bukhari:52")
+        assert parsed.filters == [FieldFilter("ref", "bukhari:52")]
+    
+    def test_field_names_case_insensitive(self):
+        """Test that field prefixes are case insensitive."""
+        parsed = parse_search_query("Book:2 GRADE:sahih")
+        assert parsed.filters == [FieldFilter("book", "2"), FieldFilter("grade", "sahih")]
+    
+    def test_unknown_prefix_is_text(self):
+        """Test that an unknown prefix is searched as text."""
+        parsed = parse_search_query("chapter:faith")
+        assert parsed.text == '"chapter faith"'
+        assert parsed.filters == []
+    
+    def test_arabic_terms(self):
+        """Test that Arabic text passes through."""
+        parsed = parse_search_query('"إنما الأعمال بالنيات" narrator:عمر')
+        assert parsed.text == '"إنما الأعمال بالنيات"'
+        assert parsed.filters == [FieldFilter("narrator", "عمر")]
+
+
+class TestFallbackSearch:
+    """Test the ILIKE fallback (language="mixed")."""
+    
+    def test_terms_are_grouped(self):
+        """Test that OR joins alternatives and exclusions stay separate terms."""
+        parsed = parse_search_query('fasting OR prayer -night "upper hand"')
+        assert parsed.terms == [
+            [TextTerm("fasting"), TextTerm("prayer")],
+            [TextTerm("night", negated=True)],
+            [TextTerm("upper hand")],
+        ]
+    
+    def test_prefix_only_query_is_filtered(self):
+        """Test that a prefix-only query filters instead of returning every hadith."""
+        sql = fallback_sql('narrator:"Abu Hurairah" ref:bukhari:1')
+        assert "hadith_narrators" in sql
+        assert "hadiths.hadith_number = " in sql
+        assert "ILIKE" not in sql
+    
+    def test_terms_not_raw_query(self):
+        """Test that ILIKE patterns come from the parsed terms, not the raw query."""
+        compiled = SearchQueryCompiler().apply_fallback(
+            Session().query(Hadith), parse_search_query('patience -anger')
+        ).statement.compile(dialect=postgresql.dialect())
+        patterns = {value for value in compiled.params.values() if value}
+        
+        assert patterns == {"%patience%", "%anger%"}
+        assert str(compiled).count("NOT (") == 1
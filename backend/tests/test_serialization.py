@@ -0,0 +1,76 @@
+"""
+Cached value serialization tests
+"""
+import datetime
+import json
+from decimal import Decimal
+
+import pytest
+from app.core.serialization import (
+    HAS_MSGPACK,
+    HAS_ZSTD,
+    HEADER,
+    SerializationError,
+    ValueCodec,
+)
+
+PAGE = {
+    "hadiths": [
+        {
+            "id": i,
+            "arabic_text": "إنما الأعمال بالنيات وإنما لكل امرئ ما نوى",
+            "english_text": "Actions are judged by intentions",
+            "categories": ["faith", "intention"],
+        }
+        for i in range(20)
+    ],
+    "total": 7563,
+    "page": 1,
+}
+
+
+class TestValueCodec:
+    """Test encoding, compression and backward compatibility of cached values."""
+
+    @pytest.mark.skipif(not HAS_MSGPACK, reason="msgpack not installed")
+    def test_msgpack_keeps_types(self):
+        """Test that datetimes, dates and decimals come back with their type."""
+        codec = ValueCodec("msgpack", "none")
+        value = {
+            "created_at": datetime.datetime(2024, 3, 1, 12, 30, tzinfo=datetime.timezone.utc),
+            "day": datetime.date(2024, 3, 1),
+            "nisab": Decimal("5950.25"),
+            "ids": [1, 2, 3],
+        }
+
+        assert codec.loads(codec.dumps(value)) == value
+
+    @pytest.mark.skipif(not HAS_ZSTD, reason="zstandard not installed")
+    def test_compression_threshold(self):
+        """Test that only payloads above the threshold are compressed."""
+        codec = ValueCodec("json", "zstd", threshold=1024)
+
+        small = codec.dumps({"ok": True})
+        large = codec.dumps(PAGE)
+
+        assert HEADER.unpack_from(small)[2] == 0
+        assert HEADER.unpack_from(large)[2] == 1
+        assert len(large) < len(json.dumps(PAGE, ensure_ascii=False).encode())
+        assert codec.loads(large) == PAGE
+
+    def test_reads_other_codecs(self):
+        """Test that a reader decodes values written with another serializer."""
+        written = ValueCodec("json", "none").dumps(PAGE)
+
+        assert ValueCodec("msgpack", "zstd").loads(written) == PAGE
+
+    def test_legacy_json(self):
+        """Test that values written before the header are still read."""
+        assert ValueCodec("json", "none").loads(b'{"total": 3}') == {"total": 3}
+
+    def test_unknown_version(self):
+        """Test that a future format version is rejected, not misread."""
+        raw = HEADER.pack(2, 0, 0) + b"{}"
+
+        with pytest.raises(SerializationError):
+            ValueCodec("json", "none").loads(raw)
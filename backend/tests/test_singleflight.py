@@ -0,0 +1,120 @@
+"""
+Request coalescing tests
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+from app.core.singleflight import AsyncSingleFlight, SingleFlight
+
+
+class TestSingleFlight:
+    """Test in-process coalescing across threads."""
+    
+    def test_concurrent_calls_share_one_computation(self):
+        """Test that concurrent callers for a key run the function once."""
+        flight = SingleFlight("test")
+        calls = []
+        started = threading.Event()
+        
+        def compute():
+            calls.append(1)
+            started.set()
+            time.sleep(0.1)
+            return "value"
+        
+        results = []
+        leader = threading.Thread(target=lambda: results.append(flight.do("key", compute)))
+        leader.start()
+        started.wait()
+        
+        waiters = [
+            threading.Thread(target=lambda: results.append(flight.do("key", compute)))
+            for _ in range(5)
+        ]
+        for thread in waiters:
+            thread.start()
+        for thread in [leader, *waiters]:
+            thread.join()
+        
+        assert len(calls) == 1
+        assert results == ["value"] * 6
+    
+    def test_sequential_calls_recompute(self):
+        """Test that a finished call is not reused."""
+        flight = SingleFlight("test")
+        calls = []
+        
+        flight.do("key", lambda: calls.append(1))
+        flight.do("key", lambda: calls.append(1))
+        
+        assert len(calls) == 2
+    
+    def test_exception_is_raised(self):
+        """Test that the leader's exception propagates and the key is released."""
+        flight = SingleFlight("test")
+        
+        def fail():
+            raise ValueError("boom")
+        
+        with pytest.raises(ValueError):
+            flight.do("key", fail)
+        assert flight.do("key", lambda: "ok") == "ok"
+
+
+class TestAsyncSingleFlight:
+    """Test in-process coalescing across coroutines."""
+    
+    def test_concurrent_calls_share_one_computation(self):
+        """Test that concurrent tasks for a key await the function once."""
+        flight = AsyncSingleFlight("test")
+        calls = []
+        
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "value"
+        
+        async def run():
+            return await asyncio.gather(*(flight.do("key", compute) for _ in range(10)))
+        
+        assert asyncio.run(run()) == ["value"] * 10
+        assert len(calls) == 1
+    
+    def test_different_keys_are_independent(self):
+        """Test that distinct keys do not coalesce."""
+        flight = AsyncSingleFlight("test")
+        
+        async def compute(value):
+            await asyncio.sleep(0.01)
+            return value
+        
+        async def run():
+            return await asyncio.gather(
+                flight.do("a", lambda: compute("a")),
+                flight.do("b", lambda: compute("b"))
+            )
+        
+        assert asyncio.run(run()) == ["a", "b"]
+    
+    def test_waiter_takes_over_when_leader_cancelled(self):
+        """Test that a cancelled leader does not fail its waiters."""
+        flight = AsyncSingleFlight("test")
+        calls = []
+        
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "value"
+        
+        async def run():
+            leader = asyncio.create_task(flight.do("key", compute))
+            await asyncio.sleep(0)
+            waiter = asyncio.create_task(flight.do("key", compute))
+            await asyncio.sleep(0)
+            leader.cancel()
+            return await waiter
+        
+        assert asyncio.run(run()) == "value"
+        assert len(calls) == 2